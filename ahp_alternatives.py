@@ -0,0 +1,288 @@
+# ahp_alternatives.py
+"""Score large performance tables (alternatives × criteria) with the Step 4 ω.
+
+    python ahp_alternatives.py pairwise.csv table.csv -k 20 --cost Price,Risk
+    python ahp_alternatives.py pairwise.csv table.npy -k 1000 -o top.csv
+
+The table is read in chunks of `chunk_rows` alternatives, from a CSV
+("alternative,C1,...,Cn" with criteria in any order) or a 2-D `.npy` file
+opened as a memmap, so memory and per-row speed do not depend on the
+number of alternatives.  Two passes:
+
+1. column statistics (min, max, Σx, Σx²) for the normalization;
+2. every normalization here is affine per column, x' = a·x + b (cost
+   criteria are mirrored), so the weighted score collapses to one
+   mat-vec per chunk:  score = X·(ω∘a) + Σ ωⱼbⱼ.
+
+Only the best `k` rows are kept, in a min-heap fed by a per-chunk
+argpartition.  Ties keep the earlier alternative.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import heapq
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ahp_engine import METHODS, run_ahp_csv, safe_csv
+
+NORMALIZATIONS = ("minmax", "max", "sum", "vector", "none")
+CHUNK_ROWS = 65_536
+_FORMULA_START = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _safe_name(name) -> str:
+    """safe_csv, with a leading = + - @ escaped by ' so that spreadsheets do
+    not evaluate alternative names (which come from arbitrary input files)."""
+    t = str(name if name is not None else "")
+    return safe_csv("'" + t if t.startswith(_FORMULA_START) else t)
+
+
+@dataclass
+class ColumnStats:
+    n: int
+    min: np.ndarray
+    max: np.ndarray
+    sum: np.ndarray
+    sumsq: np.ndarray
+
+
+@dataclass
+class ScoringResult:
+    criteria: List[str]
+    w: np.ndarray
+    normalization: str
+    n_alternatives: int
+    top: List[Tuple[str, float]]   # best first
+    stats: ColumnStats
+    elapsed: float
+
+    @property
+    def throughput(self) -> float:
+        """Alternatives per second over both passes."""
+        return self.n_alternatives / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def to_csv(self) -> str:
+        lines = ["rank,alternative,score"]
+        lines += [f"{r},{_safe_name(name)},{score:.9f}" for r, (name, score) in enumerate(self.top, 1)]
+        return "\n".join(lines)
+
+
+# ---------- sources ----------
+class PerformanceTable:
+    """A re-readable table: a CSV path, a .npy path (memmapped) or an array."""
+
+    def __init__(self, src: Union[str, Path, np.ndarray], criteria: Optional[Sequence[str]] = None,
+                 chunk_rows: int = CHUNK_ROWS):
+        self.src = src
+        self.chunk_rows = chunk_rows
+        self._csv = False
+        if isinstance(src, np.ndarray):
+            self._array = src
+        elif Path(src).suffix.lower() == ".npy":
+            self._array = np.load(src, mmap_mode="r")
+        else:
+            self._array = None
+            self._csv = True
+        if self._csv:
+            with open(src, newline="", encoding="utf-8-sig") as fh:
+                header = next(csv.reader(fh), None)
+            if not header or len(header) < 2:
+                raise ValueError("Performance table needs a header: alternative,C1,...,Cn.")
+            names = [h.strip() for h in header[1:]]
+        else:
+            if self._array.ndim != 2:
+                raise ValueError("Performance table array must be 2-D (alternatives × criteria).")
+            names = [f"C{j + 1}" for j in range(self._array.shape[1])]
+        self.columns = names
+        # column order that lines the table up with the AHP criteria
+        if criteria is None:
+            self.criteria, self._order = names, None
+        else:
+            missing = [c for c in criteria if c not in names]
+            if missing and self._csv:
+                raise ValueError(f"Criteria missing from the performance table: {missing}")
+            if missing:  # unlabeled array: positional
+                if len(criteria) != len(names):
+                    raise ValueError(f"Table has {len(names)} columns but {len(criteria)} criteria.")
+                self.criteria, self._order = list(criteria), None
+            else:
+                self.criteria = list(criteria)
+                order = np.array([names.index(c) for c in criteria])
+                self._order = None if np.array_equal(order, np.arange(len(names))) else order
+
+    def chunks(self) -> Iterator[Tuple[Sequence[str], np.ndarray]]:
+        """(alternative ids, float64 block of shape (rows, len(criteria)))."""
+        if self._csv:
+            yield from self._csv_chunks()
+            return
+        A = self._array
+        for s in range(0, A.shape[0], self.chunk_rows):
+            X = np.asarray(A[s:s + self.chunk_rows], dtype=np.float64)
+            if self._order is not None:
+                X = X[:, self._order]
+            yield range(s, s + X.shape[0]), X
+
+    def _csv_chunks(self):
+        with open(self.src, newline="", encoding="utf-8-sig") as fh:
+            reader = csv.reader(fh)
+            next(reader)
+            ncol = len(self.columns)
+            ids: List[str] = []
+            rows: List[List[str]] = []
+            for r in reader:
+                if not r or not r[0].strip():
+                    continue
+                if len(r) < ncol + 1:
+                    raise ValueError(f"Alternative {r[0]!r} has {len(r) - 1} values, expected {ncol}.")
+                ids.append(r[0].strip())
+                rows.append(r[1:ncol + 1])
+                if len(rows) == self.chunk_rows:
+                    yield ids, self._block(rows)
+                    ids, rows = [], []
+            if rows:
+                yield ids, self._block(rows)
+
+    def _block(self, rows: List[List[str]]) -> np.ndarray:
+        try:
+            X = np.array(rows, dtype=np.float64)
+        except ValueError as exc:
+            raise ValueError(f"Non-numeric value in the performance table: {exc}") from exc
+        return X if self._order is None else X[:, self._order]
+
+
+# ---------- pass 1 ----------
+def column_stats(table: PerformanceTable) -> ColumnStats:
+    k = len(table.criteria)
+    lo, hi = np.full(k, np.inf), np.full(k, -np.inf)
+    s, s2 = np.zeros(k), np.zeros(k)
+    n = 0
+    for _, X in table.chunks():
+        if not np.isfinite(X).all():
+            raise ValueError("Performance table contains NaN or infinite values.")
+        np.minimum(lo, X.min(axis=0), out=lo)
+        np.maximum(hi, X.max(axis=0), out=hi)
+        s += X.sum(axis=0)
+        s2 += np.einsum("ij,ij->j", X, X)
+        n += X.shape[0]
+    if n == 0:
+        raise ValueError("Performance table has no alternatives.")
+    return ColumnStats(n=n, min=lo, max=hi, sum=s, sumsq=s2)
+
+
+def affine_normalization(stats: ColumnStats, method: str = "minmax",
+                         cost: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(a, b) with x' = a·x + b per column; cost columns become 1 - x' (minmax: (max-x)/(max-min))."""
+    if method not in NORMALIZATIONS:
+        raise ValueError(f"Unknown normalization {method!r}; expected one of {NORMALIZATIONS}.")
+    k = stats.min.size
+    with np.errstate(divide="ignore"):
+        if method == "minmax":
+            span = stats.max - stats.min
+            a = np.where(span > 0, 1.0 / span, 0.0)
+            b = -stats.min * a
+        elif method == "max":
+            a = np.where(stats.max != 0, 1.0 / np.abs(stats.max), 0.0)
+            b = np.zeros(k)
+        elif method == "sum":
+            a = np.where(stats.sum != 0, 1.0 / np.abs(stats.sum), 0.0)
+            b = np.zeros(k)
+        elif method == "vector":
+            norm = np.sqrt(stats.sumsq)
+            a = np.where(norm > 0, 1.0 / norm, 0.0)
+            b = np.zeros(k)
+        else:
+            a, b = np.ones(k), np.zeros(k)
+    if cost is not None:
+        a = np.where(cost, -a, a)
+        if method != "none":
+            b = np.where(cost, 1.0 - b, b)
+    return a, b
+
+
+# ---------- pass 2 ----------
+def _push_top(heap: list, k: int, ids, scores: np.ndarray, offset: int) -> None:
+    """Keep the k best (score, -position) in a min-heap; earlier rows win ties."""
+    if k <= 0 or not scores.size:
+        return
+    if scores.size > k:
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(scores.size)
+    floor = heap[0][0] if len(heap) == k else -np.inf
+    for i in idx[scores[idx] >= floor].tolist():
+        item = (float(scores[i]), -(offset + i), ids[i])
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+
+def score_alternatives(table: Union[PerformanceTable, str, Path, np.ndarray], w, criteria: Optional[Sequence[str]] = None,
+                       k: int = 10, normalization: str = "minmax",
+                       cost: Optional[Sequence[str]] = None, chunk_rows: int = CHUNK_ROWS) -> ScoringResult:
+    """Stream the table twice and return the top-k weighted scores."""
+    t0 = time.perf_counter()
+    if not isinstance(table, PerformanceTable):
+        table = PerformanceTable(table, criteria, chunk_rows)
+    w = np.asarray(w, dtype=np.float64)
+    if w.size != len(table.criteria):
+        raise ValueError(f"{w.size} weights for {len(table.criteria)} criteria.")
+    cost_mask = None
+    if cost:
+        unknown = [c for c in cost if c not in table.criteria]
+        if unknown:
+            raise ValueError(f"Unknown cost criteria: {unknown}")
+        cost_mask = np.isin(table.criteria, list(cost))
+
+    stats = column_stats(table)
+    a, b = affine_normalization(stats, normalization, cost_mask)
+    coef = w * a
+    const = float(w @ b)
+
+    heap: list = []
+    seen = 0
+    for ids, X in table.chunks():
+        scores = X @ coef + const
+        _push_top(heap, k, ids, scores, seen)
+        seen += X.shape[0]
+
+    top = [(str(name), score) for score, _, name in sorted(heap, reverse=True)]
+    return ScoringResult(criteria=list(table.criteria), w=w, normalization=normalization,
+                         n_alternatives=seen, top=top, stats=stats, elapsed=time.perf_counter() - t0)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Rank alternatives with AHP criteria weights.")
+    ap.add_argument("pairwise", help="pairwise criteria CSV (the Step 1 format)")
+    ap.add_argument("table", help="performance table: CSV with an alternative column, or a 2-D .npy")
+    ap.add_argument("-k", "--top", type=int, default=10, help="alternatives to keep (default: 10)")
+    ap.add_argument("--normalize", choices=NORMALIZATIONS, default="minmax")
+    ap.add_argument("--cost", default="", help="comma-separated criteria where lower is better")
+    ap.add_argument("--method", choices=METHODS, default="gm", help="weighting method")
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    ap.add_argument("-o", "--out", default=None, help="write the ranking CSV here (default: stdout)")
+    args = ap.parse_args(argv)
+
+    ahp = run_ahp_csv(Path(args.pairwise).read_text(encoding="utf-8-sig"), method=args.method)
+    cost = [c.strip() for c in args.cost.split(",") if c.strip()]
+    res = score_alternatives(args.table, ahp.w, ahp.labels, k=args.top, normalization=args.normalize,
+                             cost=cost, chunk_rows=args.chunk_rows)
+    text = res.to_csv() + "\n"
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    print(f"Scored {res.n_alternatives} alternatives in {res.elapsed:.2f}s "
+          f"({res.throughput:,.0f}/s); CR = {ahp.CR:.4f}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
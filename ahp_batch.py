@@ -0,0 +1,147 @@
+# ahp_batch.py
+"""Command-line batch scoring of pairwise CSVs.
+
+    python ahp_batch.py matrices/ -o results/
+    python ahp_batch.py "stored/**/*.csv" -o results/ --method eigen -j 16
+
+Each input gets `<name>_results.csv` in the `buildResultsCSV` layout (or
+.npz/.parquet/.arrow with --format, see ahp_export), and `summary.csv`
+lists m, λmax, SI, CR and the decision for every file.  Results mirror the
+inputs' folders below their common parent, so `a/x.csv` and `b/x.csv` get
+`results/a/x_results.csv` and `results/b/x_results.csv`; files already
+inside the output directory are never taken as inputs.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from ahp_cache import ResultCache, payload_result
+from ahp_engine import METHODS, js_exponential
+from ahp_export import FORMATS, SUFFIXES, export_results
+from ahp_io import stream_pairwise_csv
+
+SUMMARY_FIELDS = ["file", "m", "lambda_max", "SI", "RI", "CR", "decision", "max_reciprocal_error", "error"]
+
+
+def collect_inputs(patterns: Iterable[str], exclude: Optional[Path] = None) -> List[Path]:
+    """Expand directories (all *.csv inside, recursively) and glob patterns.
+
+    Files under `exclude` (the output directory) are skipped, so a rerun
+    does not score its own results.
+    """
+    out: List[Path] = []
+    for pat in patterns:
+        p = Path(pat)
+        if p.is_dir():
+            out.extend(sorted(p.rglob("*.csv")))
+        else:
+            out.extend(Path(x) for x in sorted(glob.glob(pat, recursive=True)))
+    skip = exclude.resolve() if exclude is not None else None
+    seen = set()
+    keep = []
+    for p in out:
+        r = p.resolve()
+        if r in seen or (skip is not None and (r == skip or skip in r.parents)):
+            continue
+        seen.add(r)
+        keep.append(p)
+    return keep
+
+
+def input_root(inputs: Iterable[Path]) -> Optional[Path]:
+    """Deepest folder holding every input; result paths mirror the tree below it."""
+    parents = [str(p.resolve().parent) for p in inputs]
+    return Path(os.path.commonpath(parents)) if parents else None
+
+
+def result_path(src: Path, out_dir: Path, fmt: str = "csv", root: Optional[Path] = None) -> Path:
+    sub = src.resolve().parent.relative_to(root) if root is not None else Path()
+    return out_dir / sub / f"{src.stem}_results{SUFFIXES[fmt]}"
+
+
+_worker_cache: Optional[ResultCache] = None
+
+
+def _cache_for(cache_dir: Optional[str]) -> ResultCache:
+    """One cache per worker process; the disk layer is what workers share."""
+    global _worker_cache
+    if _worker_cache is None or str(_worker_cache.disk_dir or "") != str(cache_dir or ""):
+        _worker_cache = ResultCache(disk_dir=cache_dir)
+    return _worker_cache
+
+
+def score_file(src: Path, out_dir: Path, method: str = "gm", cache_dir: Optional[str] = None,
+               fmt: str = "csv", root: Optional[Path] = None) -> dict:
+    """Worker: read, score and write one matrix; never raises."""
+    row = {"file": str(src), "error": ""}
+    try:
+        mat = stream_pairwise_csv(src)
+        payload = _cache_for(cache_dir).run(mat.P, method=method)
+        res = payload_result(payload, mat.P, mat.labels)
+        dest = result_path(src, out_dir, fmt, root)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        export_results(res, dest, fmt)
+        row.update(m=res.m, lambda_max=f"{res.lam_max:.9f}", SI=f"{res.SI:.9f}",
+                   RI=f"{res.ri:.4f}", CR=f"{res.CR:.9f}", decision=res.decision,
+                   max_reciprocal_error=js_exponential(res.max_err))
+    except Exception as exc:  # one bad file must not stop an overnight run
+        row["error"] = f"{type(exc).__name__}: {exc}"
+    return row
+
+
+def run_batch(inputs: List[Path], out_dir: Path, method: str = "gm",
+              workers: Optional[int] = None, summary_name: str = "summary.csv",
+              cache_dir: Optional[str] = None, fmt: str = "csv") -> int:
+    """Score every input over a process pool; returns the number of failures."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(256, len(inputs) // (workers * 8) or 1))
+    failures = 0
+    job = partial(score_file, out_dir=out_dir, method=method, cache_dir=cache_dir, fmt=fmt,
+                  root=input_root(inputs))
+    with ExitStack() as stack:
+        fh = stack.enter_context(open(out_dir / summary_name, "w", newline="", encoding="utf-8"))
+        writer = csv.DictWriter(fh, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        if workers == 1:
+            rows = map(job, inputs)
+        else:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            rows = pool.map(job, inputs, chunksize=chunksize)
+        for row in rows:
+            failures += bool(row["error"])
+            writer.writerow(row)
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Score folders of AHP pairwise CSVs.")
+    ap.add_argument("inputs", nargs="+", help="directories or glob patterns of pairwise CSVs")
+    ap.add_argument("-o", "--out", default="ahp_results", help="output directory (default: ahp_results)")
+    ap.add_argument("--method", choices=METHODS, default="gm", help="weighting method (default: gm)")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="processes (default: all cores)")
+    ap.add_argument("--cache-dir", default=None, help="result cache directory shared by all workers")
+    ap.add_argument("--format", choices=FORMATS, default="csv", help="per-file results format (default: csv)")
+    args = ap.parse_args(argv)
+
+    inputs = collect_inputs(args.inputs, exclude=Path(args.out))
+    if not inputs:
+        print("No input CSV files found.", file=sys.stderr)
+        return 2
+    failures = run_batch(inputs, Path(args.out), method=args.method, workers=args.workers,
+                         cache_dir=args.cache_dir, fmt=args.format)
+    print(f"Scored {len(inputs) - failures}/{len(inputs)} matrices -> {Path(args.out) / 'summary.csv'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+# ahp_bench.py
+"""Reproducible benchmarks: parsing, both weighting methods, RI and export.
+
+    python ahp_bench.py                      # quick profile, compared with the baseline
+    python ahp_bench.py --profile full       # m up to 5,000, batches up to 100k
+    python ahp_bench.py --save               # store this run as the profile's baseline
+    python ahp_bench.py --only gm eigen      # a subset of the benchmarks
+
+Inputs are synthetic reciprocal matrices from a fixed seed, in three kinds:
+
+* random        log-uniform judgments in [1/9, 9]
+* near          consistent ωᵢ/ωⱼ times log-normal noise (σ = 0.1)
+* saaty         uniform over the 17 Saaty values (the RI distribution)
+
+Each case builds its input in an untimed setup step and drops it when
+done, so only one case's matrices are resident at a time.  A case runs at
+least `--repeat` times and until `--min-time` seconds have been spent
+(capped at MAX_REPEAT); it reports the median wall time, the spread
+(interquartile range / median), its throughput and the peak traced memory
+of one extra run (tracemalloc sees NumPy buffers).
+
+A case is a regression (exit status 1) when it is slower than the stored
+baseline by more than `--tolerance` and by more than three times the
+larger of the two spreads, and more than NOISE_FLOOR in absolute terms;
+short cases on a busy machine do not fail the gate on jitter alone.
+
+Before any timing the page's sample matrix (ahp_engine.SAMPLE_CSV) is run
+through both methods and checked against its known results; a mismatch
+exits with status 3.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import median
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import ahp_ri
+from ahp_engine import RI, SAMPLE_CSV, build_results_csv, run_ahp, run_ahp_batch, run_ahp_csv
+from ahp_export import export_results
+from ahp_io import stream_pairwise_csv
+
+BASELINE_VERSION = 1
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "ahp_bench_baseline.json"
+SEED = 20240101
+KINDS = ("random", "near", "saaty")
+BENCHMARKS = ("fixture", "parse", "gm", "eigen", "ri", "export")
+NOISE_FLOOR = 0.002  # seconds; smaller slowdowns are timer noise
+MIN_TIME = 0.2       # seconds of timed runs per case
+MAX_REPEAT = 200
+
+# m for the single-matrix cases, (n, m) for the batch cases
+PROFILES = {
+    "quick": {
+        "m": (3, 7, 15, 50, 200, 1000),
+        "batch": ((1, 7), (100, 7), (10_000, 7), (100_000, 7), (1_000, 50)),
+    },
+    "full": {
+        "m": (3, 7, 15, 50, 200, 1000, 2000, 5000),
+        "batch": ((1, 7), (100, 7), (1_000, 7), (10_000, 7), (100_000, 7),
+                  (100, 50), (1_000, 50), (10_000, 50), (100, 200)),
+    },
+}
+
+# Known results of the sample matrix: λmax, CR and ω at the CSV's 9 decimals
+FIXTURE = {
+    "gm": ("7.471737574", "0.059562825",
+           ("0.056600316", "0.080721200", "0.201668039", "0.078645884",
+            "0.201668039", "0.233357860", "0.147338661")),
+    "eigen": ("7.485011354", "0.061238807",
+              ("0.061542624", "0.082491644", "0.193735731", "0.081022807",
+               "0.193735731", "0.232221783", "0.155249680")),
+}
+
+
+# ---------- synthetic matrices ----------
+def synthetic(kind: str, n: int, m: int, seed: int = SEED) -> np.ndarray:
+    """(n, m, m) reciprocal matrices of one kind."""
+    rng = np.random.default_rng(seed)
+    if kind == "saaty":
+        return ahp_ri.random_saaty_batch(rng, n, m)
+    if kind == "random":
+        L = rng.uniform(-np.log(9.0), np.log(9.0), size=(n, m, m))
+    elif kind == "near":
+        x = rng.normal(size=(n, m, 1))
+        L = x - x.transpose(0, 2, 1) + rng.normal(scale=0.1, size=(n, m, m))
+    else:
+        raise ValueError(f"Unknown matrix kind {kind!r}; expected one of {KINDS}.")
+    L = np.triu(L, 1)
+    return np.exp(L - L.transpose(0, 2, 1))
+
+
+def matrix_csv(P: np.ndarray) -> str:
+    """A pairwise CSV as users write it: integers and 1/k for Saaty values."""
+    m = P.shape[0]
+    labels = [f"C{i + 1}" for i in range(m)]
+    cell = {v: (str(int(round(v))) if v >= 1 else f"1/{int(round(1 / v))}") for v in ahp_ri.SAATY_SCALE}
+    lines = ["Criteria," + ",".join(labels)]
+    for i in range(m):
+        lines.append(labels[i] + "," + ",".join(cell.get(v) or repr(v) for v in P[i].tolist()))
+    return "\n".join(lines) + "\n"
+
+
+# ---------- measurement ----------
+@dataclass
+class Case:
+    bench: str
+    name: str
+    units: float        # work items per run, for throughput
+    unit: str
+    setup: Callable[[], object]     # builds the input, untimed
+    fn: Callable[[object], object]  # the timed work on that input
+
+
+@dataclass
+class Measurement:
+    name: str
+    seconds: float
+    throughput: float
+    unit: str
+    peak_mb: float
+    spread: float = 0.0   # (p75 - p25) / median of the timed runs
+    runs: int = 0
+
+
+def measure(case: Case, repeat: int, min_time: float = MIN_TIME) -> Measurement:
+    data = case.setup()
+    try:
+        case.fn(data)  # warm-up: imports, RI cache, allocator
+        times: List[float] = []
+        while len(times) < MAX_REPEAT and (len(times) < repeat or sum(times) < min_time):
+            t0 = time.perf_counter()
+            case.fn(data)
+            times.append(time.perf_counter() - t0)
+        tracemalloc.start()
+        try:
+            case.fn(data)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    finally:
+        del data  # the next case's input is not built until this one is gone
+    t = median(times)
+    q1, q3 = np.percentile(times, [25, 75])
+    return Measurement(case.name, t, case.units / t if t > 0 else float("inf"), case.unit, peak / 2 ** 20,
+                       spread=float((q3 - q1) / t) if t > 0 else 0.0, runs=len(times))
+
+
+# ---------- cases ----------
+def check_fixture() -> List[str]:
+    """Mismatches of the sample matrix against FIXTURE (empty when correct)."""
+    errors = []
+    for method, (lam_max, cr, w) in FIXTURE.items():
+        res = run_ahp_csv(SAMPLE_CSV, method=method)
+        got = (f"{res.lam_max:.9f}", f"{res.CR:.9f}", tuple(f"{x:.9f}" for x in res.w))
+        if got != (lam_max, cr, w):
+            errors.append(f"{method}: expected λmax={lam_max} CR={cr} ω={w}, got {got}")
+        if not build_results_csv(res).startswith("AHP Results"):
+            errors.append(f"{method}: malformed results CSV")
+    return errors
+
+
+def build_cases(profile: str, only: Optional[List[str]] = None) -> List[Case]:
+    spec = PROFILES[profile]
+    want = set(only or BENCHMARKS)
+    cases: List[Case] = []
+
+    # inputs are built by each case's setup, never here: the full profile's
+    # m=5000 and 100k-matrix stacks must not all be resident at once
+    if "parse" in want:
+        for m in spec["m"]:
+            cases.append(Case("parse", f"parse/saaty/m={m}", m * m, "cells/s",
+                              lambda m=m: matrix_csv(synthetic("saaty", 1, m)[0]),
+                              lambda text: stream_pairwise_csv(io.StringIO(text, newline=""))))
+
+    for method in ("gm", "eigen"):
+        if method not in want:
+            continue
+        shapes = [(1, m) for m in spec["m"]] + [s for s in spec["batch"] if s[0] > 1]
+        for kind in KINDS:
+            for n, m in shapes:
+                fn = (lambda P, method=method: run_ahp(P[0], method=method)) if n == 1 else \
+                     (lambda P, method=method: run_ahp_batch(P, method=method))
+                cases.append(Case(method, f"{method}/{kind}/n={n}/m={m}", n, "matrices/s",
+                                  lambda kind=kind, n=n, m=m: synthetic(kind, n, m), fn))
+
+    if "ri" in want:
+        for m in spec["m"]:
+            def lookups(m, k=1000):
+                for _ in range(k):
+                    RI(m)
+            cases.append(Case("ri", f"ri/lookup/m={m}", 1000, "lookups/s", lambda m=m: m, lookups))
+
+    if "export" in want:
+        for m in spec["m"]:
+            for fmt in ("csv", "npz"):
+                cases.append(Case("export", f"export/{fmt}/m={m}", m * m, "cells/s",
+                                  lambda m=m: run_ahp(synthetic("near", 1, m)[0]),
+                                  lambda res, fmt=fmt: export_results(res, io.BytesIO(), fmt)))
+    return cases
+
+
+def warm_ri(ms) -> None:
+    """Simulate (once, cached by ahp_ri) the RI of every m in the profile, so
+    every case uses the simulated RI rather than the 1.98(m-2)/m fallback."""
+    for m in sorted(set(ms)):
+        t0 = time.perf_counter()
+        ahp_ri.lookup(m)
+        dt = time.perf_counter() - t0
+        if dt > 1.0:
+            print(f"  RI({m}) simulated in {dt:.1f}s (now cached)", file=sys.stderr)
+
+
+# ---------- baselines ----------
+def load_baseline(path: Path, profile: str) -> Dict[str, dict]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != BASELINE_VERSION:
+        return {}
+    return data.get("profiles", {}).get(profile, {}).get("cases", {})
+
+
+def save_baseline(path: Path, profile: str, results: List[Measurement]) -> None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") != BASELINE_VERSION:
+            data = {}
+    except (OSError, ValueError):
+        data = {}
+    data["version"] = BASELINE_VERSION
+    prof = data.setdefault("profiles", {}).setdefault(profile, {})
+    prof["machine"] = {"python": platform.python_version(), "numpy": np.__version__,
+                       "platform": platform.platform(), "processor": platform.machine()}
+    cases = prof.setdefault("cases", {})
+    for r in results:
+        cases[r.name] = {"seconds": float(f"{r.seconds:.6g}"), "peak_mb": round(r.peak_mb, 3),
+                         "spread": round(r.spread, 4)}
+    path.write_text(json.dumps(data, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def compare(r: Measurement, base: Optional[dict], tolerance: float) -> Tuple[str, bool]:
+    if not base:
+        return "new", False
+    ratio = r.seconds / base["seconds"] if base["seconds"] > 0 else float("inf")
+    noise = max(r.spread, base.get("spread", 0.0))
+    limit = max(tolerance, 1.0 + 3.0 * noise)
+    regressed = ratio > limit and r.seconds - base["seconds"] > NOISE_FLOOR
+    return f"{ratio:.2f}x" + (" REGRESSION" if regressed else ""), regressed
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the AHP engine.")
+    ap.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    ap.add_argument("--only", nargs="+", choices=BENCHMARKS, default=None, help="benchmarks to run")
+    ap.add_argument("--repeat", type=int, default=5, help="minimum timed runs per case (median is reported)")
+    ap.add_argument("--min-time", type=float, default=MIN_TIME, help="minimum seconds of timed runs per case")
+    ap.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="baseline JSON file")
+    ap.add_argument("--save", action="store_true", help="store this run as the profile's baseline")
+    ap.add_argument("--tolerance", type=float, default=1.5, help="slowdown factor that fails the run")
+    ap.add_argument("--json", default=None, help="also write the measurements to this JSON file")
+    args = ap.parse_args(argv)
+
+    if args.only is None or "fixture" in args.only:
+        errors = check_fixture()
+        for e in errors:
+            print(f"FIXTURE MISMATCH {e}", file=sys.stderr)
+        if errors:
+            return 3
+        print("fixture: sample matrix OK (gm, eigen)")
+
+    spec = PROFILES[args.profile]
+    warm_ri(list(spec["m"]) + [m for _, m in spec["batch"]])
+    baseline = load_baseline(Path(args.baseline), args.profile)
+
+    results: List[Measurement] = []
+    regressions = 0
+    print(f"{'case':<34}{'median ms':>12}{'spread':>8}{'throughput':>22}{'peak MB':>10}  vs baseline")
+    for case in build_cases(args.profile, args.only):
+        r = measure(case, args.repeat, args.min_time)
+        note, bad = compare(r, baseline.get(r.name), args.tolerance)
+        regressions += bad
+        results.append(r)
+        print(f"{r.name:<34}{r.seconds * 1e3:>12.3f}{r.spread:>8.1%}{r.throughput:>14.4g} {r.unit:<9}"
+              f"{r.peak_mb:>8.2f}  {note}",
+              flush=True)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps([r.__dict__ for r in results], indent=1) + "\n", encoding="utf-8")
+    if args.save:
+        save_baseline(Path(args.baseline), args.profile, results)
+        print(f"Baseline for profile {args.profile!r} saved to {args.baseline}")
+        return 0
+    if regressions:
+        print(f"{regressions} regression(s) beyond {args.tolerance}x", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+# ahp_cache.py
+"""Server-side cache of AHP results keyed by a normalized matrix hash.
+
+The key is a SHA-256 of the shape, the method options (eigen tolerance and
+iteration cap included), the RI the result would use and log P rounded to
+12 decimals, so `1/3` and `0.333333333333` typed by different users hit the
+same entry.  Because RI is hashed, a value precomputed by ahp_ri after an
+entry was stored gives a new key instead of the stale CR.  Labels are not
+part of the key; the payload is positional.
+
+Two layers:
+
+* an in-process LRU bounded by entry count and payload bytes, shared by
+  every Streamlit session (see `shared_cache`), guarded by a lock;
+* an optional directory of JSON payloads shared by every process on the
+  host (batch workers, several Streamlit servers), written atomically and
+  pruned oldest-first when it exceeds `disk_entries`.
+
+`stats()` exposes hit/miss/eviction counters for monitoring.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from ahp_engine import EIGEN_MAX_ITER, EIGEN_TOL, RI, AHPResult, default_labels, run_ahp
+
+CACHE_FORMAT = 2
+
+
+def matrix_key(P, method: str = "gm", log_space: bool = True,
+               tol: float = EIGEN_TOL, max_iter: int = EIGEN_MAX_ITER) -> str:
+    A = np.asarray(P, dtype=np.float64)
+    ri = RI(A.shape[-1]) if A.ndim else 0.0
+    h = hashlib.sha256(f"v{CACHE_FORMAT}|{A.shape}|{method}|{int(log_space)}|{tol!r}|{max_iter}|"
+                       f"{ri!r}|".encode())
+    h.update(np.ascontiguousarray(np.round(np.log(A), 12) + 0.0).tobytes())  # +0.0 folds -0.0
+    return h.hexdigest()
+
+
+def result_payload(res: AHPResult) -> dict:
+    """The ω/λ/CR part of a result as plain JSON types."""
+    return {
+        "m": res.m,
+        "method": res.method,
+        "log_Pi": res.log_Pi.tolist(),
+        "GM": res.GM.tolist(),
+        "w": res.w.tolist(),
+        "Pw": res.Pw.tolist(),
+        "lam": res.lam.tolist(),
+        "lam_max": res.lam_max,
+        "SI": res.SI,
+        "RI": res.ri,
+        "CR": res.CR,
+        "decision": res.decision,
+        "max_reciprocal_error": res.max_err,
+        "iterations": res.iterations,
+    }
+
+
+def payload_result(payload: dict, P, labels: Optional[Sequence[str]] = None) -> AHPResult:
+    """Rebuild a full AHPResult from a cached payload and the matrix it came from."""
+    P = np.asarray(P, dtype=np.float64)
+    w = np.asarray(payload["w"])
+    log_Pi = np.asarray(payload["log_Pi"])
+    with np.errstate(over="ignore", under="ignore"):
+        Pi = np.exp(log_Pi)
+    return AHPResult(
+        labels=list(labels) if labels is not None else default_labels(payload["m"]),
+        m=payload["m"], P=P, Pi=Pi, log_Pi=log_Pi, GM=np.asarray(payload["GM"]), w=w,
+        Mul=P * w[None, :], Pw=np.asarray(payload["Pw"]), lam=np.asarray(payload["lam"]),
+        lam_max=payload["lam_max"], SI=payload["SI"], ri=payload["RI"], CR=payload["CR"],
+        max_err=payload["max_reciprocal_error"], method=payload["method"],
+        iterations=payload["iterations"],
+    )
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = 10_000, max_bytes: int = 256 * 2 ** 20,
+                 disk_dir: Optional[str] = None, disk_entries: int = 100_000):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_entries = disk_entries
+        self._mem: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (payload, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    # ---------- memory layer ----------
+    def _remember(self, key: str, payload: dict, nbytes: int) -> None:
+        with self._lock:
+            if key in self._mem:
+                self._bytes -= self._mem.pop(key)[1]
+            self._mem[key] = (payload, nbytes)
+            self._bytes += nbytes
+            while self._mem and (len(self._mem) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, n) = self._mem.popitem(last=False)
+                self._bytes -= n
+                self.evictions += 1
+
+    # ---------- disk layer ----------
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        if self.disk_dir is None:
+            return None
+        p = self._disk_path(key)
+        try:
+            text = p.read_text(encoding="utf-8")
+            os.utime(p)  # keep recently used entries out of the pruning
+            return text
+        except OSError:
+            return None
+
+    def _disk_put(self, key: str, text: str) -> None:
+        if self.disk_dir is None:
+            return
+        p = self._disk_path(key)
+        try:
+            p.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=p.parent, prefix=".tmp.")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(text)
+            os.replace(tmp, p)
+        except OSError:
+            return
+        self._puts_since_prune += 1
+        if self._puts_since_prune >= max(1, self.disk_entries // 100):
+            self._puts_since_prune = 0
+            self.prune_disk()
+
+    def prune_disk(self) -> int:
+        """Delete the least recently used files beyond disk_entries."""
+        if self.disk_dir is None:
+            return 0
+        files = list(self.disk_dir.glob("*/*.json"))
+        extra = len(files) - self.disk_entries
+        if extra <= 0:
+            return 0
+        files.sort(key=lambda f: f.stat().st_mtime)
+        for f in files[:extra]:
+            f.unlink(missing_ok=True)
+        return extra
+
+    # ---------- API ----------
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return item[0]
+        text = self._disk_get(key)
+        if text is not None:
+            payload = json.loads(text)
+            self._remember(key, payload, len(text))
+            with self._lock:
+                self.disk_hits += 1
+            return payload
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, payload: dict) -> None:
+        text = json.dumps(payload)
+        self._remember(key, payload, len(text))
+        self._disk_put(key, text)
+
+    def run(self, P, method: str = "gm", log_space: bool = True,
+            labels: Optional[Sequence[str]] = None, tol: float = EIGEN_TOL,
+            max_iter: int = EIGEN_MAX_ITER) -> dict:
+        """Cached result_payload(run_ahp(P)); labels are attached, not hashed."""
+        key = matrix_key(P, method, log_space, tol, max_iter)
+        payload = self.get(key)
+        if payload is None:
+            payload = result_payload(run_ahp(P, method=method, log_space=log_space,
+                                             tol=tol, max_iter=max_iter))
+            self.put(key, payload)
+        if labels is not None:
+            payload = {**payload, "labels": list(labels)}
+        return payload
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._mem),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._bytes = 0
+
+
+_shared: Optional[ResultCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache() -> ResultCache:
+    """Process-wide cache; set AHP_RESULT_CACHE_DIR to add the disk layer."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ResultCache(disk_dir=os.environ.get("AHP_RESULT_CACHE_DIR") or None)
+        return _shared
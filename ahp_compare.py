@@ -0,0 +1,203 @@
+# ahp_compare.py
+"""Several weight-derivation methods on one parsed matrix, side by side.
+
+    python ahp_compare.py pairwise.csv
+    python ahp_compare.py pairwise.csv --methods gm eigen -o compare.csv
+
+Methods:
+
+* gm       geometric mean of the rows (Steps 2-4)
+* colsum   mean of the columns normalized by their sums (Saaty's
+           approximation, "normalized column sums")
+* eigen    principal eigenvector (power iteration started from gm)
+* llsm     logarithmic least squares, xᵢ - xⱼ ≈ log pᵢⱼ over every ordered
+           pair.  On a complete matrix xᵢ is the row mean of the
+           antisymmetric part (log P - log Pᵀ)/2, which equals the gm row
+           mean only when P is reciprocal (Crawford & Williams)
+
+The intermediates are computed once and shared: log P (gm, llsm and eigen's start), the
+column sums (colsum) and a single P·W product for the ω of every method
+at once (Step 5), from which each λᵢ and λmax follow.  The eigenvector's
+λmax is its Perron root.  Rank correlations (Spearman ρ and Kendall τ-b,
+ties averaged) compare the orderings the methods give.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.stats import kendalltau, rankdata
+
+from ahp_engine import (CR_THRESHOLD, EIGEN_MAX_ITER, EIGEN_TOL, as_batch, consistency,
+                        default_labels, parse_pairwise_csv, power_iteration, safe_csv)
+
+COMPARE_METHODS = ("gm", "colsum", "eigen", "llsm")
+TIE_DECIMALS = 12
+
+
+@dataclass
+class ComparisonResult:
+    labels: List[str]
+    m: int
+    methods: List[str]
+    W: np.ndarray          # (m, K) one ω column per method
+    Pw: np.ndarray         # (m, K)
+    lam_max: np.ndarray    # (K,)
+    SI: np.ndarray         # (K,)
+    ri: float
+    CR: np.ndarray         # (K,)
+    spearman: np.ndarray   # (K, K)
+    kendall: np.ndarray    # (K, K)
+    iterations: int        # power-iteration steps, 0 without eigen
+    timings: List[Tuple[str, float]]   # (stage, seconds); shared stages first
+
+    def weights(self, method: str) -> np.ndarray:
+        return self.W[:, self.methods.index(method)]
+
+    def decision(self, k: int) -> str:
+        return "ACCEPTABLE" if self.CR[k] <= CR_THRESHOLD else "NOT OK"
+
+    def to_csv(self) -> str:
+        lines = ["AHP Method Comparison", "", "Consistency",
+                 "method,lambda_max,SI,RI,CR,decision"]
+        for k, name in enumerate(self.methods):
+            lines.append(f"{name},{self.lam_max[k]:.9f},{self.SI[k]:.9f},{self.ri:.4f},"
+                         f"{self.CR[k]:.9f},{self.decision(k)}")
+        lines += ["", "Weights", ",".join(["criteria"] + self.methods)]
+        for i, label in enumerate(self.labels):
+            lines.append(",".join([safe_csv(label)] + [f"{x:.9f}" for x in self.W[i]]))
+        for title, R in (("Rank correlation (Spearman)", self.spearman),
+                         ("Rank correlation (Kendall tau-b)", self.kendall)):
+            lines += ["", title, ",".join(["method"] + self.methods)]
+            for k, name in enumerate(self.methods):
+                lines.append(",".join([name] + [f"{x:.6f}" for x in R[k]]))
+        lines += ["", "Timings", "stage,ms"]
+        lines += [f"{stage},{sec * 1000:.3f}" for stage, sec in self.timings]
+        return "\n".join(lines)
+
+
+def _ranks(W: np.ndarray) -> np.ndarray:
+    """(m, K) descending ranks, ties averaged; weights equal to TIE_DECIMALS
+    relative digits count as tied (3/5 and 0.6 typed differently)."""
+    scaled = np.round(W / W.max(axis=0, keepdims=True), TIE_DECIMALS)
+    return rankdata(-scaled, axis=0)
+
+
+def rank_correlations(W: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(Spearman ρ, Kendall τ-b) between every pair of ω columns."""
+    R = _ranks(W)
+    K = W.shape[1]
+    Z = R - R.mean(axis=0)
+    norm = np.sqrt((Z * Z).sum(axis=0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rho = (Z.T @ Z) / np.outer(norm, norm)
+    tau = np.eye(K)
+    for a in range(K):
+        for b in range(a + 1, K):
+            tau[a, b] = tau[b, a] = kendalltau(R[:, a], R[:, b])[0]
+    rho[np.isnan(rho)] = 1.0   # constant rankings (every ω equal) agree trivially
+    tau[np.isnan(tau)] = 1.0
+    return rho, tau
+
+
+def compare_methods(P, labels: Optional[Sequence[str]] = None,
+                    methods: Sequence[str] = COMPARE_METHODS,
+                    tol: float = EIGEN_TOL, max_iter: int = EIGEN_MAX_ITER) -> ComparisonResult:
+    """Every method in `methods` from one pass over P."""
+    methods = list(dict.fromkeys(methods))
+    unknown = [x for x in methods if x not in COMPARE_METHODS]
+    if unknown or not methods:
+        raise ValueError(f"Unknown methods {unknown}; expected some of {COMPARE_METHODS}.")
+    A = as_batch(P)
+    if A.shape[0] != 1:
+        raise ValueError("compare_methods expects one (m, m) matrix.")
+    A = A[0]
+    if not np.all(np.isfinite(A)) or np.any(A <= 0):
+        raise ValueError("Invalid value: every pᵢⱼ must be a positive finite number.")
+    m = A.shape[0]
+    timings: List[Tuple[str, float]] = []
+    clock = time.perf_counter
+
+    need_log = any(x in methods for x in ("gm", "llsm", "eigen"))
+    logA = log_mean = None
+    if need_log:
+        t = clock()
+        logA = np.log(A)                             # shared: gm, llsm, eigen's start
+        log_mean = logA.mean(axis=1)
+        timings.append(("log_P", clock() - t))
+    col = None
+    if "colsum" in methods:
+        t = clock()
+        col = A.sum(axis=0)                          # shared: colsum
+        timings.append(("column_sums", clock() - t))
+
+    W = np.empty((m, len(methods)))
+    own: List[Tuple[str, float]] = []
+    gm = None
+    if log_mean is not None:
+        t = clock()
+        gm = np.exp(log_mean - log_mean.max())       # shifting by the max keeps exp finite
+        gm /= gm.sum()
+        (own if "gm" in methods else timings).append(("gm", clock() - t))
+    lam_eig, iterations = None, 0
+    for k, name in enumerate(methods):
+        t = clock()
+        if name == "gm":
+            W[:, k] = gm
+            continue
+        if name == "llsm":
+            x = ((logA - logA.T) / 2.0).mean(axis=1)
+            x = np.exp(x - x.max())
+            W[:, k] = x / x.sum()
+        elif name == "colsum":
+            W[:, k] = A @ (1.0 / col) / m
+        else:
+            w, lam, it = power_iteration(A[None], gm[None], tol=tol, max_iter=max_iter)
+            W[:, k], lam_eig, iterations = w[0], float(lam[0]), int(it[0])
+        own.append((name, clock() - t))
+
+    t = clock()
+    Pw = A @ W                                       # Step 5 for every method at once
+    lam = Pw / np.where(W == 0, 1e-18, W)
+    lam_max = lam.mean(axis=0)
+    if lam_eig is not None:
+        lam_max[methods.index("eigen")] = lam_eig
+    SI, ri, CR = consistency(lam_max, m)
+    timings.append(("Pw", clock() - t))
+
+    t = clock()
+    rho, tau = rank_correlations(W)
+    timings.append(("rank_correlation", clock() - t))
+    # per-method stages in `methods` order, after the shared ones
+    order = {name: i for i, name in enumerate(methods)}
+    timings += sorted(own, key=lambda s: order[s[0]])
+    return ComparisonResult(
+        labels=list(labels) if labels is not None else default_labels(m), m=m, methods=methods,
+        W=W, Pw=Pw, lam_max=lam_max, SI=np.atleast_1d(SI), ri=ri, CR=np.atleast_1d(CR),
+        spearman=rho, kendall=tau, iterations=iterations, timings=timings)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Compare AHP weighting methods on one matrix.")
+    ap.add_argument("pairwise", help="pairwise criteria CSV (the Step 1 format)")
+    ap.add_argument("--methods", nargs="+", choices=COMPARE_METHODS, default=list(COMPARE_METHODS))
+    ap.add_argument("-o", "--out", default=None, help="write the comparison CSV here (default: stdout)")
+    args = ap.parse_args(argv)
+
+    labels, _, P = parse_pairwise_csv(Path(args.pairwise).read_text(encoding="utf-8-sig"))
+    res = compare_methods(P, labels, args.methods)
+    text = res.to_csv() + "\n"
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
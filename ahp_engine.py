@@ -0,0 +1,470 @@
+# ahp_engine.py
+"""NumPy port of the `initAHP` pipeline (Steps 2-7) embedded in app.py.
+
+Every function works on a stack of pairwise matrices shaped (N, m, m); a
+single (m, m) matrix is treated as a batch of one.  Outputs match the
+inline JavaScript and `buildResultsCSV` field for field.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+CR_THRESHOLD = 0.10
+
+# Weighting modes: Saaty geometric mean (Steps 2-4) or principal eigenvector
+METHODS = ("gm", "eigen")
+EIGEN_TOL = 1e-12
+EIGEN_MAX_ITER = 1000
+
+# The page's sample matrix; app.load_sample_csv_text() serves this text
+SAMPLE_CSV = (
+    "Criteria,B1,B2,B3,B4,B5,B6,B7\n"
+    "B1,1,1/2,1/3,1/3,1/3,1/5,1\n"
+    "B2,2,1,1/3,1,1/3,1/5,1\n"
+    "B3,3,3,1,3,1,1,1\n"
+    "B4,3,1,1/3,1,1/3,1/3,1/3\n"
+    "B5,3,3,1,3,1,1,1\n"
+    "B6,5,5,1,3,1,1,1\n"
+    "B7,1,1,1,3,1,1,1\n"
+)
+
+# Saaty RI table (same values as RI_TABLE in app.py)
+RI_TABLE = {1: 0.0, 2: 0.0, 3: 0.58, 4: 0.90, 5: 1.12, 6: 1.24, 7: 1.32, 8: 1.41,
+            9: 1.45, 10: 1.49, 11: 1.51, 12: 1.48, 13: 1.56, 14: 1.57, 15: 1.59}
+
+
+def RI(m: int) -> float:
+    """Saaty's table up to m=15, then the simulated value cached by ahp_ri.
+
+    Never simulates: an uncached m falls back to 1.98(m-2)/m, the same rule
+    as the page's RI().  Precompute with `python ahp_ri.py 16 1000`.
+    """
+    if m in RI_TABLE:
+        return RI_TABLE[m]
+    if m <= 2:
+        return 0.0
+    try:
+        import ahp_ri
+        ri = ahp_ri.lookup(m, compute=False)
+    except ImportError:
+        ri = None
+    return ri if ri is not None else 1.98 * (m - 2) / m
+
+
+# ---------- results ----------
+@dataclass
+class AHPResult:
+    """Steps 2-7 for one matrix (the `resObj` built in initAHP)."""
+    labels: List[str]
+    m: int
+    P: Optional[np.ndarray]    # None when computed from a packed triangle
+    Pi: np.ndarray
+    log_Pi: np.ndarray
+    GM: np.ndarray
+    w: np.ndarray
+    Mul: Optional[np.ndarray]
+    Pw: np.ndarray
+    lam: np.ndarray
+    lam_max: float
+    SI: float
+    ri: float
+    CR: float
+    max_err: float
+    method: str = "gm"
+    iterations: int = 0
+    elapsed: float = 0.0
+    timings: Optional[List[Tuple[str, float]]] = None   # (stage, seconds), the "Timings" section
+
+    @property
+    def sum_gm(self) -> float:
+        return float(self.GM.sum()) or 1.0
+
+    @property
+    def acceptable(self) -> bool:
+        return self.CR <= CR_THRESHOLD
+
+    @property
+    def decision(self) -> str:
+        return "ACCEPTABLE" if self.acceptable else "NOT OK"
+
+
+@dataclass
+class AHPBatch:
+    """Steps 2-7 for N matrices of the same size; every array has a leading N axis."""
+    m: int
+    P: np.ndarray        # (N, m, m)
+    Pi: np.ndarray       # (N, m); may be inf/0 for large m, see log_Pi
+    log_Pi: np.ndarray   # (N, m)
+    GM: np.ndarray       # (N, m)
+    w: np.ndarray        # (N, m)
+    Mul: np.ndarray      # (N, m, m)
+    Pw: np.ndarray       # (N, m)
+    lam: np.ndarray      # (N, m)
+    lam_max: np.ndarray  # (N,)
+    SI: np.ndarray       # (N,)
+    ri: float
+    CR: np.ndarray       # (N,)
+    max_err: np.ndarray  # (N,)
+    method: str = "gm"
+    iterations: Optional[np.ndarray] = None  # (N,) power-iteration steps, eigen only
+    elapsed: float = 0.0                     # seconds spent in power iteration
+
+    def __len__(self) -> int:
+        return self.P.shape[0]
+
+    @property
+    def acceptable(self) -> np.ndarray:
+        return self.CR <= CR_THRESHOLD
+
+    def item(self, k: int, labels: Optional[Sequence[str]] = None) -> AHPResult:
+        labels = list(labels) if labels is not None else default_labels(self.m)
+        return AHPResult(
+            labels=labels, m=self.m, P=self.P[k], Pi=self.Pi[k], log_Pi=self.log_Pi[k],
+            GM=self.GM[k], w=self.w[k], Mul=self.Mul[k], Pw=self.Pw[k], lam=self.lam[k],
+            lam_max=float(self.lam_max[k]), SI=float(self.SI[k]), ri=self.ri,
+            CR=float(self.CR[k]), max_err=float(self.max_err[k]), method=self.method,
+            iterations=int(self.iterations[k]) if self.iterations is not None else 0,
+            elapsed=self.elapsed,
+        )
+
+
+def default_labels(m: int) -> List[str]:
+    return [f"C{i + 1}" for i in range(m)]
+
+
+# ---------- core ----------
+def as_batch(P) -> np.ndarray:
+    """Coerce one (m, m) matrix or a (N, m, m) stack to float64 (N, m, m)."""
+    A = np.asarray(P, dtype=np.float64)
+    if A.ndim == 2:
+        A = A[None]
+    if A.ndim != 3 or A.shape[1] != A.shape[2]:
+        raise ValueError("Matrix must be square: number of columns must equal number of rows.")
+    if A.shape[1] < 2:
+        raise ValueError("Need at least 2 criteria.")
+    return A
+
+
+def reciprocal_error(P: np.ndarray) -> np.ndarray:
+    """max |p_ii - 1| and max |p_ij * p_ji - 1| over i < j, per matrix."""
+    A = as_batch(P)
+    m = A.shape[1]
+    diag = np.abs(np.diagonal(A, axis1=1, axis2=2) - 1.0).max(axis=1)
+    iu, ju = np.triu_indices(m, 1)
+    off = np.abs(A[:, iu, ju] * A[:, ju, iu] - 1.0)
+    return np.maximum(diag, off.max(axis=1)) if off.size else diag
+
+
+def consistency(lam_max, m: int):
+    """Step 7: (SI, RI, CR) from λmax; accepts scalars or arrays."""
+    lam_max = np.asarray(lam_max, dtype=np.float64)
+    SI = np.zeros_like(lam_max) if m <= 2 else (lam_max - m) / (m - 1)
+    ri = RI(m)
+    CR = np.zeros_like(SI) if ri == 0 else SI / ri
+    return SI, ri, CR
+
+
+def power_iteration(A: np.ndarray, w0: np.ndarray, tol: float = EIGEN_TOL,
+                    max_iter: int = EIGEN_MAX_ITER):
+    """Principal eigenvector of each matrix in A (N, m, m), started from w0 (N, m).
+
+    Returns (w, lam_max, iterations); w sums to 1 and lam_max is the Perron
+    root.  Matrices drop out of the loop as soon as max |w_k+1 - w_k| < tol,
+    so a good start (the GM weights) costs only a few products.
+    """
+    w = np.array(w0, dtype=np.float64, copy=True)
+    lam = np.zeros(A.shape[0])
+    iters = np.zeros(A.shape[0], dtype=np.int64)
+    active = np.arange(A.shape[0])
+    A_act = A
+    for k in range(1, max_iter + 1):
+        y = np.matmul(A_act, w[active, :, None])[:, :, 0]
+        s = y.sum(axis=1)              # = λ when sum(w) == 1
+        y /= s[:, None]
+        done = np.abs(y - w[active]).max(axis=1) < tol
+        w[active] = y
+        lam[active] = s
+        iters[active] = k
+        if done.any():
+            active = active[~done]
+            if not active.size:
+                break
+            A_act = A_act[~done]  # copy only when the active set shrinks
+    return w, lam, iters
+
+
+def run_ahp_batch(P, log_space: bool = True, method: str = "gm",
+                  tol: float = EIGEN_TOL, max_iter: int = EIGEN_MAX_ITER) -> AHPBatch:
+    """Steps 2-7 of initAHP on every matrix of the stack in one array pass.
+
+    With `log_space` (the default) GM is computed as exp(mean(log pᵢⱼ)), which
+    stays finite for any m; Π is then only a display value and may overflow
+    to inf or underflow to 0 while log_Pi stays exact.  `log_space=False`
+    reproduces the direct row product of the original JavaScript.
+
+    `method="eigen"` replaces the Step 4 weights with the principal
+    eigenvector, found by power iteration seeded with the GM weights; Steps
+    5-7 then run on that ω and λmax is the exact Perron root.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown weighting method {method!r}; expected one of {METHODS}.")
+    A = as_batch(P)
+    if not np.all(np.isfinite(A)) or np.any(A <= 0):
+        raise ValueError("Invalid value: every pᵢⱼ must be a positive finite number.")
+    m = A.shape[1]
+
+    max_err = reciprocal_error(A)
+
+    # Step 2-4: Π, GM, ω
+    if log_space:
+        log_Pi = np.log(A).sum(axis=2)
+        with np.errstate(over="ignore", under="ignore"):
+            Pi = np.exp(log_Pi)
+        GM = np.exp(log_Pi / m)
+    else:
+        Pi = A.prod(axis=2)
+        with np.errstate(divide="ignore"):
+            log_Pi = np.log(Pi)
+        GM = Pi ** (1.0 / m)
+    sum_gm = GM.sum(axis=1, keepdims=True)
+    sum_gm[sum_gm == 0] = 1.0
+    w = GM / sum_gm
+
+    iterations, elapsed = None, 0.0
+    if method == "eigen":
+        t0 = time.perf_counter()
+        w, lam_eig, iterations = power_iteration(A, w, tol=tol, max_iter=max_iter)
+        elapsed = time.perf_counter() - t0
+
+    # Step 5: p_ij * w_j and row sums
+    Mul = A * w[:, None, :]
+    Pw = Mul.sum(axis=2)
+
+    # Step 6: λ_i and λmax
+    lam = Pw / np.where(w == 0, 1e-18, w)
+    lam_max = lam_eig if method == "eigen" else lam.mean(axis=1)
+
+    SI, ri, CR = consistency(lam_max, m)
+    return AHPBatch(m=m, P=A, Pi=Pi, log_Pi=log_Pi, GM=GM, w=w, Mul=Mul, Pw=Pw,
+                    lam=lam, lam_max=lam_max, SI=SI, ri=ri, CR=CR, max_err=max_err,
+                    method=method, iterations=iterations, elapsed=elapsed)
+
+
+def run_ahp(P, labels: Optional[Sequence[str]] = None, **kwargs) -> AHPResult:
+    """Single-matrix convenience wrapper around run_ahp_batch."""
+    A = np.asarray(P, dtype=np.float64)
+    if A.ndim != 2:
+        raise ValueError("run_ahp expects one (m, m) matrix; use run_ahp_batch for stacks.")
+    return run_ahp_batch(A, **kwargs).item(0, labels)
+
+
+# ---------- packed upper triangle (see ahp_io.PackedPairwise) ----------
+def _packed_rows(tri: np.ndarray, m: int):
+    """Yield (i, p_i,i+1..m-1) from a row-major strict upper triangle."""
+    s = 0
+    for i in range(m - 1):
+        e = s + m - i - 1
+        yield i, np.asarray(tri[s:e], dtype=np.float64)
+        s = e
+
+
+def packed_log_row_sums(tri: np.ndarray, m: int) -> np.ndarray:
+    """log Πᵢ from the triangle alone: upper cells add, mirrored cells subtract."""
+    out = np.zeros(m)
+    for i, seg in _packed_rows(tri, m):
+        L = np.log(seg)
+        out[i] += L.sum()
+        out[i + 1:] -= L
+    return out
+
+
+def packed_matvec(tri: np.ndarray, m: int, w: np.ndarray) -> np.ndarray:
+    """P @ w for the reciprocal matrix encoded by tri, without expanding it."""
+    y = np.array(w, dtype=np.float64, copy=True)  # p_ii = 1
+    for i, seg in _packed_rows(tri, m):
+        y[i] += seg @ w[i + 1:]
+        y[i + 1:] += w[i] / seg
+    return y
+
+
+def run_ahp_packed(tri: np.ndarray, m: int, labels: Optional[Sequence[str]] = None,
+                   method: str = "gm", tol: float = EIGEN_TOL,
+                   max_iter: int = EIGEN_MAX_ITER) -> AHPResult:
+    """Steps 2-7 straight from a packed triangle (float32/float64, memmap ok).
+
+    Works one triangle row at a time, so extra memory is O(m).  The matrix
+    is reciprocal by construction, hence max_err is 0; P and Mul are left
+    as None.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown weighting method {method!r}; expected one of {METHODS}.")
+    if m < 2:
+        raise ValueError("Need at least 2 criteria.")
+    if len(tri) != m * (m - 1) // 2:
+        raise ValueError("Packed triangle length does not match m(m-1)/2.")
+
+    log_Pi = packed_log_row_sums(tri, m)
+    if not np.all(np.isfinite(log_Pi)):
+        raise ValueError("Invalid value: every pᵢⱼ must be a positive finite number.")
+    with np.errstate(over="ignore", under="ignore"):
+        Pi = np.exp(log_Pi)
+    GM = np.exp(log_Pi / m)
+    w = GM / (GM.sum() or 1.0)
+
+    iterations, elapsed = 0, 0.0
+    if method == "eigen":
+        t0 = time.perf_counter()
+        for iterations in range(1, max_iter + 1):
+            y = packed_matvec(tri, m, w)
+            lam_eig = y.sum()
+            y /= lam_eig
+            done = np.abs(y - w).max() < tol
+            w = y
+            if done:
+                break
+        elapsed = time.perf_counter() - t0
+
+    Pw = packed_matvec(tri, m, w)
+    lam = Pw / np.where(w == 0, 1e-18, w)
+    lam_max = float(lam_eig) if method == "eigen" else float(lam.mean())
+    SI, ri, CR = consistency(lam_max, m)
+    return AHPResult(
+        labels=list(labels) if labels is not None else default_labels(m), m=m, P=None,
+        Pi=Pi, log_Pi=log_Pi, GM=GM, w=w, Mul=None, Pw=Pw, lam=lam, lam_max=lam_max,
+        SI=float(SI), ri=ri, CR=float(CR), max_err=0.0, method=method,
+        iterations=iterations, elapsed=elapsed,
+    )
+
+
+# ---------- CSV parsing (parseCSVText / parseRatio) ----------
+def parse_ratio(v) -> float:
+    s = str(v if v is not None else "").strip()
+    if not s:
+        return float("nan")
+    try:
+        if "/" in s:
+            parts = s.split("/")
+            if len(parts) != 2:
+                return float("nan")
+            a, b = float(parts[0].strip()), float(parts[1].strip())
+            if not (np.isfinite(a) and np.isfinite(b)) or b == 0:
+                return float("nan")
+            return a / b
+        x = float(s)
+    except ValueError:
+        return float("nan")
+    return x if np.isfinite(x) else float("nan")
+
+
+def parse_pairwise_csv(text: str):
+    """Parse the Step 1 upload format into (row_labels, col_labels, P)."""
+    arr = [[c.strip() for c in r] for r in csv.reader(io.StringIO(text))]
+    arr = [r for r in arr if r]
+    if not arr or len(arr[0]) < 2:
+        raise ValueError("Empty or malformed CSV.")
+
+    col_labels = arr[0][1:]
+    row_labels = [r[0] for r in arr[1:] if r[0] != ""]
+    m = len(row_labels)
+    if m < 2:
+        raise ValueError("Need at least 2 criteria.")
+    if len(col_labels) != m:
+        raise ValueError("Matrix must be square: number of columns must equal number of rows.")
+
+    P = np.empty((m, m), dtype=np.float64)
+    for i in range(m):
+        r = arr[i + 1] if i + 1 < len(arr) else None
+        if r is None or len(r) < m + 1:
+            raise ValueError("Some rows are incomplete.")
+        for j in range(m):
+            v = parse_ratio(r[j + 1])
+            if not np.isfinite(v) or v <= 0:
+                raise ValueError(f"Invalid value at row {row_labels[i]}, col {col_labels[j]}")
+            P[i, j] = v
+    return row_labels, col_labels, P
+
+
+def run_ahp_csv(text: str, **kwargs) -> AHPResult:
+    t0 = time.perf_counter()
+    labels, _, P = parse_pairwise_csv(text)
+    t1 = time.perf_counter()
+    res = run_ahp(P, labels, **kwargs)
+    res.timings = [("parse", t1 - t0), ("pipeline", time.perf_counter() - t1)]
+    return res
+
+
+# ---------- results CSV (buildResultsCSV) ----------
+def js_fixed(x: float, digits: int) -> str:
+    """Number.prototype.toFixed, including its spelling of inf/nan."""
+    if np.isnan(x):
+        return "NaN"
+    if np.isinf(x):
+        return "Infinity" if x > 0 else "-Infinity"
+    return f"{x:.{digits}f}"
+
+
+def js_exponential(x: float, digits: int = 2) -> str:
+    """Number.prototype.toExponential: 1.23e-5 rather than Python's 1.23e-05."""
+    mant, exp = f"{x:.{digits}e}".split("e")
+    return f"{mant}e{int(exp):+d}"
+
+
+def safe_csv(s) -> str:
+    t = str(s if s is not None else "")
+    if any(c in t for c in ',"\n'):
+        return '"' + t.replace('"', '""') + '"'
+    return t
+
+
+def build_results_csv(res: AHPResult) -> str:
+    lines = ["AHP Results", ""]
+
+    lines.append("Consistency")
+    lines.append("m,lambda_max,SI,RI,CR,decision,max_reciprocal_error")
+    lines.append(",".join([
+        str(res.m),
+        f"{res.lam_max:.9f}",
+        f"{res.SI:.9f}",
+        f"{res.ri:.4f}",
+        f"{res.CR:.9f}",
+        res.decision,
+        js_exponential(res.max_err),
+    ]))
+    lines.append("")
+
+    if res.method == "eigen":
+        lines.append("Eigenvector")
+        lines.append("method,iterations,time_ms")
+        lines.append(f"power_iteration,{res.iterations},{res.elapsed * 1000:.3f}")
+        lines.append("")
+
+    lines.append("Weights")
+    lines.append("criteria,Pi,log_Pi,GM,w,Pw,lambda_i")
+    for i, label in enumerate(res.labels):
+        lines.append(",".join([
+            safe_csv(label),
+            js_fixed(res.Pi[i], 9),
+            js_fixed(res.log_Pi[i], 9),
+            f"{res.GM[i]:.9f}",
+            f"{res.w[i]:.9f}",
+            f"{res.Pw[i]:.9f}",
+            f"{res.lam[i]:.9f}",
+        ]))
+
+    if res.P is not None:
+        lines.append("")
+        lines.append("Pairwise Matrix P (numeric)")
+        lines.append(",".join(["Criteria"] + [safe_csv(x) for x in res.labels]))
+        for i, label in enumerate(res.labels):
+            lines.append(",".join([safe_csv(label)] + [f"{x:.6f}" for x in res.P[i]]))
+
+    if res.timings:
+        lines += ["", "Timings", "stage,ms,heap_delta_bytes"]
+        lines += [f"{stage},{sec * 1000:.3f}," for stage, sec in res.timings]
+    return "\n".join(lines)
@@ -0,0 +1,169 @@
+# ahp_export.py
+"""Results export in compact binary formats: NPZ, Parquet and Arrow IPC.
+
+The content is that of `build_results_csv`, without the text encoding:
+
+* per-criterion columns  criteria, Pi, log_Pi, GM, w, Pw, lambda_i
+* the m×m matrices P and Mul (pᵢⱼ·ωⱼ, the Step 5 table)
+* consistency metadata (m, λmax, SI, RI, CR, decision, method, ...)
+
+P and Mul are written in blocks of `chunk_rows` rows and Mul is formed one
+block at a time, so the extra memory is O(chunk_rows·m) rather than a
+second m×m array plus its decimal text.
+
+NPZ holds one .npy member per array (readable with np.load); `meta` is a
+JSON string.  Parquet and Arrow hold one row per criterion with P and Mul
+as fixed-size list columns (one matrix row each) and the metadata as JSON
+under the b"ahp" schema key.  Only those two formats need pyarrow.
+"""
+from __future__ import annotations
+
+import json
+import os
+import zipfile
+from typing import BinaryIO, Iterator, Tuple, Union
+
+import numpy as np
+
+from ahp_engine import AHPResult, build_results_csv
+
+FORMATS = ("csv", "npz", "parquet", "arrow")
+SUFFIXES = {"csv": ".csv", "npz": ".npz", "parquet": ".parquet", "arrow": ".arrow"}
+MIME_TYPES = {
+    "csv": "text/csv",
+    "npz": "application/zip",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+CHUNK_ROWS = 1024
+# column name in the export -> AHPResult attribute (CSV "Weights" header order)
+VECTOR_COLUMNS = (("Pi", "Pi"), ("log_Pi", "log_Pi"), ("GM", "GM"), ("w", "w"),
+                  ("Pw", "Pw"), ("lambda_i", "lam"))
+
+PathOrBinary = Union[str, os.PathLike, BinaryIO]
+
+
+def result_metadata(res: AHPResult) -> dict:
+    """The "Consistency" (and "Eigenvector") sections as plain JSON types."""
+    return {
+        "m": res.m,
+        "lambda_max": res.lam_max,
+        "SI": res.SI,
+        "RI": res.ri,
+        "CR": res.CR,
+        "decision": res.decision,
+        "max_reciprocal_error": res.max_err,
+        "method": res.method,
+        "iterations": res.iterations,
+        "timings_ms": {stage: sec * 1000 for stage, sec in res.timings or ()},
+    }
+
+
+def _row_blocks(res: AHPResult, chunk_rows: int) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """(start, P block, Mul block) over row blocks of P."""
+    for s in range(0, res.m, chunk_rows):
+        P = np.asarray(res.P[s:s + chunk_rows], dtype=np.float64)
+        yield s, P, P * res.w[None, :]
+
+
+# ---------- NPZ ----------
+def _npy_member(zf: zipfile.ZipFile, name: str, arr: np.ndarray) -> None:
+    with zf.open(name + ".npy", "w", force_zip64=True) as fh:
+        np.lib.format.write_array(fh, np.asarray(arr), allow_pickle=False)
+
+
+def write_npz(res: AHPResult, dst: PathOrBinary, chunk_rows: int = CHUNK_ROWS,
+              compress: bool = False) -> None:
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(dst, "w", compression=compression, allowZip64=True) as zf:
+        _npy_member(zf, "labels", np.array(res.labels, dtype=str))
+        for name, attr in VECTOR_COLUMNS:
+            _npy_member(zf, name, getattr(res, attr))
+        _npy_member(zf, "meta", np.array(json.dumps(result_metadata(res))))
+        if res.P is None:
+            return
+        header = {"descr": np.lib.format.dtype_to_descr(np.dtype(np.float64)),
+                  "fortran_order": False, "shape": (res.m, res.m)}
+        for k, name in ((1, "P"), (2, "Mul")):
+            with zf.open(name + ".npy", "w", force_zip64=True) as fh:
+                np.lib.format.write_array_header_1_0(fh, header)
+                for block in _row_blocks(res, chunk_rows):
+                    fh.write(np.ascontiguousarray(block[k]).tobytes())
+
+
+# ---------- Parquet / Arrow ----------
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ImportError("Parquet and Arrow export need pyarrow (pip install pyarrow).") from exc
+    return pa
+
+
+def arrow_schema(res: AHPResult):
+    pa = _pyarrow()
+    fields = [pa.field("criteria", pa.string())]
+    fields += [pa.field(name, pa.float64()) for name, _ in VECTOR_COLUMNS]
+    if res.P is not None:
+        fields += [pa.field("P", pa.list_(pa.float64(), res.m)),
+                   pa.field("Mul", pa.list_(pa.float64(), res.m))]
+    return pa.schema(fields, metadata={b"ahp": json.dumps(result_metadata(res)).encode()})
+
+
+def arrow_batches(res: AHPResult, schema=None, chunk_rows: int = CHUNK_ROWS):
+    """Yield one RecordBatch per block of `chunk_rows` criteria."""
+    pa = _pyarrow()
+    schema = schema if schema is not None else arrow_schema(res)
+    m = res.m
+    if res.P is None:
+        blocks = ((s, None, None) for s in range(0, m, chunk_rows))
+    else:
+        blocks = _row_blocks(res, chunk_rows)
+    for s, P, Mul in blocks:
+        e = min(s + chunk_rows, m)
+        cols = [pa.array(res.labels[s:e], type=pa.string())]
+        cols += [pa.array(getattr(res, attr)[s:e], type=pa.float64()) for _, attr in VECTOR_COLUMNS]
+        if P is not None:
+            cols += [pa.FixedSizeListArray.from_arrays(pa.array(P.ravel()), m),
+                     pa.FixedSizeListArray.from_arrays(pa.array(Mul.ravel()), m)]
+        yield pa.record_batch(cols, schema=schema)
+
+
+def write_arrow(res: AHPResult, dst: PathOrBinary, chunk_rows: int = CHUNK_ROWS) -> None:
+    pa = _pyarrow()
+    schema = arrow_schema(res)
+    with pa.ipc.new_file(dst, schema) as writer:
+        for batch in arrow_batches(res, schema, chunk_rows):
+            writer.write_batch(batch)
+
+
+def write_parquet(res: AHPResult, dst: PathOrBinary, chunk_rows: int = CHUNK_ROWS,
+                  compression: str = "zstd") -> None:
+    pa = _pyarrow()
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema(res)
+    with pq.ParquetWriter(dst, schema, compression=compression) as writer:
+        for batch in arrow_batches(res, schema, chunk_rows):
+            writer.write_table(pa.Table.from_batches([batch], schema=schema))
+
+
+# ---------- dispatch ----------
+def export_results(res: AHPResult, dst: PathOrBinary, fmt: str = "npz",
+                   chunk_rows: int = CHUNK_ROWS) -> None:
+    """Write `res` to a path or binary file object in one of FORMATS."""
+    if fmt == "csv":
+        data = (build_results_csv(res) + "\n").encode("utf-8")
+        if hasattr(dst, "write"):
+            dst.write(data)
+        else:
+            with open(dst, "wb") as fh:
+                fh.write(data)
+    elif fmt == "npz":
+        write_npz(res, dst, chunk_rows)
+    elif fmt == "parquet":
+        write_parquet(res, dst, chunk_rows)
+    elif fmt == "arrow":
+        write_arrow(res, dst, chunk_rows)
+    else:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {FORMATS}.")
@@ -0,0 +1,233 @@
+# ahp_fuzzy.py
+"""Fuzzy AHP with triangular fuzzy judgments (l, m, u).
+
+    python ahp_fuzzy.py fuzzy.csv                     # centroid defuzzification
+    python ahp_fuzzy.py fuzzy.csv --defuzzify graded -o fuzzy_results.csv
+
+The CSV is the Step 1 layout with a triangle in each cell, e.g.
+"(2;3;4)", "2;3;4", "1/4;1/3;1/2" or a quoted "(2, 3, 4)"; a crisp value
+(anything parse_ratio reads) is the triangle (x, x, x).  Cells are parsed
+into three aligned (m, m) arrays L, M, U, and every step runs on whole
+(N, m, m) stacks:
+
+* fuzzy geometric mean (Buckley), the fuzzy Steps 2-3, in log space:
+  r̃ᵢ = (exp mean log lᵢⱼ, exp mean log mᵢⱼ, exp mean log uᵢⱼ)
+* fuzzy weights, Step 4:  w̃ᵢ = r̃ᵢ ⊗ (Σr̃)⁻¹ = (rlᵢ/Σru, rmᵢ/Σrm, ruᵢ/Σrl)
+* defuzzification: centroid (l+m+u)/3 or graded mean (l+4m+u)/6, then
+  normalized to sum 1
+* consistency, Steps 5-7, on the modal matrix M with the defuzzified ω
+
+The three logs are taken in one pass over a stacked (3, N, m, m) array,
+so a fuzzy run costs about three crisp Step 2-4 passes.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ahp_engine import (CR_THRESHOLD, as_batch, consistency, default_labels, js_exponential,
+                        parse_ratio, safe_csv)
+
+DEFUZZIFY = ("centroid", "graded")
+_TFN_SPLIT = re.compile(r"[;,]")  # whitespace separates parts only when neither is used
+_NAN3 = (float("nan"),) * 3
+
+
+def parse_tfn(v) -> Tuple[float, float, float]:
+    """(l, m, u) from one cell; NaNs when it does not parse or l ≤ m ≤ u fails."""
+    s = str(v if v is not None else "").strip()
+    if s[:1] in "([{" and s[-1:] in ")]}":
+        s = s[1:-1].strip()
+    x = parse_ratio(s)  # crisp cells read exactly as on the crisp path ("1 / 3" included)
+    if np.isfinite(x):
+        return x, x, x
+    parts = _TFN_SPLIT.split(s) if _TFN_SPLIT.search(s) else s.split()
+    if len(parts) != 3:
+        return _NAN3
+    l, m, u = (parse_ratio(p) for p in parts)
+    if not (l <= m <= u):   # also False for NaN
+        return _NAN3
+    return l, m, u
+
+
+def parse_fuzzy_csv(text: str):
+    """Parse the fuzzy Step 1 CSV into (row_labels, col_labels, L, M, U)."""
+    arr = [[c.strip() for c in r] for r in csv.reader(io.StringIO(text))]
+    arr = [r for r in arr if r]
+    if not arr or len(arr[0]) < 2:
+        raise ValueError("Empty or malformed CSV.")
+    col_labels = arr[0][1:]
+    row_labels = [r[0] for r in arr[1:] if r[0] != ""]
+    m = len(row_labels)
+    if m < 2:
+        raise ValueError("Need at least 2 criteria.")
+    if len(col_labels) != m:
+        raise ValueError("Matrix must be square: number of columns must equal number of rows.")
+
+    T = np.empty((3, m, m), dtype=np.float64)
+    memo = {}
+    for i in range(m):
+        r = arr[i + 1] if i + 1 < len(arr) else None
+        if r is None or len(r) < m + 1:
+            raise ValueError("Some rows are incomplete.")
+        for j in range(m):
+            cell = r[j + 1]
+            t = memo.get(cell)
+            if t is None:
+                t = memo[cell] = parse_tfn(cell)
+            if not (np.isfinite(t[0]) and t[0] > 0 and np.isfinite(t[2])):
+                raise ValueError(f"Invalid fuzzy value at row {row_labels[i]}, col {col_labels[j]}")
+            T[:, i, j] = t
+    return row_labels, col_labels, T[0], T[1], T[2]
+
+
+@dataclass
+class FuzzyAHPResult:
+    labels: List[str]
+    m: int
+    r: np.ndarray        # (m, 3) fuzzy geometric means (l, m, u)
+    w_fuzzy: np.ndarray  # (m, 3) fuzzy weights
+    w: np.ndarray        # (m,) defuzzified, normalized
+    Pw: np.ndarray       # (m,) M·ω
+    lam: np.ndarray      # (m,)
+    lam_max: float
+    SI: float
+    ri: float
+    CR: float            # of the modal matrix M
+    max_err: float       # worst |lᵢⱼ·uⱼᵢ - 1|, |mᵢⱼ·mⱼᵢ - 1|, |uᵢⱼ·lⱼᵢ - 1|
+    defuzzify: str = "centroid"
+
+    @property
+    def acceptable(self) -> bool:
+        return self.CR <= CR_THRESHOLD
+
+    @property
+    def decision(self) -> str:
+        return "ACCEPTABLE" if self.acceptable else "NOT OK"
+
+    def to_csv(self) -> str:
+        lines = ["Fuzzy AHP Results", "", "Consistency (modal matrix)",
+                 "m,lambda_max,SI,RI,CR,decision,max_reciprocal_error,defuzzify",
+                 f"{self.m},{self.lam_max:.9f},{self.SI:.9f},{self.ri:.4f},{self.CR:.9f},"
+                 f"{self.decision},{js_exponential(self.max_err)},{self.defuzzify}",
+                 "", "Weights", "criteria,r_l,r_m,r_u,w_l,w_m,w_u,w,Pw,lambda_i"]
+        for i, label in enumerate(self.labels):
+            lines.append(",".join([safe_csv(label)]
+                                  + [f"{x:.9f}" for x in self.r[i]]
+                                  + [f"{x:.9f}" for x in self.w_fuzzy[i]]
+                                  + [f"{self.w[i]:.9f}", f"{self.Pw[i]:.9f}", f"{self.lam[i]:.9f}"]))
+        return "\n".join(lines)
+
+
+@dataclass
+class FuzzyAHPBatch:
+    """The fuzzy pipeline for N matrices of the same size; leading N axis."""
+    m: int
+    r: np.ndarray        # (N, m, 3)
+    w_fuzzy: np.ndarray  # (N, m, 3)
+    w: np.ndarray        # (N, m)
+    Pw: np.ndarray       # (N, m)
+    lam: np.ndarray      # (N, m)
+    lam_max: np.ndarray  # (N,)
+    SI: np.ndarray       # (N,)
+    ri: float
+    CR: np.ndarray       # (N,)
+    max_err: np.ndarray  # (N,)
+    defuzzify: str = "centroid"
+
+    def __len__(self) -> int:
+        return self.w.shape[0]
+
+    @property
+    def acceptable(self) -> np.ndarray:
+        return self.CR <= CR_THRESHOLD
+
+    def item(self, k: int, labels: Optional[Sequence[str]] = None) -> FuzzyAHPResult:
+        return FuzzyAHPResult(
+            labels=list(labels) if labels is not None else default_labels(self.m), m=self.m,
+            r=self.r[k], w_fuzzy=self.w_fuzzy[k], w=self.w[k], Pw=self.Pw[k], lam=self.lam[k],
+            lam_max=float(self.lam_max[k]), SI=float(self.SI[k]), ri=self.ri, CR=float(self.CR[k]),
+            max_err=float(self.max_err[k]), defuzzify=self.defuzzify)
+
+
+def fuzzy_reciprocal_error(L: np.ndarray, M: np.ndarray, U: np.ndarray) -> np.ndarray:
+    """Per matrix: the fuzzy reciprocal (lⱼᵢ, mⱼᵢ, uⱼᵢ) = (1/uᵢⱼ, 1/mᵢⱼ, 1/lᵢⱼ)."""
+    e = np.maximum(np.abs(L * U.transpose(0, 2, 1) - 1.0), np.abs(M * M.transpose(0, 2, 1) - 1.0))
+    return e.reshape(e.shape[0], -1).max(axis=1)
+
+
+def run_fuzzy_ahp_batch(L, M, U, defuzzify: str = "centroid") -> FuzzyAHPBatch:
+    """Fuzzy Steps 2-7 on (N, m, m) stacks (or single matrices) of l, m and u."""
+    if defuzzify not in DEFUZZIFY:
+        raise ValueError(f"Unknown defuzzification {defuzzify!r}; expected one of {DEFUZZIFY}.")
+    L, M, U = as_batch(L), as_batch(M), as_batch(U)
+    if not (L.shape == M.shape == U.shape):
+        raise ValueError("L, M and U must have the same shape.")
+    T = np.stack([L, M, U])                                     # (3, N, m, m)
+    if not np.all(np.isfinite(T)) or np.any(T[0] <= 0):
+        raise ValueError("Invalid value: every lᵢⱼ must be a positive finite number.")
+    if np.any(T[0] > T[1]) or np.any(T[1] > T[2]):
+        raise ValueError("Invalid value: every judgment needs l ≤ m ≤ u.")
+    m = T.shape[2]
+
+    # Steps 2-3: fuzzy geometric means, all three logs in one pass
+    log_r = np.log(T).mean(axis=3)                              # (3, N, m)
+    r = np.exp(log_r)
+    # Step 4: w̃ = r̃ ⊗ (Σ r̃)⁻¹; the inverse of a triangle swaps l and u
+    s = r.sum(axis=2, keepdims=True)                            # (3, N, 1)
+    wf = r / s[::-1]
+    if defuzzify == "centroid":
+        crisp = wf.sum(axis=0) / 3.0
+    else:
+        crisp = (wf[0] + 4.0 * wf[1] + wf[2]) / 6.0
+    w = crisp / crisp.sum(axis=1, keepdims=True)
+
+    # Steps 5-7 on the modal matrix
+    Mm = T[1]
+    Pw = np.matmul(Mm, w[:, :, None])[:, :, 0]
+    lam = Pw / np.where(w == 0, 1e-18, w)
+    lam_max = lam.mean(axis=1)
+    SI, ri, CR = consistency(lam_max, m)
+    return FuzzyAHPBatch(m=m, r=np.moveaxis(r, 0, -1), w_fuzzy=np.moveaxis(wf, 0, -1), w=w, Pw=Pw,
+                         lam=lam, lam_max=lam_max, SI=SI, ri=ri, CR=CR,
+                         max_err=fuzzy_reciprocal_error(T[0], T[1], T[2]), defuzzify=defuzzify)
+
+
+def run_fuzzy_ahp(L, M, U, labels: Optional[Sequence[str]] = None, **kwargs) -> FuzzyAHPResult:
+    """Single-matrix convenience wrapper around run_fuzzy_ahp_batch."""
+    if np.ndim(M) != 2:
+        raise ValueError("run_fuzzy_ahp expects (m, m) matrices; use run_fuzzy_ahp_batch for stacks.")
+    return run_fuzzy_ahp_batch(L, M, U, **kwargs).item(0, labels)
+
+
+def run_fuzzy_ahp_csv(text: str, **kwargs) -> FuzzyAHPResult:
+    labels, _, L, M, U = parse_fuzzy_csv(text)
+    return run_fuzzy_ahp(L, M, U, labels, **kwargs)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Fuzzy AHP with triangular judgments.")
+    ap.add_argument("pairwise", help="pairwise CSV with (l;m;u) cells")
+    ap.add_argument("--defuzzify", choices=DEFUZZIFY, default="centroid")
+    ap.add_argument("-o", "--out", default=None, help="write the results CSV here (default: stdout)")
+    args = ap.parse_args(argv)
+
+    res = run_fuzzy_ahp_csv(Path(args.pairwise).read_text(encoding="utf-8-sig"), defuzzify=args.defuzzify)
+    text = res.to_csv() + "\n"
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+# ahp_group.py
+"""Group decisions: aggregate one pairwise matrix collected from many experts.
+
+Both classic aggregations are single NumPy reductions over the expert axis:
+
+* AIJ (aggregation of individual judgments): the group matrix is the
+  element-wise weighted geometric mean exp(Σₖ eₖ log Pₖ / Σₖ eₖ);
+* AIP (aggregation of individual priorities): the group ω is the weighted
+  geometric (or arithmetic) mean of each expert's Step 4 weights.
+
+Experts are consumed in chunks, so memory is O(chunk·m² + N·m) however
+large the panel.  Per expert only ω, CR and two compatibility statistics
+are kept; the geometric compatibility index against the group,
+
+    GCOMPIₖ = 2/((m-1)(m-2)) Σᵢ<ⱼ (log pᵏᵢⱼ - xᵢ + xⱼ)²,   x = log ω_group,
+
+expands into Σ(log pᵏ)² and the per-row sums uᵏ, which is what lets a
+single pass produce it.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from ahp_engine import AHPResult, as_batch, run_ahp, run_ahp_batch
+
+AGGREGATIONS = ("aij", "aip")
+# Aguarón et al. thresholds for GCOMPI (same as the GCI ones)
+GCOMPI_THRESHOLDS = {3: 0.31, 4: 0.35}
+GCOMPI_THRESHOLD_LARGE = 0.37
+
+
+@dataclass
+class GroupResult:
+    m: int
+    n_experts: int
+    aggregation: str
+    expert_weights: np.ndarray   # (N,) normalised eₖ
+    expert_w: np.ndarray         # (N, m) individual ω
+    expert_CR: np.ndarray        # (N,)
+    group: AHPResult             # Steps 2-7 on the AIJ group matrix
+    w: np.ndarray                # group ω for the chosen aggregation
+    compatibility: np.ndarray    # (N,) GCOMPI of each expert against w
+    dispersion: float            # mean over i<j of the weighted std of log pᵢⱼ
+    consensus: float             # 1 - dispersion / log 9, clipped to [0, 1]
+
+    @property
+    def group_CR(self) -> float:
+        return self.group.CR
+
+    @property
+    def compatible(self) -> np.ndarray:
+        return self.compatibility <= GCOMPI_THRESHOLDS.get(self.m, GCOMPI_THRESHOLD_LARGE)
+
+
+def _chunks(experts, chunk: int) -> Iterator[np.ndarray]:
+    if isinstance(experts, np.ndarray) or (isinstance(experts, (list, tuple)) and experts
+                                           and np.ndim(experts[0]) == 2):
+        A = np.asarray(experts, dtype=np.float64)
+        A = A[None] if A.ndim == 2 else A
+        for s in range(0, A.shape[0], chunk):
+            yield A[s:s + chunk]
+    else:
+        for block in experts:
+            yield as_batch(block)
+
+
+def aggregate(experts: Union[np.ndarray, Iterable[np.ndarray]],
+              expert_weights: Optional[Sequence[float]] = None,
+              aggregation: str = "aij", priority_mean: str = "geometric",
+              labels: Optional[Sequence[str]] = None, chunk: int = 1024) -> GroupResult:
+    """Aggregate a (N, m, m) stack, or an iterable of (n, m, m) blocks, in one pass.
+
+    `expert_weights` may be omitted (equal weights); for a streamed input
+    it must be in the same order as the experts arrive.
+    """
+    if aggregation not in AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation {aggregation!r}; expected one of {AGGREGATIONS}.")
+    if priority_mean not in ("geometric", "arithmetic"):
+        raise ValueError("priority_mean must be 'geometric' or 'arithmetic'.")
+    ew_all = None if expert_weights is None else np.asarray(expert_weights, dtype=np.float64)
+    if ew_all is not None and np.any(ew_all < 0):
+        raise ValueError("Expert weights must be non-negative.")
+
+    m = None
+    seen = 0
+    w_list: List[np.ndarray] = []
+    cr_list: List[np.ndarray] = []
+    e_list: List[np.ndarray] = []
+    s2_list: List[np.ndarray] = []
+    u_list: List[np.ndarray] = []
+    for A in _chunks(experts, chunk):
+        n = A.shape[0]
+        if m is None:
+            m = A.shape[1]
+            iu, ju = np.triu_indices(m, 1)
+            sum_L = np.zeros(iu.size)
+            sum_L2 = np.zeros(iu.size)
+            sum_e = 0.0
+            sum_logw = np.zeros(m)
+            sum_w = np.zeros(m)
+        elif A.shape[1] != m:
+            raise ValueError("All expert matrices must have the same size.")
+        e = np.ones(n) if ew_all is None else ew_all[seen:seen + n]
+        if e.size != n:
+            raise ValueError("expert_weights has fewer entries than experts.")
+
+        batch = run_ahp_batch(A)
+        L = np.log(A[:, iu, ju])                         # (n, K) upper-triangle log judgments
+        sum_L += e @ L
+        sum_L2 += e @ (L * L)
+        sum_e += e.sum()
+        sum_logw += e @ np.log(batch.w)
+        sum_w += e @ batch.w
+
+        # per-expert sufficient statistics for GCOMPI
+        u = np.zeros((n, m))
+        np.add.at(u.T, iu, L.T)
+        np.subtract.at(u.T, ju, L.T)
+        s2_list.append((L * L).sum(axis=1))
+        u_list.append(u)
+        w_list.append(batch.w)
+        cr_list.append(batch.CR)
+        e_list.append(e)
+        seen += n
+
+    if m is None:
+        raise ValueError("No expert matrices given.")
+    if ew_all is not None and seen != ew_all.size:
+        raise ValueError("expert_weights has more entries than experts.")
+    if sum_e <= 0:
+        raise ValueError("Expert weights must not all be zero.")
+
+    # AIJ: weighted geometric mean of the judgments
+    mean_L = sum_L / sum_e
+    G = np.ones((m, m))
+    G[iu, ju] = np.exp(mean_L)
+    G[ju, iu] = np.exp(-mean_L)
+    group = run_ahp(G, labels)
+
+    # AIP: weighted mean of the priorities
+    if priority_mean == "geometric":
+        w_aip = np.exp(sum_logw / sum_e)
+    else:
+        w_aip = sum_w / sum_e
+    w_aip = w_aip / w_aip.sum()
+    w = group.w if aggregation == "aij" else w_aip
+
+    # GCOMPI_k = c · (S2_k - 2 x·u_k + Σᵢ<ⱼ (xᵢ - xⱼ)²)
+    x = np.log(w)
+    pair_sq = m * (x @ x) - x.sum() ** 2
+    S2, U = np.concatenate(s2_list), np.vstack(u_list)
+    scale = 2.0 / ((m - 1) * (m - 2)) if m > 2 else 0.0
+    compat = scale * np.maximum(S2 - 2.0 * (U @ x) + pair_sq, 0.0)
+
+    var = np.maximum(sum_L2 / sum_e - mean_L ** 2, 0.0)
+    dispersion = float(np.sqrt(var).mean()) if var.size else 0.0
+    consensus = float(np.clip(1.0 - dispersion / np.log(9.0), 0.0, 1.0))
+
+    E = np.concatenate(e_list)
+    return GroupResult(
+        m=m, n_experts=seen, aggregation=aggregation, expert_weights=E / E.sum(),
+        expert_w=np.vstack(w_list), expert_CR=np.concatenate(cr_list), group=group, w=w,
+        compatibility=compat, dispersion=dispersion, consensus=consensus,
+    )
@@ -0,0 +1,203 @@
+# ahp_hierarchy.py
+"""Multi-level AHP: goal → criteria → sub-criteria (→ alternatives).
+
+Every internal node carries a local pairwise matrix over its children and
+gets its local weights from the same Steps 2-7 as the flat page.  Leaf
+criteria either carry a matrix over the alternatives or, in a model without
+alternatives, stand for themselves.  Global priorities are the weighted
+sums of the children's vectors, bottom-up.
+
+Results are memoized twice:
+
+* local results by a content hash of the node's matrix, and
+* subtree vectors by a Merkle hash (own matrix hash + children's hashes),
+
+so after editing one leaf only the nodes on its path to the root are
+recomputed; every sibling subtree is a cache hit.
+
+JSON model format::
+
+    {"name": "Goal", "alternatives": ["A1", "A2"],
+     "matrix": [[1, 3], [1/3, 1]]  or  "goal.csv",
+     "children": [{"name": "Cost", "matrix": ..., "children": [...]}, ...]}
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ahp_engine import METHODS, AHPResult, parse_pairwise_csv, parse_ratio, run_ahp
+
+
+def matrix_hash(P: np.ndarray) -> str:
+    A = np.ascontiguousarray(P, dtype=np.float64)
+    h = hashlib.sha1(str(A.shape).encode())
+    h.update(A.tobytes())
+    return h.hexdigest()
+
+
+@dataclass
+class Node:
+    name: str
+    matrix: Optional[np.ndarray] = None   # over children, or over alternatives at a leaf
+    children: List["Node"] = field(default_factory=list)
+
+    @property
+    def is_leaf(self) -> bool:
+        return not self.children
+
+    def walk(self, prefix: str = ""):
+        """Yield (path, node) depth-first; paths are "Goal/Cost/Capex"."""
+        path = f"{prefix}/{self.name}" if prefix else self.name
+        yield path, self
+        for c in self.children:
+            yield from c.walk(path)
+
+
+@dataclass
+class NodeReport:
+    path: str
+    global_weight: float
+    local: Optional[AHPResult]
+
+
+@dataclass
+class HierarchyResult:
+    targets: List[str]          # alternatives, or leaf paths when there are none
+    priorities: np.ndarray      # global priority per target
+    nodes: Dict[str, NodeReport]
+
+    def ranking(self) -> List[Tuple[str, float]]:
+        order = np.argsort(-self.priorities, kind="stable")
+        return [(self.targets[k], float(self.priorities[k])) for k in order]
+
+    def inconsistent(self) -> List[str]:
+        return [p for p, r in self.nodes.items() if r.local is not None and not r.local.acceptable]
+
+
+class _LRU(OrderedDict):
+    def __init__(self, size: int):
+        super().__init__()
+        self.size = size
+
+    def get(self, key):
+        if key in self:
+            self.move_to_end(key)
+            return self[key]
+        return None
+
+    def put(self, key, value):
+        self[key] = value
+        self.move_to_end(key)
+        if len(self) > self.size:
+            self.popitem(last=False)
+
+
+class HierarchyEngine:
+    """Evaluates a Node tree with local and subtree memoization."""
+
+    def __init__(self, root: Node, alternatives: Optional[List[str]] = None,
+                 method: str = "gm", cache_size: int = 4096):
+        if method not in METHODS:
+            raise ValueError(f"Unknown weighting method {method!r}; expected one of {METHODS}.")
+        self.root = root
+        self.alternatives = list(alternatives) if alternatives else None
+        self.method = method
+        self._local = _LRU(cache_size)
+        self._subtree = _LRU(cache_size)
+        self.local_computations = 0
+        self.subtree_computations = 0
+
+    # ---------- model ----------
+    def node(self, path: str) -> Node:
+        for p, n in self.root.walk():
+            if p == path:
+                return n
+        raise KeyError(path)
+
+    def set_matrix(self, path: str, P) -> None:
+        """Replace one node's local matrix; the next evaluate() redoes only its path."""
+        self.node(path).matrix = np.asarray(P, dtype=np.float64)
+
+    def targets(self) -> List[str]:
+        if self.alternatives is not None:
+            return self.alternatives
+        return [p for p, n in self.root.walk() if n.is_leaf]
+
+    # ---------- evaluation ----------
+    def _local_result(self, path: str, node: Node, labels: List[str]) -> Tuple[str, AHPResult]:
+        P = node.matrix
+        if P is None or P.shape != (len(labels), len(labels)):
+            raise ValueError(f"Node {path!r} needs a {len(labels)}x{len(labels)} pairwise matrix.")
+        key = f"{self.method}:{matrix_hash(P)}"
+        res = self._local.get(key)
+        if res is None:
+            res = run_ahp(P, labels, method=self.method)
+            self._local.put(key, res)
+            self.local_computations += 1
+        elif res.labels != labels:
+            # identical matrices share the computation, not the labels
+            res = replace(res, labels=list(labels))
+        return key, res
+
+    def _synthesize(self, path: str, node: Node, targets: List[str], index: Dict[str, int],
+                    reports: Dict[str, NodeReport], weight: float) -> Tuple[str, np.ndarray]:
+        """(subtree hash, priority vector over targets) for one node."""
+        local = None
+        if node.is_leaf:
+            if self.alternatives is None:
+                key = f"leaf:{path}"
+                vec = np.zeros(len(targets))
+                vec[index[path]] = 1.0
+                reports[path] = NodeReport(path, weight, None)
+                return key, vec
+            key, local = self._local_result(path, node, self.alternatives)
+            reports[path] = NodeReport(path, weight, local)
+            return key, local.w
+
+        own, local = self._local_result(path, node, [c.name for c in node.children])
+        reports[path] = NodeReport(path, weight, local)
+        parts = [self._synthesize(f"{path}/{c.name}", c, targets, index, reports, weight * float(local.w[k]))
+                 for k, c in enumerate(node.children)]
+        key = hashlib.sha1("|".join([own] + [h for h, _ in parts]).encode()).hexdigest()
+        vec = self._subtree.get(key)
+        if vec is None:
+            vec = local.w @ np.stack([v for _, v in parts])
+            self._subtree.put(key, vec)
+            self.subtree_computations += 1
+        return key, vec
+
+    def evaluate(self) -> HierarchyResult:
+        targets = self.targets()
+        index = {t: k for k, t in enumerate(targets)}
+        reports: Dict[str, NodeReport] = {}
+        _, vec = self._synthesize(self.root.name, self.root, targets, index, reports, 1.0)
+        return HierarchyResult(targets=targets, priorities=vec, nodes=reports)
+
+
+# ---------- loading ----------
+def _load_matrix(spec, base: Path) -> Optional[np.ndarray]:
+    if spec is None:
+        return None
+    if isinstance(spec, str):
+        _, _, P = parse_pairwise_csv((base / spec).read_text(encoding="utf-8"))
+        return P
+    return np.array([[parse_ratio(x) if isinstance(x, str) else float(x) for x in row] for row in spec])
+
+
+def _load_node(d: dict, base: Path) -> Node:
+    return Node(name=str(d["name"]), matrix=_load_matrix(d.get("matrix"), base),
+                children=[_load_node(c, base) for c in d.get("children", [])])
+
+
+def load_hierarchy(path: str, **kwargs) -> HierarchyEngine:
+    """Build a HierarchyEngine from a JSON model; CSV matrix paths are relative to it."""
+    path = Path(path)
+    spec = json.loads(path.read_text(encoding="utf-8"))
+    return HierarchyEngine(_load_node(spec, path.parent), alternatives=spec.get("alternatives"), **kwargs)
@@ -0,0 +1,124 @@
+# ahp_incremental.py
+"""O(m) updates of the GM pipeline when single judgments change.
+
+Changing pᵢⱼ (and its reciprocal pⱼᵢ) only moves log Πᵢ and log Πⱼ, so:
+
+* GMᵢ, GMⱼ and ΣGM change; every other ω is rescaled by ΣGM_old/ΣGM_new,
+* Pω_new = c·Pω_old + δᵢ·P[:, i] + δⱼ·P[:, j] + the two edited cells,
+* λ, λmax, SI and CR follow in O(m).
+
+Rounding drift is bounded by a full `refresh()` every `refresh_every` edits.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ahp_engine import AHPResult, consistency, default_labels, reciprocal_error, run_ahp
+
+
+@dataclass
+class EditSummary:
+    """What one edit did to the headline numbers."""
+    i: int
+    j: int
+    old: float
+    new: float
+    lam_max: float
+    CR: float
+
+
+class IncrementalAHP:
+    """Cached GM state of one matrix that accepts single-cell edits."""
+
+    def __init__(self, P, labels: Optional[Sequence[str]] = None, refresh_every: int = 10_000):
+        P = np.array(P, dtype=np.float64, copy=True)
+        if P.ndim != 2 or P.shape[0] != P.shape[1]:
+            raise ValueError("Matrix must be square: number of columns must equal number of rows.")
+        self.m = P.shape[0]
+        self.labels: List[str] = list(labels) if labels is not None else default_labels(self.m)
+        self._index = {name: k for k, name in enumerate(self.labels)}
+        self.P = P
+        self.refresh_every = refresh_every
+        self.refresh()
+
+    # ---------- state ----------
+    def refresh(self) -> None:
+        """Recompute everything from P (O(m²)); also resets the drift counter."""
+        res = run_ahp(self.P, self.labels)
+        self.log_Pi = res.log_Pi.copy()
+        self.GM = res.GM.copy()
+        self.sum_gm = float(self.GM.sum())
+        self.w = res.w.copy()
+        self.Pw = res.Pw.copy()
+        self._finish()
+        self.edits_since_refresh = 0
+
+    def _finish(self) -> None:
+        self.lam = self.Pw / np.where(self.w == 0, 1e-18, self.w)
+        self.lam_max = float(self.lam.mean())
+        SI, self.ri, CR = consistency(self.lam_max, self.m)
+        self.SI, self.CR = float(SI), float(CR)
+
+    def index(self, key) -> int:
+        return self._index[key] if isinstance(key, str) else int(key)
+
+    # ---------- edits ----------
+    def set(self, i, j, value: float) -> EditSummary:
+        """Set pᵢⱼ = value and pⱼᵢ = 1/value, updating ω, Pω, λ and CR in O(m)."""
+        i, j = self.index(i), self.index(j)
+        if i == j:
+            raise ValueError("Diagonal judgments are fixed at 1.")
+        value = float(value)
+        if not np.isfinite(value) or value <= 0:
+            raise ValueError(f"Invalid value at row {self.labels[i]}, col {self.labels[j]}")
+        P, m = self.P, self.m
+        old, old_ji = float(P[i, j]), float(P[j, i])
+
+        # Steps 2-4: only two log Π move; row j from its own old cell, since
+        # P need not be reciprocal (run_ahp only reports that in max_err)
+        self.log_Pi[i] += np.log(value) - np.log(old)
+        self.log_Pi[j] += -np.log(value) - np.log(old_ji)
+        gi, gj = np.exp(self.log_Pi[i] / m), np.exp(self.log_Pi[j] / m)
+        new_sum = self.sum_gm - self.GM[i] - self.GM[j] + gi + gj
+        c = self.sum_gm / new_sum
+        wi, wj = gi / new_sum, gj / new_sum
+        di, dj = wi - c * self.w[i], wj - c * self.w[j]  # ω_new = c·ω_old + dᵢeᵢ + dⱼeⱼ
+
+        # Step 5 with the old P, then the two edited cells
+        Pw = c * self.Pw
+        Pw += di * P[:, i]
+        Pw += dj * P[:, j]
+        Pw[i] += (value - old) * wj
+        Pw[j] += (1.0 / value - old_ji) * wi
+
+        P[i, j], P[j, i] = value, 1.0 / value
+        self.GM[i], self.GM[j] = gi, gj
+        self.sum_gm = new_sum
+        self.w *= c
+        self.w[i], self.w[j] = wi, wj
+        self.Pw = Pw
+        self._finish()
+
+        self.edits_since_refresh += 1
+        if self.edits_since_refresh >= self.refresh_every:
+            self.refresh()
+        return EditSummary(i=i, j=j, old=old, new=value, lam_max=self.lam_max, CR=self.CR)
+
+    def apply(self, edits: Iterable[Tuple[object, object, float]]) -> List[EditSummary]:
+        """Apply a stream of (i, j, value) edits in order."""
+        return [self.set(i, j, v) for i, j, v in edits]
+
+    # ---------- output ----------
+    def result(self) -> AHPResult:
+        """Snapshot as an AHPResult; builds the O(m²) Mul table on demand."""
+        with np.errstate(over="ignore", under="ignore"):
+            Pi = np.exp(self.log_Pi)
+        return AHPResult(
+            labels=list(self.labels), m=self.m, P=self.P.copy(), Pi=Pi, log_Pi=self.log_Pi.copy(),
+            GM=self.GM.copy(), w=self.w.copy(), Mul=self.P * self.w[None, :], Pw=self.Pw.copy(),
+            lam=self.lam.copy(), lam_max=self.lam_max, SI=self.SI, ri=self.ri, CR=self.CR,
+            max_err=float(reciprocal_error(self.P)[0]),
+        )
@@ -0,0 +1,255 @@
+# ahp_io.py
+"""File formats for pairwise matrices beyond the in-page CSV upload."""
+from __future__ import annotations
+
+import csv
+import io
+import os
+import struct
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Union
+
+import numpy as np
+
+from ahp_engine import parse_ratio
+
+PathOrFile = Union[str, os.PathLike, io.TextIOBase]
+
+
+@dataclass
+class PairwiseMatrix:
+    """A parsed pairwise matrix plus its reciprocal-check error."""
+    labels: List[str]
+    col_labels: List[str]
+    P: np.ndarray
+    max_err: float
+
+
+# ---------- streaming CSV reader ----------
+class _CellParser:
+    """parse_ratio with a memo; Saaty matrices only use a handful of distinct cells."""
+
+    def __init__(self, limit: int = 4096):
+        self.cache = {}
+        self.limit = limit
+
+    def __call__(self, cell: str) -> float:
+        v = self.cache.get(cell)
+        if v is None:
+            v = parse_ratio(cell)  # strips surrounding whitespace itself
+            if len(self.cache) < self.limit:
+                self.cache[cell] = v
+        return v
+
+
+def _open_text(src: PathOrFile):
+    if isinstance(src, (str, os.PathLike)):
+        return open(src, "r", newline="", encoding="utf-8-sig"), True
+    return src, False
+
+
+def _csv_header(reader) -> List[str]:
+    header = next(reader, None)
+    if not header or len(header) < 2:
+        raise ValueError("Empty or malformed CSV.")
+    col_labels = [c.strip() for c in header[1:]]
+    if len(col_labels) < 2:
+        raise ValueError("Need at least 2 criteria.")
+    return col_labels
+
+
+def _csv_rows(reader, col_labels: List[str], row_for: Callable[[int], np.ndarray]):
+    """Yield (i, label, row) per data row, parsing cells straight into row_for(i)."""
+    m = len(col_labels)
+    parse = _CellParser()
+    i = 0
+    for r in reader:
+        label = r[0].strip() if r else ""
+        if label == "":
+            continue
+        if i >= m:
+            raise ValueError("Matrix must be square: number of columns must equal number of rows.")
+        if len(r) < m + 1:
+            raise ValueError("Some rows are incomplete.")
+        row = row_for(i)
+        row[:] = [parse(c) for c in r[1:m + 1]]
+        bad = ~(np.isfinite(row) & (row > 0))
+        if bad.any():
+            j = int(np.argmax(bad))
+            raise ValueError(f"Invalid value at row {label}, col {col_labels[j]}")
+        yield i, label, row
+        i += 1
+    if i != m:
+        raise ValueError("Some rows are incomplete.")
+
+
+def stream_pairwise_csv(src: PathOrFile, mmap_path: Optional[str] = None,
+                        on_row: Optional[Callable[[int, float], None]] = None) -> PairwiseMatrix:
+    """Read the Step 1 CSV format one row at a time into a float64 matrix.
+
+    Only the current row is held as strings; values go straight into a
+    preallocated (m, m) array, or a `.npy` memmap at `mmap_path` for
+    matrices that should not live in RAM.  The reciprocal check runs
+    against the rows already read, and `on_row(i, max_err)` is called after
+    each row so callers can report progress and the running error.
+    """
+    fh, owned = _open_text(src)
+    try:
+        reader = csv.reader(fh)
+        col_labels = _csv_header(reader)
+        m = len(col_labels)
+        if mmap_path is not None:
+            P = np.lib.format.open_memmap(mmap_path, mode="w+", dtype=np.float64, shape=(m, m))
+        else:
+            P = np.empty((m, m), dtype=np.float64)
+
+        labels: List[str] = []
+        max_err = 0.0
+        for i, label, row in _csv_rows(reader, col_labels, lambda i: P[i]):
+            labels.append(label)
+            # reciprocal check against the rows read so far
+            err = abs(row[i] - 1.0)
+            if i:
+                err = max(err, float(np.abs(row[:i] * P[:i, i] - 1.0).max()))
+            max_err = max(max_err, err)
+            if on_row is not None:
+                on_row(i, max_err)
+    finally:
+        if owned:
+            fh.close()
+
+    if isinstance(P, np.memmap):
+        P.flush()
+    return PairwiseMatrix(labels=labels, col_labels=col_labels, P=P, max_err=max_err)
+
+
+# ---------- packed upper triangle ----------
+# A reciprocal matrix is fixed by its strict upper triangle (p_ji = 1/p_ij,
+# p_ii = 1), stored row-major: p_01..p_0(m-1), p_12..p_1(m-1), ...
+#
+# .ahpu layout (little endian):
+#   header  32 bytes  magic "AHPU", u16 version, u8 itemsize, pad,
+#                     u64 m, u64 labels_offset, u64 labels_len
+#   data    m(m-1)/2 float32/float64 values, starting at byte 32
+#   labels  UTF-8, newline separated, at labels_offset
+PACKED_MAGIC = b"AHPU"
+PACKED_VERSION = 1
+_PACKED_HEADER = struct.Struct("<4sHBxQQQ")
+
+
+@dataclass
+class PackedPairwise:
+    labels: List[str]
+    m: int
+    tri: np.ndarray  # (m(m-1)/2,) float32 or float64, possibly a memmap
+
+    def to_dense(self) -> np.ndarray:
+        return unpack_upper(self.tri, self.m)
+
+
+def pack_upper(P, dtype=np.float64) -> np.ndarray:
+    P = np.asarray(P)
+    return P[np.triu_indices(P.shape[0], 1)].astype(dtype)
+
+
+def unpack_upper(tri: np.ndarray, m: int) -> np.ndarray:
+    P = np.ones((m, m), dtype=np.float64)
+    iu, ju = np.triu_indices(m, 1)
+    P[iu, ju] = tri
+    P[ju, iu] = 1.0 / P[iu, ju]
+    return P
+
+
+def write_packed(path: str, packed: PackedPairwise) -> None:
+    tri = np.ascontiguousarray(packed.tri)
+    if tri.dtype not in (np.float32, np.float64):
+        raise ValueError("Packed data must be float32 or float64.")
+    names = "\n".join(packed.labels).encode("utf-8")
+    data_len = tri.size * tri.dtype.itemsize
+    with open(path, "wb") as fh:
+        fh.write(_PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, tri.dtype.itemsize,
+                                     packed.m, _PACKED_HEADER.size + data_len, len(names)))
+        fh.write(tri.astype(tri.dtype.newbyteorder("<"), copy=False).tobytes())
+        fh.write(names)
+
+
+def _read_packed_header(fh):
+    raw = fh.read(_PACKED_HEADER.size)
+    if len(raw) != _PACKED_HEADER.size:
+        raise ValueError("Not a packed pairwise file (truncated header).")
+    magic, version, itemsize, m, labels_off, labels_len = _PACKED_HEADER.unpack(raw)
+    if magic != PACKED_MAGIC:
+        raise ValueError("Not a packed pairwise file (bad magic).")
+    if version != PACKED_VERSION:
+        raise ValueError(f"Unsupported packed pairwise version {version}.")
+    if itemsize not in (4, 8):
+        raise ValueError(f"Unsupported packed item size {itemsize}.")
+    return np.dtype("<f4" if itemsize == 4 else "<f8"), m, labels_off, labels_len
+
+
+def read_packed(path: str, mmap: bool = True) -> PackedPairwise:
+    """Open a .ahpu file; by default the triangle stays on disk as a memmap."""
+    with open(path, "rb") as fh:
+        dtype, m, labels_off, labels_len = _read_packed_header(fh)
+        fh.seek(labels_off)
+        names = fh.read(labels_len).decode("utf-8")
+        n = m * (m - 1) // 2
+        if mmap:
+            tri = np.memmap(path, dtype=dtype, mode="r", offset=_PACKED_HEADER.size, shape=(n,))
+        else:
+            fh.seek(_PACKED_HEADER.size)
+            tri = np.fromfile(fh, dtype=dtype, count=n)
+    labels = names.split("\n") if names else []
+    return PackedPairwise(labels=labels, m=m, tri=tri)
+
+
+def csv_to_packed(src: PathOrFile, dst: str, dtype=np.float64,
+                  on_row: Optional[Callable[[int, float], None]] = None) -> float:
+    """Stream a pairwise CSV into a .ahpu file without building the dense matrix.
+
+    Upper-triangle cells are written as each row is read; lower-triangle
+    cells are only used for the reciprocal check, whose max error is
+    returned (and reported through `on_row` like stream_pairwise_csv).
+    """
+    dtype = np.dtype(dtype).newbyteorder("<")
+    fh, owned = _open_text(src)
+    try:
+        reader = csv.reader(fh)
+        col_labels = _csv_header(reader)
+        m = len(col_labels)
+        n = m * (m - 1) // 2
+        data_len = n * dtype.itemsize
+        with open(dst, "wb") as out:
+            out.write(_PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, dtype.itemsize,
+                                          m, _PACKED_HEADER.size + data_len, 0))
+            out.truncate(_PACKED_HEADER.size + data_len)
+        tri = np.memmap(dst, dtype=dtype, mode="r+", offset=_PACKED_HEADER.size, shape=(n,))
+        start = np.arange(m) * m - np.arange(m) * (np.arange(m) + 1) // 2  # offset of row i
+
+        buf = np.empty(m, dtype=np.float64)
+        labels: List[str] = []
+        max_err = 0.0
+        for i, label, row in _csv_rows(reader, col_labels, lambda i: buf):
+            labels.append(label)
+            tri[start[i]:start[i] + m - i - 1] = row[i + 1:]
+            err = abs(row[i] - 1.0)
+            if i:
+                upper = tri[start[:i] + (i - 1) - np.arange(i)].astype(np.float64)
+                err = max(err, float(np.abs(row[:i] * upper - 1.0).max()))
+            max_err = max(max_err, err)
+            if on_row is not None:
+                on_row(i, max_err)
+        tri.flush()
+        del tri
+    finally:
+        if owned:
+            fh.close()
+
+    names = "\n".join(labels).encode("utf-8")
+    with open(dst, "r+b") as out:
+        out.seek(_PACKED_HEADER.size + data_len)
+        out.write(names)
+        out.seek(0)
+        out.write(_PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, dtype.itemsize,
+                                      m, _PACKED_HEADER.size + data_len, len(names)))
+    return max_err
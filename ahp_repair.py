@@ -0,0 +1,137 @@
+# ahp_repair.py
+"""Suggest the fewest Saaty-scale judgment changes that bring CR under a target.
+
+Each round ranks the judgments by how far the Step 5 ratio
+eᵢⱼ = pᵢⱼ·ωⱼ/ωᵢ (Mulᵢⱼ / ωᵢ) is from 1 — the consistent value — and scores
+the top candidates at every Saaty value between pᵢⱼ and ωᵢ/ωⱼ with the
+closed form from ahp_sensitivity.  The best change is applied to an
+IncrementalAHP state (O(m)), and the loop repeats until CR ≤ target.
+
+A change that alone reaches the target wins, preferring the smallest step;
+otherwise the largest CR reduction is taken.  Each judgment changes at most
+once, so the default budget is every judgment; badly inconsistent matrices
+can need thousands of changes.  Check `reached_target` and `stopped`: a
+result that ran out of budget or candidates still lists its steps.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from ahp_engine import CR_THRESHOLD, consistency
+from ahp_incremental import IncrementalAHP
+from ahp_ri import SAATY_SCALE
+from ahp_sensitivity import edit_effects
+
+
+@dataclass
+class RepairStep:
+    row: str
+    col: str
+    old: float
+    new: float
+    deviation: float  # |log eᵢⱼ| before the change
+    CR: float         # CR after the change
+
+
+@dataclass
+class RepairResult:
+    CR_before: float
+    CR_after: float
+    target: float
+    steps: List[RepairStep] = field(default_factory=list)
+    w: Optional[np.ndarray] = None
+    P: Optional[np.ndarray] = None
+    stopped: str = "target"   # target | max_changes | no_candidates | no_improvement
+
+    @property
+    def reached_target(self) -> bool:
+        return self.CR_after <= self.target
+
+
+def inconsistency_ranking(state: IncrementalAHP, top: Optional[int] = None,
+                          exclude: Optional[np.ndarray] = None):
+    """(i, j, |log eᵢⱼ|) for i < j, worst first.
+
+    `exclude` is a boolean mask over the np.triu_indices(m, 1) pairs to skip.
+    """
+    m = state.m
+    iu, ju = np.triu_indices(m, 1)
+    x = np.log(state.w)
+    dev = np.abs(np.log(state.P[iu, ju]) + x[ju] - x[iu])
+    if exclude is not None:
+        dev[exclude] = -1.0
+    if top is not None and top < dev.size:
+        part = np.argpartition(-dev, top)[:top]
+        order = part[np.argsort(-dev[part], kind="stable")]
+    else:
+        order = np.argsort(-dev, kind="stable")
+    order = order[dev[order] >= 0]
+    return iu[order], ju[order], dev[order]
+
+
+def repair(P, labels: Optional[Sequence[str]] = None, target: float = CR_THRESHOLD,
+           max_changes: Optional[int] = None, candidates: int = 16,
+           values: Sequence[float] = SAATY_SCALE) -> RepairResult:
+    """Greedy minimal-change repair; returns the proposed edits in order.
+
+    `max_changes` defaults to m(m-1)/2, i.e. no limit beyond changing each
+    judgment once.
+    """
+    state = IncrementalAHP(P, labels)
+    values = np.asarray(values, dtype=np.float64)
+    log_vals = np.log(values)
+    result = RepairResult(CR_before=state.CR, CR_after=state.CR, target=target)
+    m = state.m
+    touched = np.zeros(m * (m - 1) // 2, dtype=bool)  # each judgment is changed at most once
+    if max_changes is None:
+        max_changes = touched.size
+
+    while state.CR > target:
+        if len(result.steps) >= max_changes:
+            result.stopped = "max_changes"
+            break
+        i, j, dev = inconsistency_ranking(state, top=candidates, exclude=touched)
+        if not i.size:
+            result.stopped = "no_candidates"
+            break
+
+        _, _, _, _, _, lam_max = edit_effects(state.P, state.GM, state.w, state.Pw, state.lam,
+                                              i, j, values[None, :])
+        _, _, CR = consistency(lam_max, state.m)
+
+        # only values between the current judgment and the consistent ratio ωᵢ/ωⱼ
+        cur = np.log(state.P[i, j])[:, None]
+        ideal = (np.log(state.w[i]) - np.log(state.w[j]))[:, None]
+        lo, hi = np.minimum(cur, ideal), np.maximum(cur, ideal)
+        step = np.abs(log_vals[None, :] - cur)
+        valid = (log_vals[None, :] >= lo - 1e-12) & (log_vals[None, :] <= hi + 1e-12) & (step > 1e-12)
+        # also allow the Saaty value just past the ideal, which rounding may need
+        nearest = np.argmin(np.abs(log_vals[None, :] - ideal), axis=1)
+        valid[np.arange(i.size), nearest] |= step[np.arange(i.size), nearest] > 1e-12
+        if not valid.any():
+            result.stopped = "no_candidates"
+            break
+
+        reaches = valid & (CR <= target)
+        if reaches.any():
+            k, s = np.unravel_index(np.argmin(np.where(reaches, step, np.inf)), CR.shape)
+        else:
+            k, s = np.unravel_index(np.argmin(np.where(valid, CR, np.inf)), CR.shape)
+            if CR[k, s] >= state.CR:
+                result.stopped = "no_improvement"
+                break
+
+        a, b = int(i[k]), int(j[k])
+        old = float(state.P[a, b])
+        state.set(a, b, values[s])
+        touched[a * m - a * (a + 1) // 2 + (b - a - 1)] = True
+        result.steps.append(RepairStep(row=state.labels[a], col=state.labels[b], old=old,
+                                       new=float(values[s]), deviation=float(dev[k]), CR=state.CR))
+
+    result.CR_after = state.CR
+    result.w = state.w.copy()
+    result.P = state.P.copy()
+    return result
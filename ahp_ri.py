@@ -0,0 +1,204 @@
+# ahp_ri.py
+"""Monte Carlo Random Index (RI) for any m, with a versioned on-disk cache.
+
+RI(m) is the mean consistency index CI = (λmax - m)/(m - 1) of random
+reciprocal matrices whose upper-triangle entries are drawn uniformly from
+the 17-value Saaty scale {1/9, ..., 1/2, 1, 2, ..., 9}.  Matrices are
+generated and solved in batches (power iteration from the GM weights), so
+the first simulation for m up to ~1,000 takes seconds and every later
+lookup is a dictionary read.
+
+    python ahp_ri.py 16 200            # precompute m = 16..200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+SAATY_SCALE = np.array([1 / 9, 1 / 8, 1 / 7, 1 / 6, 1 / 5, 1 / 4, 1 / 3, 1 / 2,
+                        1, 2, 3, 4, 5, 6, 7, 8, 9], dtype=np.float64)
+
+CACHE_VERSION = 1
+DEFAULT_SEED = 20240101
+BATCH_BYTES = 256 * 2 ** 20  # memory for one batch of (B, m, m) matrices
+CACHE_ENV = "AHP_RI_CACHE"
+
+
+def default_samples(m: int) -> int:
+    """Fewer samples for large m: the CI spread shrinks roughly like 1/m."""
+    return int(min(10_000, max(200, 5e7 // (m * m))))
+
+
+def default_cache_path() -> Path:
+    env = os.environ.get(CACHE_ENV)
+    if env:
+        return Path(env)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "ahp" / "ri_cache.json"
+
+
+# ---------- simulation ----------
+def random_saaty_batch(rng: np.random.Generator, n: int, m: int) -> np.ndarray:
+    """n random reciprocal (m, m) matrices on the Saaty scale."""
+    # SAATY_SCALE[16 - k] == 1 / SAATY_SCALE[k], so mirror the index, not the value
+    k = rng.integers(0, SAATY_SCALE.size, size=(n, m, m), dtype=np.int8)
+    upper = np.triu(np.ones((m, m), dtype=bool), 1)
+    k = np.where(upper, k, SAATY_SCALE.size - 1 - k.transpose(0, 2, 1))
+    A = SAATY_SCALE[k]
+    A[:, np.arange(m), np.arange(m)] = 1.0
+    return A
+
+
+def simulate_ri(m: int, samples: Optional[int] = None, seed: int = DEFAULT_SEED,
+                batch_bytes: int = BATCH_BYTES) -> float:
+    """Mean CI of `samples` random Saaty matrices of size m."""
+    from ahp_engine import power_iteration
+
+    if m <= 2:
+        return 0.0
+    samples = samples or default_samples(m)
+    rng = np.random.default_rng([seed, m])
+    batch = max(1, min(samples, batch_bytes // (m * m * 8)))
+    total = 0.0
+    done = 0
+    while done < samples:
+        n = min(batch, samples - done)
+        A = random_saaty_batch(rng, n, m)
+        gm = np.exp(np.log(A).mean(axis=2))
+        gm /= gm.sum(axis=1, keepdims=True)
+        _, lam, _ = power_iteration(A, gm, tol=1e-10)
+        total += float(((lam - m) / (m - 1)).sum())
+        done += n
+    return total / samples
+
+
+# ---------- cache ----------
+class RICache:
+    """JSON cache {version, scale, entries: {"m/samples/seed": ri}}.
+
+    Writes go through a temp file + os.replace, so concurrent batch workers
+    never see a half-written cache; the worst case is a recomputation.
+    The file is re-read when its mtime changes, so values precomputed by
+    another process (the CLI, a batch worker) show up without a restart.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path is not None else default_cache_path()
+        self._entries: Optional[Dict[str, float]] = None
+        self._table: Optional[Dict[int, float]] = None
+        self._mtime: Optional[int] = None
+
+    @staticmethod
+    def key(m: int, samples: int, seed: int) -> str:
+        return f"{m}/{samples}/{seed}"
+
+    def _stat_mtime(self) -> Optional[int]:
+        try:
+            return self.path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    @property
+    def entries(self) -> Dict[str, float]:
+        mtime = self._stat_mtime()
+        if self._entries is None or mtime != self._mtime:
+            self._mtime = mtime
+            self._entries = self._load()
+            self._table = None
+        return self._entries
+
+    def _load(self) -> Dict[str, float]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CACHE_VERSION or data.get("scale") != "saaty17":
+            return {}
+        return {k: float(v) for k, v in data.get("entries", {}).items()}
+
+    def get(self, m: int, samples: int, seed: int) -> Optional[float]:
+        return self.entries.get(self.key(m, samples, seed))
+
+    def put(self, m: int, samples: int, seed: int, ri: float) -> None:
+        self._entries = {**self._load(), **self.entries, self.key(m, samples, seed): ri}
+        self._table = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": CACHE_VERSION, "scale": "saaty17", "entries": self._entries}
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".ri_cache.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(payload, fh, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._mtime = self._stat_mtime()
+
+    def table(self) -> Dict[int, float]:
+        """Best (most-sampled) cached RI per m."""
+        entries = self.entries
+        if self._table is None:
+            best: Dict[int, tuple] = {}
+            for k, ri in entries.items():
+                m, samples, _ = (int(x) for x in k.split("/"))
+                if m not in best or samples > best[m][0]:
+                    best[m] = (samples, ri)
+            self._table = {m: ri for m, (_, ri) in sorted(best.items())}
+        return self._table
+
+
+_default_cache: Optional[RICache] = None
+
+
+def default_cache() -> RICache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = RICache()
+    return _default_cache
+
+
+def lookup(m: int, samples: Optional[int] = None, seed: int = DEFAULT_SEED,
+           cache: Optional[RICache] = None, compute: bool = True) -> Optional[float]:
+    """Cached simulated RI(m); simulates and stores it on a miss if `compute`.
+
+    Without `samples` any cached entry for m counts (the most-sampled one,
+    as in `table()`); only a miss simulates default_samples(m).
+    """
+    cache = cache or default_cache()
+    ri = cache.table().get(m) if samples is None else None
+    samples = samples or default_samples(m)
+    if ri is None:
+        ri = cache.get(m, samples, seed)
+    if ri is None and compute:
+        ri = simulate_ri(m, samples=samples, seed=seed)
+        try:
+            cache.put(m, samples, seed, ri)
+        except OSError:
+            pass  # read-only home: still return the value
+    return ri
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Precompute simulated Random Index values.")
+    ap.add_argument("m_from", type=int)
+    ap.add_argument("m_to", type=int)
+    ap.add_argument("--samples", type=int, default=None, help="matrices per m (default: by m)")
+    ap.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    ap.add_argument("--cache", default=None, help=f"cache file (default: ${CACHE_ENV} or ~/.cache/ahp)")
+    args = ap.parse_args(argv)
+
+    cache = RICache(args.cache)
+    for m in range(max(3, args.m_from), args.m_to + 1):
+        print(f"{m}\t{lookup(m, args.samples, args.seed, cache=cache):.6f}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+# ahp_sensitivity.py
+"""One-at-a-time sensitivity of the GM weights and CR to every judgment.
+
+For each pair i < j, pᵢⱼ is swept over the 17 Saaty values (pⱼᵢ follows as
+the reciprocal).  Moving one judgment only changes GMᵢ and GMⱼ (see
+ahp_incremental), so ω', λmax' and CR' for all m(m-1)/2 × 17 scenarios
+come from closed forms over precomputed O(m) vectors: one array pass,
+no per-scenario rerun.
+
+    q = Pᵀ(1/ω)                      column sums of pₖᵢ/ωₖ
+    λ'ₖ = λₖ + (δᵢpₖᵢ + δⱼpₖⱼ)/(c ωₖ)  for k ≠ i, j
+
+`edit_effects` is the shared closed form; ahp_repair uses it too.
+"""
+from __future__ import annotations
+
+import csv
+import io
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from ahp_engine import CR_THRESHOLD, consistency, default_labels, run_ahp
+from ahp_ri import SAATY_SCALE
+
+TIE_RTOL = 1e-9
+
+
+@dataclass
+class SensitivityResult:
+    labels: List[str]
+    m: int
+    w: np.ndarray         # (m,) current ω
+    CR: float             # current CR
+    i: np.ndarray         # (K,) pair rows
+    j: np.ndarray         # (K,) pair cols, i < j
+    current: np.ndarray   # (K,) current pᵢⱼ
+    values: np.ndarray    # (S,) swept values
+    scale: np.ndarray     # (K, S) factor c applied to every ωₖ, k ≠ i, j
+    w_i: np.ndarray       # (K, S) new ωᵢ
+    w_j: np.ndarray       # (K, S) new ωⱼ
+    max_dw: np.ndarray    # (K, S) max |ω'ₖ - ωₖ|
+    lam_max: np.ndarray   # (K, S)
+    CR_sweep: np.ndarray  # (K, S)
+    flips: np.ndarray     # (K, S) ranking differs from the current one
+
+    def weights(self, k: int, s: int) -> np.ndarray:
+        """Full ω' for pair k at swept value s (O(m))."""
+        w = self.w * self.scale[k, s]
+        w[self.i[k]], w[self.j[k]] = self.w_i[k, s], self.w_j[k, s]
+        return w
+
+    def tornado(self) -> List[dict]:
+        """One row per judgment, sorted by the widest swing in ω."""
+        swing = self.max_dw.max(axis=1)
+        order = np.argsort(-swing, kind="stable")
+        rows = []
+        for k in order:
+            f = np.flatnonzero(self.flips[k])
+            rows.append({
+                "row": self.labels[self.i[k]],
+                "col": self.labels[self.j[k]],
+                "current": float(self.current[k]),
+                "max_abs_dw": float(swing[k]),
+                "w_row_min": float(self.w_i[k].min()),
+                "w_row_max": float(self.w_i[k].max()),
+                "CR_min": float(self.CR_sweep[k].min()),
+                "CR_max": float(self.CR_sweep[k].max()),
+                "crosses_CR": bool(((self.CR_sweep[k] <= CR_THRESHOLD) != (self.CR <= CR_THRESHOLD)).any()),
+                "flips_ranking": bool(f.size),
+                "flip_values": [float(self.values[s]) for s in f],
+            })
+        return rows
+
+    def flipping_judgments(self) -> List[dict]:
+        """Judgments for which some Saaty value changes the ranking, with the
+        flip value closest (in log scale) to the current judgment."""
+        out = []
+        for k in np.flatnonzero(self.flips.any(axis=1)):
+            f = np.flatnonzero(self.flips[k])
+            dist = np.abs(np.log(self.values[f]) - np.log(self.current[k]))
+            s = f[np.argmin(dist)]
+            out.append({
+                "row": self.labels[self.i[k]],
+                "col": self.labels[self.j[k]],
+                "current": float(self.current[k]),
+                "nearest_flip": float(self.values[s]),
+                "CR_at_flip": float(self.CR_sweep[k, s]),
+            })
+        out.sort(key=lambda r: abs(np.log(r["nearest_flip"]) - np.log(r["current"])))
+        return out
+
+    def tornado_csv(self) -> str:
+        buf = io.StringIO()
+        fields = ["row", "col", "current", "max_abs_dw", "w_row_min", "w_row_max",
+                  "CR_min", "CR_max", "crosses_CR", "flips_ranking", "flip_values"]
+        wr = csv.DictWriter(buf, fieldnames=fields, lineterminator="\n")
+        wr.writeheader()
+        for r in self.tornado():
+            wr.writerow({**r, "flip_values": " ".join(f"{v:.6g}" for v in r["flip_values"])})
+        return buf.getvalue()
+
+
+def _tie(a, b):
+    return np.abs(a - b) <= TIE_RTOL * np.maximum(np.abs(a), np.abs(b))
+
+
+def _gt(a, b):
+    return (a > b) & ~_tie(a, b)
+
+
+def _top3_excluding(w: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """max ωₖ over k ∉ {i, j}, per pair."""
+    top = np.argsort(-w)[:3]
+    cand = np.broadcast_to(top, (i.size, top.size))
+    ok = (cand != i[:, None]) & (cand != j[:, None])
+    first = np.argmax(ok, axis=1)
+    vals = w[cand[np.arange(i.size), first]]
+    return np.where(ok.any(axis=1), vals, 0.0)
+
+
+def edit_effects(P: np.ndarray, GM: np.ndarray, w: np.ndarray, Pw: np.ndarray, lam: np.ndarray,
+                 i: np.ndarray, j: np.ndarray, values: np.ndarray):
+    """Closed-form effect of setting pᵢⱼ = v (and pⱼᵢ = 1/v) for each pair and value.
+
+    i, j are (K,) pair indices and `values` broadcasts against (K, S).
+    Returns (c, gi, gj, wi, wj, lam_max), all (K, S): c rescales every ωₖ
+    with k ≠ i, j.  P is only read in the columns named by i and j.
+    """
+    m = P.shape[0]
+    cur, p_ji = P[i, j][:, None], P[j, i][:, None]
+    v = np.asarray(values, dtype=np.float64)
+
+    # Steps 2-4; row j moves from its own old cell (P need not be reciprocal)
+    gi = GM[i][:, None] * np.exp((np.log(v) - np.log(cur)) / m)
+    gj = GM[j][:, None] * np.exp((-np.log(v) - np.log(p_ji)) / m)
+    sum_gm = GM.sum()
+    new_sum = sum_gm - GM[i][:, None] - GM[j][:, None] + gi + gj
+    c = sum_gm / new_sum
+    wi, wj = gi / new_sum, gj / new_sum
+    di = wi - c * w[i][:, None]
+    dj = wj - c * w[j][:, None]
+
+    # Steps 5-6: λ' summed over k ≠ i, j, plus λ'ᵢ and λ'ⱼ
+    inv_w = 1.0 / np.where(w == 0, 1e-18, w)
+    cols = np.unique(np.concatenate([i, j]))
+    q = np.zeros(m)
+    q[cols] = inv_w @ P[:, cols]                          # Σₖ pₖᵢ/ωₖ, touched columns only
+    q_i = q[i] - P[i, i] * inv_w[i] - P[j, i] * inv_w[j]
+    q_j = q[j] - P[i, j] * inv_w[i] - P[j, j] * inv_w[j]
+    lam_rest = lam.sum() - lam[i] - lam[j]
+    sum_other = lam_rest[:, None] + (di * q_i[:, None] + dj * q_j[:, None]) / c
+
+    p_ii, p_jj = P[i, i][:, None], P[j, j][:, None]
+    Pw_i = c * Pw[i][:, None] + di * p_ii + dj * cur + (v - cur) * wj
+    Pw_j = c * Pw[j][:, None] + di * p_ji + dj * p_jj + (1.0 / v - p_ji) * wi
+    lam_max = (sum_other + Pw_i / wi + Pw_j / wj) / m
+    return c, gi, gj, wi, wj, lam_max
+
+
+def sweep(P, labels: Optional[Sequence[str]] = None,
+          values: Sequence[float] = SAATY_SCALE) -> SensitivityResult:
+    """All one-at-a-time sweeps of the GM pipeline in one vectorized pass."""
+    base = run_ahp(P, labels)
+    P, m, w, GM = base.P, base.m, base.w, base.GM
+    values = np.asarray(values, dtype=np.float64)
+    i, j = np.triu_indices(m, 1)
+    cur = P[i, j]
+    c, gi, gj, wi, wj, lam_max = edit_effects(P, GM, w, base.Pw, base.lam, i, j, values[None, :])
+    _, _, CR = consistency(lam_max, m)
+
+    # Largest single weight change
+    w_rest = _top3_excluding(w, i, j)[:, None]
+    max_dw = np.maximum.reduce([np.abs(c - 1.0) * w_rest,
+                                np.abs(wi - w[i][:, None]), np.abs(wj - w[j][:, None])])
+
+    # Ranking flips: only i and j can move relative to the (rescaled) rest.
+    # The ranking is a weak order; weights within TIE_RTOL count as tied.
+    G = np.sort(GM)
+
+    def placement(x, own_i, own_j):
+        lo = np.searchsorted(G, x * (1 - TIE_RTOL), side="left")
+        hi = np.searchsorted(G, x * (1 + TIE_RTOL), side="right")
+        above = m - hi - _gt(own_i, x) - _gt(own_j, x)
+        tied = hi - lo - _tie(own_i, x) - _tie(own_j, x)
+        return above, tied
+
+    gi0, gj0 = GM[i][:, None], GM[j][:, None]
+    flips = np.zeros(gi.shape, dtype=bool)
+    for new, old in ((gi, gi0), (gj, gj0)):
+        a1, t1 = placement(new, gi0, gj0)
+        a0, t0 = placement(old, gi0, gj0)
+        flips |= (a1 != a0) | (t1 != t0)
+    flips |= (_gt(gi, gj) != _gt(gi0, gj0)) | (_tie(gi, gj) != _tie(gi0, gj0))
+
+    return SensitivityResult(
+        labels=list(labels) if labels is not None else default_labels(m), m=m, w=w,
+        CR=base.CR, i=i, j=j, current=cur, values=values, scale=c, w_i=wi, w_j=wj,
+        max_dw=max_dw, lam_max=lam_max, CR_sweep=CR, flips=flips,
+    )
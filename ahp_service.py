@@ -0,0 +1,452 @@
+# ahp_service.py
+"""Local HTTP scoring service for the AHP pipeline (stdlib asyncio, no framework).
+
+    python ahp_service.py --port 8765 -j 4
+
+Routes:
+
+    POST /v1/ahp          one matrix: a Step 1 CSV body (text/csv), or JSON
+                          {"csv": "..."} or {"matrix": [[...]], "labels": [...]}
+                          ?method=gm|eigen (or "method" in the JSON)
+    POST /v1/ahp/batch    JSON {"items": [<csv string or {"matrix": ...}>, ...]}
+    GET  /metrics         Prometheus text: latency and batch-size histograms,
+                          in-flight requests, the concurrency limit
+    GET  /stats           the same numbers as JSON
+    GET  /healthz
+
+Results are the `build_results_csv` sections as JSON (consistency,
+eigenvector, weights, matrix, timings).  Non-finite Π (huge m) is null.
+
+Work never runs on the event loop.  Single-matrix requests wait up to
+`batch_window` seconds for others with the same method and go to the
+worker pool together (at most `max_batch`); the worker parses every item
+and runs run_ahp_batch once per matrix size, so a burst of small requests
+costs one pool round trip.  `max_concurrency` requests are processed at
+once, `max_queue` more may wait, and the rest get 503 with Retry-After.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from ahp_engine import AHPResult, METHODS, default_labels, parse_pairwise_csv, run_ahp_batch
+
+LATENCY_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+BATCH_BOUNDS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+MAX_BATCH_ITEMS = 10_000
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+
+# ---------- results as JSON ----------
+def _num(x) -> Optional[float]:
+    x = float(x)
+    return x if math.isfinite(x) else None
+
+
+def result_json(res: AHPResult) -> dict:
+    """The build_results_csv sections with the same field names, as plain JSON."""
+    out = {
+        "consistency": {"m": res.m, "lambda_max": res.lam_max, "SI": res.SI, "RI": res.ri,
+                        "CR": res.CR, "decision": res.decision, "max_reciprocal_error": res.max_err},
+        "weights": [{"criteria": label, "Pi": _num(res.Pi[i]), "log_Pi": _num(res.log_Pi[i]),
+                     "GM": float(res.GM[i]), "w": float(res.w[i]), "Pw": float(res.Pw[i]),
+                     "lambda_i": float(res.lam[i])} for i, label in enumerate(res.labels)],
+        "matrix": {"criteria": list(res.labels), "P": res.P.tolist()},
+    }
+    if res.method == "eigen":
+        out["eigenvector"] = {"method": "power_iteration", "iterations": res.iterations,
+                              "time_ms": res.elapsed * 1000}
+    if res.timings:
+        out["timings"] = [{"stage": stage, "ms": sec * 1000} for stage, sec in res.timings]
+    return out
+
+
+def _parse_item(item) -> Tuple[List[str], np.ndarray]:
+    if isinstance(item, str):
+        labels, _, P = parse_pairwise_csv(item)
+        return labels, P
+    if not isinstance(item, dict):
+        raise ValueError("Each item must be a CSV string or an object with \"csv\" or \"matrix\".")
+    if "csv" in item:
+        return _parse_item(str(item["csv"]))
+    try:
+        P = np.asarray(item["matrix"], dtype=np.float64)
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError("\"matrix\" must be a square array of positive numbers.") from exc
+    if P.ndim != 2 or P.shape[0] != P.shape[1]:
+        raise ValueError("Matrix must be square: number of columns must equal number of rows.")
+    labels = item.get("labels")
+    if labels is None:
+        return default_labels(P.shape[0]), P
+    if not isinstance(labels, list) or not all(isinstance(x, str) for x in labels):
+        raise ValueError("\"labels\" must be a list of strings.")
+    if len(labels) != P.shape[0]:
+        raise ValueError(f"{len(labels)} labels for {P.shape[0]} criteria.")
+    return labels, P
+
+
+def score_items(items: Sequence, method: str = "gm") -> List[dict]:
+    """Worker: parse every item and score them, one run_ahp_batch per matrix size.
+
+    Returns {"result": ...} or {"error": ...} per item, in order; one bad
+    item never fails the others.
+    """
+    out: List[Optional[dict]] = [None] * len(items)
+    groups: Dict[int, List[Tuple[int, List[str], np.ndarray, float]]] = {}
+    for k, item in enumerate(items):
+        t0 = time.perf_counter()
+        try:
+            labels, P = _parse_item(item)
+        except (TypeError, ValueError) as exc:
+            out[k] = {"error": str(exc)}
+            continue
+        groups.setdefault(P.shape[0], []).append((k, labels, P, time.perf_counter() - t0))
+    for m, group in groups.items():
+        t0 = time.perf_counter()
+        try:
+            batch = run_ahp_batch(np.stack([g[2] for g in group]), method=method)
+        except (TypeError, ValueError):
+            batch = None   # rerun one by one below so only the bad items fail
+        per = (time.perf_counter() - t0) / len(group)
+        for n, (k, labels, P, parse_s) in enumerate(group):
+            try:
+                if batch is None:
+                    t1 = time.perf_counter()
+                    res = run_ahp_batch(P[None], method=method).item(0, labels)
+                    per = time.perf_counter() - t1
+                else:
+                    res = batch.item(n, labels)
+            except (TypeError, ValueError) as exc:
+                out[k] = {"error": str(exc)}
+                continue
+            res.timings = [("parse", parse_s), ("pipeline", per)]
+            out[k] = {"result": result_json(res)}
+    return out
+
+
+# ---------- metrics ----------
+class Histogram:
+    """Fixed-bucket histogram (Prometheus style: cumulative on export)."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, x: float) -> None:
+        i = 0
+        while i < len(self.bounds) and x > self.bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += x
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bucket bound holding the q-quantile (None when empty; inf past the last)."""
+        if not self.count:
+            return None
+        target, seen = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return self.bounds[i] if i < len(self.bounds) else math.inf
+        return math.inf
+
+    def to_dict(self) -> dict:
+        return {"bounds": list(self.bounds), "counts": self.counts, "sum": self.sum, "count": self.count,
+                **{f"p{round(q * 100)}": (None if x is None or math.isinf(x) else x)
+                   for q in (0.5, 0.95, 0.99) for x in [self.quantile(q)]}}
+
+    def prometheus(self, name: str, labels: str = "", scale: float = 1.0) -> List[str]:
+        sep = "," if labels else ""
+        lines, acc = [], 0
+        for b, c in zip(self.bounds, self.counts):
+            acc += c
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{b * scale:g}"}} {acc}')
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum * scale:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+# ---------- micro-batching ----------
+class Batcher:
+    """Coalesce single-matrix requests per method into score_items calls."""
+
+    def __init__(self, service: "ScoringService"):
+        self.service = service
+        self.pending: Dict[str, List[Tuple[object, asyncio.Future]]] = {}
+        self.timers: Dict[str, asyncio.TimerHandle] = {}
+        self.tasks: set = set()   # running flushes; the loop only keeps weak references
+
+    def submit(self, item, method: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        queue = self.pending.setdefault(method, [])
+        queue.append((item, fut))
+        if len(queue) >= self.service.max_batch:
+            self._flush(method)
+        elif method not in self.timers:
+            self.timers[method] = loop.call_later(self.service.batch_window, self._flush, method)
+        return fut
+
+    def _flush(self, method: str) -> None:
+        timer = self.timers.pop(method, None)
+        if timer is not None:
+            timer.cancel()
+        queue = self.pending.pop(method, [])
+        if queue:
+            task = asyncio.ensure_future(self._run(queue, method))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, queue, method: str) -> None:
+        self.service.batch_sizes.observe(len(queue))
+        try:
+            results = await self.service.run_in_pool([item for item, _ in queue], method)
+        except Exception as exc:  # a crashed worker fails this batch, not the server
+            results = [{"error": f"{type(exc).__name__}: {exc}", "status": 500}] * len(queue)
+        for (_, fut), r in zip(queue, results):
+            if not fut.done():
+                fut.set_result(r)
+
+
+# ---------- service ----------
+class ScoringService:
+    def __init__(self, workers: Optional[int] = None, max_concurrency: int = 64, max_queue: int = 256,
+                 batch_window: float = 0.002, max_batch: int = 64, max_body: int = 32 * 2 ** 20):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_body = max_body
+        self.executor: Optional[Executor] = None
+        self.batcher = Batcher(self)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.latency: Dict[str, Histogram] = {}
+        self.responses: Dict[Tuple[str, int], int] = {}
+        self.batch_sizes = Histogram(BATCH_BOUNDS)
+        self.started = time.time()
+
+    # ---------- pool ----------
+    def start(self) -> None:
+        # workers=0 runs the pipeline on threads in this process (debugging, tiny hosts)
+        self.executor = (ThreadPoolExecutor(max_workers=2) if self.workers == 0
+                         else ProcessPoolExecutor(max_workers=self.workers))
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    def stop(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    async def run_in_pool(self, items: Sequence, method: str) -> List[dict]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, score_items, list(items), method)
+
+    # ---------- routes ----------
+    async def score(self, body: bytes, content_type: str, query: dict) -> Tuple[int, dict]:
+        method = query.get("method", ["gm"])[0]
+        if content_type.startswith("application/json"):
+            item = _json_body(body)
+            if isinstance(item, dict):
+                method = item.get("method", method)
+        else:
+            item = body.decode("utf-8-sig")
+        if method not in METHODS:
+            return 400, {"error": f"Unknown weighting method {method!r}; expected one of {METHODS}."}
+        r = await self.batcher.submit(item, method)
+        if "error" in r:
+            return r.get("status", 422), {"error": r["error"]}
+        return 200, r["result"]
+
+    async def score_batch(self, body: bytes, query: dict) -> Tuple[int, dict]:
+        data = _json_body(body)
+        items = data.get("items") if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            return 400, {"error": "Expected {\"items\": [...]}."}
+        if len(items) > MAX_BATCH_ITEMS:
+            return 413, {"error": f"At most {MAX_BATCH_ITEMS} items per batch."}
+        method = (data.get("method") if isinstance(data, dict) else None) or query.get("method", ["gm"])[0]
+        if method not in METHODS:
+            return 400, {"error": f"Unknown weighting method {method!r}; expected one of {METHODS}."}
+        self.batch_sizes.observe(len(items))
+        chunks = [items[s:s + self.max_batch * 16] for s in range(0, len(items), self.max_batch * 16)]
+        parts = await asyncio.gather(*(self.run_in_pool(c, method) for c in chunks))
+        return 200, {"items": [r for part in parts for r in part]}
+
+    def stats(self) -> dict:
+        return {
+            "uptime_s": time.time() - self.started,
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "batch_window_ms": self.batch_window * 1000,
+            "max_batch": self.max_batch,
+            "batch_size": self.batch_sizes.to_dict(),
+            "latency_ms": {route: h.to_dict() for route, h in sorted(self.latency.items())},
+            "responses": [{"route": r, "status": s, "count": n} for (r, s), n in sorted(self.responses.items())],
+        }
+
+    def prometheus(self) -> str:
+        lines = ["# TYPE ahp_request_duration_seconds histogram"]
+        for route, h in sorted(self.latency.items()):
+            lines += h.prometheus("ahp_request_duration_seconds", f'route="{route}"', scale=1e-3)
+        lines += ["# TYPE ahp_batch_size histogram"] + self.batch_sizes.prometheus("ahp_batch_size")
+        lines += ["# TYPE ahp_requests_total counter"]
+        lines += [f'ahp_requests_total{{route="{r}",status="{s}"}} {n}' for (r, s), n in sorted(self.responses.items())]
+        lines += [f"ahp_in_flight {self.in_flight}", f"ahp_waiting {self.waiting}",
+                  f"ahp_concurrency_limit {self.max_concurrency}", f"ahp_queue_limit {self.max_queue}",
+                  f"ahp_rejected_total {self.rejected}", f"ahp_workers {self.workers}"]
+        return "\n".join(lines) + "\n"
+
+    async def dispatch(self, verb: str, target: str, headers: dict, body: bytes) -> Tuple[int, str, bytes, str]:
+        """(status, content type, body, route label)."""
+        url = urlsplit(target)
+        route, query = url.path, parse_qs(url.query)
+        if route == "/healthz":
+            return 200, "text/plain", b"ok\n", route
+        if route == "/metrics":
+            return 200, "text/plain; version=0.0.4", self.prometheus().encode(), route
+        if route == "/stats":
+            return 200, "application/json", json.dumps(self.stats()).encode(), route
+        if route not in ("/v1/ahp", "/v1/ahp/batch"):
+            return 404, "application/json", b'{"error": "Not found."}', "other"
+        if verb != "POST":
+            return 405, "application/json", b'{"error": "Use POST."}', route
+
+        if self.waiting >= self.max_queue and self._slots.locked():
+            self.rejected += 1
+            return 503, "application/json", b'{"error": "Too many requests; retry later."}', route
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            if route == "/v1/ahp":
+                status, payload = await self.score(body, headers.get("content-type", "text/csv"), query)
+            else:
+                status, payload = await self.score_batch(body, query)
+        except ValueError as exc:
+            status, payload = 400, {"error": str(exc)}
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+        return status, "application/json", json.dumps(payload).encode(), route
+
+    # ---------- HTTP/1.1 ----------
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                t0 = time.perf_counter()
+                try:
+                    verb, target, version = line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, "text/plain", b"Malformed request line.\n", False)
+                    break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = h.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                length = int(headers.get("content-length") or 0)
+                if length > self.max_body:
+                    await self._respond(writer, 413, "text/plain", b"Request body too large.\n", False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, ctype, payload, route = await self.dispatch(verb, target, headers, body)
+                except Exception as exc:  # never take the connection loop down
+                    status, ctype, route = 500, "application/json", "error"
+                    payload = json.dumps({"error": f"{type(exc).__name__}: {exc}"}).encode()
+                await self._respond(writer, status, ctype, payload, keep)
+                self.latency.setdefault(route, Histogram(LATENCY_BOUNDS_MS)).observe(
+                    (time.perf_counter() - t0) * 1000)
+                self.responses[(route, status)] = self.responses.get((route, status), 0) + 1
+                if not keep:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status: int, ctype: str, body: bytes, keep: bool) -> None:
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\nContent-Type: {ctype}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep else 'close'}\r\n")
+        if status == 503:
+            head += "Retry-After: 1\r\n"
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        self.start()
+        server = await asyncio.start_server(self.handle, host, port, limit=2 ** 20)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.stop()
+
+
+def _json_body(body: bytes):
+    try:
+        return json.loads(body.decode("utf-8-sig") or "null")
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(f"Invalid JSON body: {exc}") from exc
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Serve the AHP pipeline over HTTP.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("-j", "--workers", type=int, default=None,
+                    help="worker processes (default: all cores; 0: threads in this process)")
+    ap.add_argument("--max-concurrency", type=int, default=64, help="requests processed at once")
+    ap.add_argument("--max-queue", type=int, default=256, help="requests waiting before 503")
+    ap.add_argument("--batch-window-ms", type=float, default=2.0, help="wait for more single requests")
+    ap.add_argument("--max-batch", type=int, default=64, help="single requests per pool call")
+    ap.add_argument("--max-body-mb", type=float, default=32.0)
+    args = ap.parse_args(argv)
+
+    service = ScoringService(workers=args.workers, max_concurrency=args.max_concurrency,
+                             max_queue=args.max_queue, batch_window=args.batch_window_ms / 1000,
+                             max_batch=args.max_batch, max_body=int(args.max_body_mb * 2 ** 20))
+    print(f"AHP service on http://{args.host}:{args.port} ({service.workers or 'thread'} workers)", file=sys.stderr)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
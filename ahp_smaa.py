@@ -0,0 +1,269 @@
+# ahp_smaa.py
+"""Stochastic (SMAA-style) analysis of how stable the AHP ranking is.
+
+    python ahp_smaa.py pairwise.csv                        # rank stability of the criteria
+    python ahp_smaa.py pairwise.csv table.csv -n 50000 --mode weights -j 0
+
+Scenarios come in one of two modes:
+
+* judgments   every pᵢⱼ (i < j) times exp(ε), ε ~ N(0, σ²), pⱼᵢ = 1/pᵢⱼ;
+              Steps 2-7 then rerun on the whole stack (run_ahp_batch), so
+              each scenario also has its own CR
+* weights     ω' ~ Dirichlet(κ·ω), centred on the Step 4 ω; larger κ means
+              less spread
+
+Each scenario ranks the items: the alternatives of a performance table
+(normalized as in ahp_alternatives) or, without a table, the criteria by
+their weights.  The rank-acceptability index bᵢᵣ is the share of
+scenarios in which item i is ranked r (1 = best).
+
+Scenarios are drawn in chunks sized to `chunk_bytes`; a chunk's scores,
+ranks and (judgments mode) its matrix stack are the only per-scenario
+buffers, so memory is O(chunk + scenarios·m) for the kept weights the
+confidence intervals are taken from.  Every chunk has its own seed
+spawned from `seed`, so results are the same with or without the
+process pool (`workers`).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ahp_alternatives import NORMALIZATIONS, PerformanceTable, affine_normalization, column_stats
+from ahp_engine import CR_THRESHOLD, METHODS, run_ahp, run_ahp_batch, run_ahp_csv, safe_csv
+
+MODES = ("judgments", "weights")
+DEFAULT_SCENARIOS = 10_000
+DEFAULT_SIGMA = 0.2
+DEFAULT_CONCENTRATION = 100.0
+CHUNK_BYTES = 32 * 2 ** 20
+SEED = 20240101
+
+
+@dataclass
+class SMAAResult:
+    labels: List[str]              # ranked items: alternatives, or the criteria
+    criteria: List[str]
+    w: np.ndarray                  # (m,) Step 4 ω of the unperturbed matrix
+    mode: str
+    scenarios: int                 # scenarios drawn
+    kept: int                      # scenarios ranked (judgments mode may drop CR > 0.10)
+    acceptability: np.ndarray      # (n, R) bᵢᵣ, rank r + 1
+    mean_rank: np.ndarray          # (n,) 1 = best
+    weight_mean: np.ndarray        # (m,)
+    weight_lo: np.ndarray          # (m,)
+    weight_hi: np.ndarray          # (m,)
+    level: float
+    CR: Optional[np.ndarray]       # (scenarios,) judgments mode only
+    elapsed: float
+
+    @property
+    def acceptable_share(self) -> Optional[float]:
+        """Share of perturbed matrices with CR ≤ 0.10 (judgments mode)."""
+        return None if self.CR is None else float((self.CR <= CR_THRESHOLD).mean())
+
+    def to_csv(self) -> str:
+        pct = f"{self.level * 100:g}"
+        lines = [f"SMAA,mode,{self.mode},scenarios,{self.scenarios},kept,{self.kept}", "",
+                 "Weights", f"criteria,w,mean,lo_{pct},hi_{pct}"]
+        for i, c in enumerate(self.criteria):
+            lines.append(f"{safe_csv(c)},{self.w[i]:.9f},{self.weight_mean[i]:.9f},"
+                         f"{self.weight_lo[i]:.9f},{self.weight_hi[i]:.9f}")
+        R = self.acceptability.shape[1]
+        lines += ["", "Rank acceptability",
+                  "item,mean_rank," + ",".join(f"b{r + 1}" for r in range(R))]
+        for i in np.argsort(self.mean_rank, kind="stable"):
+            lines.append(f"{safe_csv(self.labels[i])},{self.mean_rank[i]:.4f},"
+                         + ",".join(f"{x:.6f}" for x in self.acceptability[i]))
+        if self.CR is not None:
+            lines += ["", "Consistency", "metric,value",
+                      f"CR median,{np.median(self.CR):.9f}",
+                      f"CR p95,{np.quantile(self.CR, 0.95):.9f}",
+                      f"share CR <= {CR_THRESHOLD:.2f},{self.acceptable_share:.6f}"]
+        return "\n".join(lines)
+
+
+# ---------- one chunk (runs in the pool) ----------
+def _sample_weights(rng: np.random.Generator, count: int, mode: str, P: np.ndarray, w: np.ndarray,
+                    sigma: float, concentration: float, method: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """(count, m) scenario weights and, in judgments mode, their CRs."""
+    m = w.size
+    if mode == "weights":
+        G = rng.standard_gamma(np.maximum(concentration * w, 1e-12), size=(count, m))
+        return G / G.sum(axis=1, keepdims=True), None
+    E = np.triu(rng.normal(scale=sigma, size=(count, m, m)), 1)
+    E -= E.transpose(0, 2, 1)
+    np.exp(E, out=E)
+    E *= P
+    batch = run_ahp_batch(E, method=method)
+    return batch.w, batch.CR
+
+
+def _rank_counts(scores: np.ndarray, ranks: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(n, ranks) counts of item i at rank r, and (n,) summed ranks (0-based)."""
+    c, n = scores.shape
+    order = np.argsort(-scores, axis=1, kind="stable")   # item at each rank; ties keep the earlier item
+    counts = np.bincount((order[:, :ranks] * ranks + np.arange(ranks)).ravel(),
+                         minlength=n * ranks).reshape(n, ranks)
+    pos = np.empty_like(order)
+    pos[np.arange(c)[:, None], order] = np.arange(n)
+    return counts, pos.sum(axis=0)
+
+
+def run_chunk(seed, count: int, mode: str, P: np.ndarray, w: np.ndarray, X: Optional[np.ndarray],
+              ranks: int, sigma: float, concentration: float, method: str, consistent_only: bool):
+    """Draw `count` scenarios; returns (counts, rank sums, kept weights, CRs)."""
+    rng = np.random.default_rng(seed)
+    W, CR = _sample_weights(rng, count, mode, P, w, sigma, concentration, method)
+    if consistent_only and CR is not None:
+        W = W[CR <= CR_THRESHOLD]
+    scores = W if X is None else W @ X.T
+    counts, rank_sum = _rank_counts(scores, ranks)
+    return counts, rank_sum, W, CR
+
+
+# ---------- driver ----------
+def run_smaa(P, X: Optional[np.ndarray] = None, labels: Optional[Sequence[str]] = None,
+             criteria: Optional[Sequence[str]] = None, scenarios: int = DEFAULT_SCENARIOS,
+             mode: str = "judgments", sigma: float = DEFAULT_SIGMA,
+             concentration: float = DEFAULT_CONCENTRATION, method: str = "gm",
+             ranks: Optional[int] = None, level: float = 0.95, consistent_only: bool = False,
+             seed: int = SEED, workers: Optional[int] = 1, chunk_bytes: int = CHUNK_BYTES) -> SMAAResult:
+    """SMAA over `scenarios` draws around the matrix P.
+
+    X is an already normalized (n, m) performance table (larger = better);
+    without it the criteria themselves are ranked.  `ranks` limits the
+    acceptability matrix to the first ranks (all by default).  `workers`
+    > 1 spreads the chunks over a process pool; None or 0 uses every core.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown scenario mode {mode!r}; expected one of {MODES}.")
+    if method not in METHODS:
+        raise ValueError(f"Unknown weighting method {method!r}; expected one of {METHODS}.")
+    if scenarios < 1:
+        raise ValueError("Need at least one scenario.")
+    t0 = time.perf_counter()
+    base = run_ahp(P, labels=criteria, method=method)
+    P, w, m = base.P, base.w, base.m
+    criteria = base.labels
+    if X is not None:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != m:
+            raise ValueError(f"Performance table must have {m} columns, one per criterion.")
+        labels = list(labels) if labels is not None else [f"A{i + 1}" for i in range(X.shape[0])]
+    else:
+        labels = list(criteria)
+    n = len(labels)
+    ranks = n if ranks is None else max(1, min(ranks, n))
+
+    # bytes per scenario: scores, argsort order and positions, plus the matrix stack
+    per = n * 24 + m * 8 + (m * m * 8 * 3 if mode == "judgments" else 0)
+    size = max(1, min(scenarios, chunk_bytes // per))
+    sizes = [min(size, scenarios - s) for s in range(0, scenarios, size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    job = partial(run_chunk, mode=mode, P=P, w=w, X=X, ranks=ranks, sigma=sigma,
+                  concentration=concentration, method=method, consistent_only=consistent_only)
+
+    workers = workers or 0
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    if workers == 1 or len(sizes) == 1:
+        parts = map(job, seeds, sizes)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(sizes)))
+        parts = pool.map(job, seeds, sizes)
+
+    counts = np.zeros((n, ranks), dtype=np.int64)
+    rank_sum = np.zeros(n, dtype=np.int64)
+    W_parts, CR_parts = [], []
+    try:
+        for c, r, W, CR in parts:
+            counts += c
+            rank_sum += r
+            W_parts.append(W)
+            if CR is not None:
+                CR_parts.append(CR)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    W = np.concatenate(W_parts)
+    kept = W.shape[0]
+    if kept == 0:
+        raise ValueError("No scenario passed the CR ≤ 0.10 filter; lower sigma or drop consistent_only.")
+    alpha = (1.0 - level) / 2
+    lo, hi = np.quantile(W, [alpha, 1.0 - alpha], axis=0)
+    return SMAAResult(labels=labels, criteria=list(criteria), w=w, mode=mode, scenarios=scenarios,
+                      kept=kept, acceptability=counts / kept, mean_rank=rank_sum / kept + 1.0,
+                      weight_mean=W.mean(axis=0), weight_lo=lo, weight_hi=hi, level=level,
+                      CR=np.concatenate(CR_parts) if CR_parts else None,
+                      elapsed=time.perf_counter() - t0)
+
+
+def load_table(src, criteria: Sequence[str], normalization: str = "minmax",
+               cost: Optional[Sequence[str]] = None) -> Tuple[List[str], np.ndarray]:
+    """(alternative ids, normalized (n, m) table) via ahp_alternatives."""
+    table = PerformanceTable(src, criteria)
+    stats = column_stats(table)
+    mask = np.isin(table.criteria, list(cost)) if cost else None
+    a, b = affine_normalization(stats, normalization, mask)
+    ids: List[str] = []
+    blocks = []
+    for chunk_ids, X in table.chunks():
+        ids.extend(str(x) for x in chunk_ids)
+        blocks.append(X * a + b)
+    return ids, np.concatenate(blocks)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Rank acceptability and weight intervals under uncertainty.")
+    ap.add_argument("pairwise", help="pairwise criteria CSV (the Step 1 format)")
+    ap.add_argument("table", nargs="?", default=None,
+                    help="performance table (CSV or .npy, see ahp_alternatives); default: rank the criteria")
+    ap.add_argument("-n", "--scenarios", type=int, default=DEFAULT_SCENARIOS)
+    ap.add_argument("--mode", choices=MODES, default="judgments")
+    ap.add_argument("--sigma", type=float, default=DEFAULT_SIGMA, help="log-normal spread of each judgment")
+    ap.add_argument("--concentration", type=float, default=DEFAULT_CONCENTRATION,
+                    help="Dirichlet concentration κ for --mode weights")
+    ap.add_argument("--method", choices=METHODS, default="gm", help="weighting method")
+    ap.add_argument("--consistent-only", action="store_true", help="rank only scenarios with CR <= 0.10")
+    ap.add_argument("--ranks", type=int, default=None, help="acceptability columns to report (default: all)")
+    ap.add_argument("--level", type=float, default=0.95, help="confidence level of the weight intervals")
+    ap.add_argument("--normalize", choices=NORMALIZATIONS, default="minmax")
+    ap.add_argument("--cost", default="", help="comma-separated criteria where lower is better")
+    ap.add_argument("--seed", type=int, default=SEED)
+    ap.add_argument("-j", "--workers", type=int, default=1, help="processes (0: all cores)")
+    ap.add_argument("-o", "--out", default=None, help="write the report CSV here (default: stdout)")
+    args = ap.parse_args(argv)
+
+    ahp = run_ahp_csv(Path(args.pairwise).read_text(encoding="utf-8-sig"), method=args.method)
+    ids, X = None, None
+    if args.table:
+        cost = [c.strip() for c in args.cost.split(",") if c.strip()]
+        ids, X = load_table(args.table, ahp.labels, args.normalize, cost)
+    res = run_smaa(ahp.P, X, ids, ahp.labels, scenarios=args.scenarios, mode=args.mode,
+                   sigma=args.sigma, concentration=args.concentration, method=args.method,
+                   ranks=args.ranks, level=args.level, consistent_only=args.consistent_only,
+                   seed=args.seed, workers=args.workers)
+    text = res.to_csv() + "\n"
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    print(f"{res.kept}/{res.scenarios} scenarios in {res.elapsed:.2f}s "
+          f"({res.scenarios / res.elapsed:,.0f}/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+# ahp_sparse.py
+"""Incomplete pairwise comparisons: sparse judgment graph + LLSM weights.
+
+Only the judgments an expert actually gave are stored, as edges (i, j,
+log pᵢⱼ).  Weights come from the logarithmic least-squares problem
+
+    min Σ_(i,j) (log pᵢⱼ - xᵢ + xⱼ)²,   ωᵢ ∝ exp(xᵢ)
+
+whose normal equations are a graph Laplacian system, solved with
+conjugate gradients in time proportional to the number of judgments.
+"""
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import cg
+
+from ahp_engine import default_labels
+from ahp_io import PathOrFile, _CellParser, _csv_header, _open_text
+
+# GCI acceptance thresholds (Aguarón & Moreno-Jiménez)
+GCI_THRESHOLDS = {3: 0.31, 4: 0.35}
+GCI_THRESHOLD_LARGE = 0.37
+
+
+def gci_threshold(m: int) -> float:
+    return GCI_THRESHOLDS.get(m, GCI_THRESHOLD_LARGE)
+
+
+@dataclass
+class IncompletePairwise:
+    """Known judgments as a sparse graph over m criteria."""
+    labels: List[str]
+    m: int
+    i: np.ndarray      # (E,) int
+    j: np.ndarray      # (E,) int, i != j
+    log_r: np.ndarray  # (E,) log pᵢⱼ
+
+    @property
+    def n_judgments(self) -> int:
+        return self.i.size
+
+    @property
+    def density(self) -> float:
+        return self.n_judgments / (self.m * (self.m - 1) / 2)
+
+    def adjacency(self) -> sp.csr_matrix:
+        """Symmetric 0/1 adjacency; from_edges keeps one edge per pair."""
+        ones = np.ones(self.n_judgments)
+        A = sp.coo_matrix((ones, (self.i, self.j)), shape=(self.m, self.m))
+        return (A + A.T).tocsr()
+
+    @classmethod
+    def from_dense(cls, P, labels: Optional[List[str]] = None) -> "IncompletePairwise":
+        """Upper-triangle judgments of P; NaN or non-positive cells are missing."""
+        P = np.asarray(P, dtype=np.float64)
+        m = P.shape[0]
+        iu, ju = np.triu_indices(m, 1)
+        v = P[iu, ju]
+        keep = np.isfinite(v) & (v > 0)
+        return cls(labels=list(labels) if labels is not None else default_labels(m), m=m,
+                   i=iu[keep], j=ju[keep], log_r=np.log(v[keep]))
+
+    @classmethod
+    def from_edges(cls, m: int, i, j, r, labels: Optional[List[str]] = None) -> "IncompletePairwise":
+        """One edge per unordered pair, stored as i < j.
+
+        pⱼᵢ becomes 1/pⱼᵢ on (i, j); a pair given more than once (both
+        triangles of a full CSV) keeps the geometric mean of its judgments,
+        so E counts pairs and the GCI's SSE/(E - m + 1) is the published one.
+        """
+        i, j = np.asarray(i, dtype=np.int64), np.asarray(j, dtype=np.int64)
+        r = np.asarray(r, dtype=np.float64)
+        if np.any(i == j) or np.any((i < 0) | (i >= m) | (j < 0) | (j >= m)):
+            raise ValueError("Judgment indices must be distinct criteria in [0, m).")
+        if not np.all(np.isfinite(r) & (r > 0)):
+            raise ValueError("Invalid value: every pᵢⱼ must be a positive finite number.")
+        log_r = np.log(r)
+        flip = i > j
+        lo, hi = np.where(flip, j, i), np.where(flip, i, j)
+        log_r = np.where(flip, -log_r, log_r)
+        pair, inv = np.unique(lo * m + hi, return_inverse=True)
+        if pair.size < log_r.size:
+            log_r = np.bincount(inv, log_r) / np.bincount(inv)
+        return cls(labels=list(labels) if labels is not None else default_labels(m), m=m,
+                   i=pair // m, j=pair % m, log_r=log_r)
+
+
+@dataclass
+class SparseAHPResult:
+    labels: List[str]
+    m: int
+    n_judgments: int
+    density: float
+    n_components: int
+    component: np.ndarray  # (m,) component id per criterion
+    w: np.ndarray
+    residuals: np.ndarray  # (E,) log pᵢⱼ - log(ωᵢ/ωⱼ)
+    GCI: float
+    gci_threshold: float
+    cg_iterations: int
+
+    @property
+    def connected(self) -> bool:
+        return self.n_components == 1
+
+    @property
+    def acceptable(self) -> bool:
+        return self.GCI <= self.gci_threshold
+
+    @property
+    def decision(self) -> str:
+        return "ACCEPTABLE" if self.acceptable else "NOT OK"
+
+
+# ---------- reading ----------
+def read_incomplete_csv(src: PathOrFile) -> IncompletePairwise:
+    """Step 1 CSV format where empty cells mean "not compared".
+
+    Both triangles may carry judgments; a pair given in both directions
+    counts once (see IncompletePairwise.from_edges).  The diagonal is ignored.
+    """
+    fh, owned = _open_text(src)
+    try:
+        reader = csv.reader(fh)
+        col_labels = _csv_header(reader)
+        m = len(col_labels)
+        parse = _CellParser()
+        labels: List[str] = []
+        ii, jj, rr = [], [], []
+        for r in reader:
+            label = r[0].strip() if r else ""
+            if label == "":
+                continue
+            row = len(labels)
+            if row >= m:
+                raise ValueError("Matrix must be square: number of columns must equal number of rows.")
+            labels.append(label)
+            for j, cell in enumerate(r[1:m + 1]):
+                if j == row or not cell.strip():
+                    continue
+                v = parse(cell)
+                if not np.isfinite(v) or v <= 0:
+                    raise ValueError(f"Invalid value at row {label}, col {col_labels[j]}")
+                ii.append(row)
+                jj.append(j)
+                rr.append(v)
+    finally:
+        if owned:
+            fh.close()
+    if len(labels) != m:
+        raise ValueError("Some rows are incomplete.")
+    return IncompletePairwise.from_edges(m, ii, jj, rr, labels=labels)
+
+
+# ---------- solving ----------
+def connectivity(G: IncompletePairwise):
+    """(n_components, component id per criterion) of the judgment graph."""
+    return connected_components(G.adjacency(), directed=False)
+
+
+def llsm_weights(G: IncompletePairwise, tol: float = 1e-12, maxiter: Optional[int] = None,
+                 callback: Optional[Callable[[np.ndarray], None]] = None) -> SparseAHPResult:
+    """Logarithmic least-squares weights for an incomplete comparison graph.
+
+    The Laplacian L x = b is grounded at criterion 0 (x₀ = 0) and solved
+    with Jacobi-preconditioned CG.  A disconnected graph has no common
+    scale across components, so it is rejected after reporting them.
+    """
+    m = G.m
+    if m < 2:
+        raise ValueError("Need at least 2 criteria.")
+    n_comp, comp = connectivity(G)
+    if n_comp > 1:
+        raise ValueError(
+            f"Judgment graph is not connected ({n_comp} components); "
+            "add comparisons linking every group of criteria.")
+
+    A = G.adjacency()
+    deg = np.asarray(A.sum(axis=1)).ravel()
+    L = (sp.diags(deg) - A).tocsr()
+    b = np.bincount(G.i, G.log_r, minlength=m) - np.bincount(G.j, G.log_r, minlength=m)
+
+    Lg, bg = L[1:, 1:], b[1:]
+    M = sp.diags(1.0 / deg[1:])
+    iters = [0]
+
+    def count(xk):
+        iters[0] += 1
+        if callback is not None:
+            callback(xk)
+
+    x1, info = cg(Lg, bg, rtol=tol, atol=0.0, maxiter=maxiter, M=M, callback=count)
+    if info > 0:
+        raise RuntimeError(f"LLSM solver did not converge in {info} iterations.")
+    x = np.concatenate([[0.0], x1])
+
+    w = np.exp(x - x.max())
+    w /= w.sum()
+    residuals = G.log_r - (x[G.i] - x[G.j])
+    dof = G.n_judgments - (m - 1)
+    gci = float(residuals @ residuals) / dof if dof > 0 else 0.0
+    return SparseAHPResult(
+        labels=G.labels, m=m, n_judgments=G.n_judgments, density=G.density,
+        n_components=n_comp, component=comp, w=w, residuals=residuals, GCI=gci,
+        gci_threshold=gci_threshold(m), cg_iterations=iters[0],
+    )
@@ -1,26 +1,31 @@
 # app.py
+import io
+import json
 import streamlit as st
 import streamlit.components.v1 as components
 from pathlib import Path
 
+from ahp_cache import payload_result, shared_cache
+from ahp_engine import METHODS, SAMPLE_CSV as SAMPLE_CSV_TEXT
+from ahp_export import FORMATS, MIME_TYPES, SUFFIXES, export_results
+from ahp_fuzzy import DEFUZZIFY, run_fuzzy_ahp_csv
+from ahp_io import stream_pairwise_csv
+from ahp_ri import RICache
+
 st.set_page_config(page_title="AHP-Rank", layout="wide")
 APP_DIR = Path(__file__).resolve().parent
 
-# ---------- Single source of truth for SAMPLE (PAIRWISE) CSV ----------
+# ---------- Single source of truth for SAMPLE (PAIRWISE) CSV: ahp_engine.SAMPLE_CSV ----------
 def load_sample_csv_text() -> str:
-    return (
-        "Criteria,B1,B2,B3,B4,B5,B6,B7\n"
-        "B1,1,1/2,1/3,1/3,1/3,1/5,1\n"
-        "B2,2,1,1/3,1,1/3,1/5,1\n"
-        "B3,3,3,1,3,1,1,1\n"
-        "B4,3,1,1/3,1,1/3,1/3,1/3\n"
-        "B5,3,3,1,3,1,1,1\n"
-        "B6,5,5,1,3,1,1,1\n"
-        "B7,1,1,1,3,1,1,1\n"
-    )
+    return SAMPLE_CSV_TEXT
 
 SAMPLE_CSV = load_sample_csv_text()
 
+# ---------- Simulated RI for m > 15 (precompute with: python ahp_ri.py 16 1000) ----------
+def load_simulated_ri() -> dict:
+    """Same values ahp_engine.RI() uses, so page and export agree on CR."""
+    return {m: ri for m, ri in RICache().table().items() if m > 15}
+
 # ------------------------------- HTML APP -------------------------------
 html = r"""
 <!doctype html>
@@ -117,7 +122,16 @@ html = r"""
   table{width:100%;border-collapse:collapse;font-size:14px;color:#111}
   th,td{text-align:left;padding:8px 10px;border-bottom:1px solid #e5e7eb;white-space:nowrap}
 
+  table.vgrid{table-layout:fixed}
+  .vgrid th,.vgrid td{height:20px;overflow:hidden;text-overflow:ellipsis}
+  .vgrid thead th{position:sticky;top:0;background:#fff;z-index:1}
+  .vgrid .vg-head{position:sticky;left:0;background:#fff}
+  .vgrid thead .vg-head{z-index:2}
+  .vgrid .vg-pad,.vgrid .vg-pad td{padding:0;border:0}
+
   body.dark table{color:#111;} /* tables are in light cards; keep readable */
+  .card table.timing{color:inherit;font-size:12px;margin:6px 0}
+  .card table.timing th,.card table.timing td{padding:2px 8px;border-bottom:1px solid rgba(229,231,235,.25)}
 
   .chart2{width:100%;height:360px;border:1px dashed #9ca3af;border-radius:12px;background:transparent}
 
@@ -157,6 +171,18 @@ html = r"""
   #tt{position:fixed;display:none;pointer-events:none;background:#fff;color:#111;
       padding:6px 8px;border-radius:8px;font-size:12px;box-shadow:0 12px 24px rgba(0,0,0,.18);border:1px solid #e5e7eb;z-index:9999}
 
+  /* Charts (SVG mode); canvas mode takes the same colours from chartColors() */
+  .ch-axis{stroke:#e5e7eb}
+  .ch-grid{stroke:rgba(229,231,235,.35)}
+  .ch-text{fill:#e5e7eb}
+  .ch-line{stroke:#e5e7eb;fill:none}
+  .ch-dot{fill:#e5e7eb}
+  body.light .ch-axis{stroke:#111}
+  body.light .ch-grid{stroke:rgba(17,17,17,.25)}
+  body.light .ch-text{fill:#111}
+  body.light .ch-line{stroke:#111}
+  body.light .ch-dot{fill:#111}
+
   .ok{color:#16a34a;font-weight:900}
   .bad{color:#dc2626;font-weight:900}
 </style>
@@ -196,6 +222,14 @@ html = r"""
         <div class="section-title">Step 1: Upload Pairwise Matrix (CSV)</div>
         <label for="csv1" class="btn">📤 Choose CSV</label>
         <input id="csv1" type="file" accept=".csv" style="display:none"/>
+        <div class="row" style="margin-top:10px">
+          <label for="wMethod" class="hint">Weighting:</label>
+          <select id="wMethod">
+            <option value="gm" selected>Geometric mean (Steps 2–4)</option>
+            <option value="eigen">Principal eigenvector (power iteration)</option>
+          </select>
+        </div>
+        <div id="progress" class="hint" style="margin-top:8px;display:none"></div>
         <p class="hint">
           Format: first column = row labels, first row = column labels. Must be square.
           Values can be <b>1</b>, <b>2</b>, <b>1/3</b>, etc.
@@ -206,6 +240,11 @@ html = r"""
       <div id="stat" class="card dark" style="display:none">
         <div class="section-title">Consistency Summary</div>
         <div id="statBox" class="hint"></div>
+        <details id="timingPanel" class="hint" style="margin-top:10px;display:none">
+          <summary>Step timings</summary>
+          <table id="tblTiming" class="timing"></table>
+          <a id="timingLog" class="hint">⬇️ Timing log (JSON lines, this browser)</a>
+        </details>
         <!-- REMOVED: per-step pills under summary (you wanted to remove it) -->
       </div>
 
@@ -253,11 +292,13 @@ html = r"""
       <div id="s6" class="card light" style="display:none">
         <div class="section-title">Step 6: λᵢ = (Pω)ᵢ / ωᵢ and λmax</div>
         <div class="table-wrap"><table id="tblLam"></table></div>
+        <div id="eigInfo6" class="hint" style="margin-top:8px;display:none"></div>
       </div>
 
       <div id="s7" class="card light" style="display:none">
         <div class="section-title">Step 7: SI and CR</div>
         <div class="table-wrap"><table id="tblCR"></table></div>
+        <div id="eigInfo7" class="hint" style="margin-top:8px;display:none"></div>
       </div>
     </div>
   </div>
@@ -274,6 +315,7 @@ html = r"""
 
   // purple-ish pastels for bars
   const PASTELS = ["#a78bfa","#c4b5fd","#ddd6fe","#f5d0fe","#e9d5ff","#c7d2fe","#fbcfe8","#bfdbfe","#d1fae5","#fde68a"];
+  const CHARTS = {};   // chart id -> cached layout (see drawChart)
 
   // ---------- injected by Python ----------
   const SAMPLE_TEXT = `__INJECT_SAMPLE_CSV__`;
@@ -282,6 +324,10 @@ html = r"""
   $("downloadSample").download = "ahp_pairwise_sample.csv";
   $("loadSample").onclick = ()=> initAHP(SAMPLE_TEXT);
 
+  // last loaded CSV, so switching the weighting method re-runs it
+  let lastText = null;
+  $("wMethod").onchange = ()=>{ if(lastText!=null) initAHP(lastText); };
+
   // ---------- DARK/LIGHT MODE ----------
   let isDark = true;
   const themeBtn = $("themeToggle");
@@ -297,12 +343,8 @@ html = r"""
       body.classList.add("light");
       themeBtn.innerText="☀️ Light";
     }
-    // re-draw charts if data exists (keeps them visible after theme change)
-    if(window.__AHP_DATA__){
-      const {labels,w,lam}=window.__AHP_DATA__;
-      drawBar("barW", labels.map((n,i)=>({name:n,value:w[i]})));
-      drawLine("lineL", labels.map((n,i)=>({name:n,x:i+1,value:lam[i]})));
-    }
+    // recolour charts from their cached layout
+    repaintCharts();
   }
   themeBtn.onclick = ()=>{ isDark = !isDark; applyTheme(); };
   applyTheme();
@@ -332,7 +374,7 @@ html = r"""
   setNavEnabled(false);
 
   // ---------- CSV parser ----------
-  function parseCSVText(text){
+  function parseCSVText(text, progress){
     const rows=[]; let i=0, cur="", inQ=false, row=[];
     const pushCell=()=>{ row.push(cur); cur=""; };
     const pushRow =()=>{ rows.push(row); row=[]; };
@@ -349,6 +391,7 @@ html = r"""
         else cur+=ch;
       }
       i++;
+      if(progress && (i & 0xFFFFF)===0) progress("parse", i, text.length);
     }
     pushCell(); if(row.length>1 || row[0] !== "") pushRow();
     return rows.map(r=> r.map(x=> String(x ?? "").trim()));
@@ -369,14 +412,40 @@ html = r"""
     return isFinite(x) ? x : NaN;
   }
 
-  // Saaty RI table
+  // Saaty RI table; larger m uses the simulated values cached by ahp_ri.py
   const RI_TABLE = {1:0,2:0,3:0.58,4:0.90,5:1.12,6:1.24,7:1.32,8:1.41,9:1.45,10:1.49,11:1.51,12:1.48,13:1.56,14:1.57,15:1.59};
+  const RI_SIM = __INJECT_RI_SIM__;
   function RI(m){
     if(RI_TABLE[m]!=null) return RI_TABLE[m];
+    if(RI_SIM[m]!=null) return RI_SIM[m];
     if(m<=2) return 0;
     return 1.98*(m-2)/m;
   }
 
+  // Principal eigenvector by power iteration, seeded with the GM weights.
+  // P is the row-major m×m Float64Array built by computeAHP.
+  const EIG_TOL = 1e-12, EIG_MAX_ITER = 1000;
+  function powerIteration(P, m, w0, progress){
+    let w = w0.slice(), lam = 0, it = 0;
+    while(it < EIG_MAX_ITER){
+      it++;
+      const y = new Float64Array(m);
+      for(let i=0;i<m;i++){
+        let s = 0;
+        for(let j=0, o=i*m;j<m;j++) s += P[o+j]*w[j];
+        y[i] = s;
+      }
+      lam = 0;
+      for(let i=0;i<m;i++) lam += y[i];
+      let diff = 0;
+      for(let i=0;i<m;i++){ y[i] /= lam; diff = Math.max(diff, Math.abs(y[i]-w[i])); }
+      w = y;
+      if(diff < EIG_TOL) break;
+      if(progress && (it % 10)===0) progress("eigen", it, EIG_MAX_ITER);
+    }
+    return {w, lam, iterations: it};
+  }
+
   // ---------- render table ----------
   function renderTable(tableId, cols, rows){
     const tb=$(tableId); tb.innerHTML="";
@@ -398,98 +467,279 @@ html = r"""
     tb.appendChild(tbody);
   }
 
+  // ---------- virtualized grid (large m) ----------
+  // Only the rows/columns inside the scroll window (plus an overscan margin)
+  // exist in the DOM; spacer cells keep the scrollbars at full size and cells
+  // are formatted on demand by cell(i,j), so nothing here is O(m²).
+  const VG_ROW_H=37, VG_COL_W=130, VG_HEAD_W=160, VG_OVERSCAN=4, VG_MIN_CELLS=2000;
+  const escHTML = s => String(s).replace(/[&<>"]/g, c=> ({"&":"&amp;","<":"&lt;",">":"&gt;",'"':"&quot;"}[c]));
+
+  function renderGrid(tableId, corner, cols, rowLabels, cell){
+    const n=rowLabels.length, k=cols.length;
+    const tb=$(tableId), wrap=tb.parentElement;
+    wrap.onscroll=null;
+    if(n*k <= VG_MIN_CELLS){
+      tb.className="";
+      renderTable(tableId, [corner].concat(cols), rowLabels.map((rl,i)=> [rl].concat(cols.map((_,j)=> cell(i,j)))));
+      return;
+    }
+    tb.className="vgrid";
+    tb.style.width=(VG_HEAD_W + k*VG_COL_W)+"px";
+    let win="";
+    const draw=()=>{
+      const top=wrap.scrollTop, left=wrap.scrollLeft;
+      const h=wrap.clientHeight || 360, wd=wrap.clientWidth || 1200;
+      const r0=Math.max(0, Math.floor(top/VG_ROW_H)-VG_OVERSCAN), r1=Math.min(n, Math.ceil((top+h)/VG_ROW_H)+VG_OVERSCAN);
+      const c0=Math.max(0, Math.floor(left/VG_COL_W)-VG_OVERSCAN), c1=Math.min(k, Math.ceil((left+wd)/VG_COL_W)+VG_OVERSCAN);
+      const key=r0+":"+r1+":"+c0+":"+c1;
+      if(key===win) return;
+      win=key;
+      const span=(c1-c0)+1+(c0>0)+(c1<k);
+      const padL=c0>0 ? "<td class='vg-pad' style='width:"+(c0*VG_COL_W)+"px'></td>" : "";
+      const padR=c1<k ? "<td class='vg-pad' style='width:"+((k-c1)*VG_COL_W)+"px'></td>" : "";
+      const out=["<thead><tr><th class='vg-head' style='width:"+VG_HEAD_W+"px'>"+escHTML(corner)+"</th>",
+                 padL.replace(/td/g,"th")];
+      for(let j=c0;j<c1;j++) out.push("<th style='width:"+VG_COL_W+"px'>"+escHTML(cols[j])+"</th>");
+      out.push(padR.replace(/td/g,"th"), "</tr></thead><tbody>");
+      if(r0>0) out.push("<tr class='vg-pad' style='height:"+(r0*VG_ROW_H)+"px'><td colspan='"+span+"'></td></tr>");
+      for(let i=r0;i<r1;i++){
+        out.push("<tr><td class='vg-head'>"+escHTML(rowLabels[i])+"</td>", padL);
+        for(let j=c0;j<c1;j++) out.push("<td>"+cell(i,j)+"</td>");
+        out.push(padR, "</tr>");
+      }
+      if(r1<n) out.push("<tr class='vg-pad' style='height:"+((n-r1)*VG_ROW_H)+"px'><td colspan='"+span+"'></td></tr>");
+      out.push("</tbody>");
+      tb.innerHTML=out.join("");
+    };
+    let pending=false;
+    wrap.onscroll=()=>{ if(!pending){ pending=true; requestAnimationFrame(()=>{ pending=false; draw(); }); } };
+    draw();
+  }
+
   // ---------- Tooltip ----------
   const TT = $("tt");
   function showTT(x,y,html){ TT.style.display="block"; TT.style.left=(x+12)+"px"; TT.style.top=(y+12)+"px"; TT.innerHTML=html; }
   function hideTT(){ TT.style.display="none"; }
 
   // ---------- Charts ----------
-  function drawBar(svgId, data){
-    const svg=$(svgId); while(svg.firstChild) svg.removeChild(svg.firstChild);
-    const W=(svg.getBoundingClientRect().width||800), H=(svg.getBoundingClientRect().height||360);
-    svg.setAttribute("viewBox","0 0 "+W+" "+H);
+  // Layout (scales, pixel positions, label picks, decimation) is computed once
+  // per data set and cached in CHARTS[id].  Up to CHART_SVG_MAX points the
+  // chart is SVG coloured by CSS classes, so a theme toggle costs nothing;
+  // above it the chart is a canvas repainted from the cached geometry.  Each
+  // chart has one mousemove handler that hit-tests the cached geometry.
+  const CHART_SVG_MAX = 300;
+  const SVG_NS = "http://www.w3.org/2000/svg";
+
+  function chartColors(){
+    return isDark
+      ? {axis:"#e5e7eb", grid:"rgba(229,231,235,.35)", text:"#e5e7eb", line:"#e5e7eb"}
+      : {axis:"#111", grid:"rgba(17,17,17,.25)", text:"#111", line:"#111"};
+  }
+
+  // every step-th label so that labels are at least minPx apart
+  function labelStep(n, span, minPx){
+    return Math.max(1, Math.ceil(n*minPx/Math.max(span,1)));
+  }
+  function fitLabel(text, px, charPx){
+    const t = String(text), max = Math.max(1, Math.floor(px/charPx));
+    return t.length<=max ? t : t.slice(0, Math.max(1,max-1))+"…";
+  }
+
+  // indices to draw when there are more points than pixel columns:
+  // the max per column (bars) or the min and max per column (line)
+  function decimate(xs, values, x0, envelope){
+    const n = xs.length, keep = [];
+    let col = -1, lo = -1, hi = -1;
+    const flush = ()=>{ if(hi<0) return; if(envelope && lo!==hi) keep.push(Math.min(lo,hi), Math.max(lo,hi)); else keep.push(hi); };
+    for(let i=0;i<n;i++){
+      const c = Math.floor(xs[i]-x0);
+      if(c!==col){ flush(); col = c; lo = hi = i; continue; }
+      if(values[i] > values[hi]) hi = i;
+      if(values[i] < values[lo]) lo = i;
+    }
+    flush();
+    return keep;
+  }
+
+  function chartSurface(id, canvas){
+    const svg = $(id);
+    let cv = $(id+"_cv");
+    if(canvas && !cv){
+      cv = document.createElement("canvas");
+      cv.id = id+"_cv"; cv.style.width = "100%"; cv.style.height = "100%";
+      svg.parentNode.appendChild(cv);
+    }
+    svg.style.display = canvas ? "none" : "";
+    if(cv) cv.style.display = canvas ? "block" : "none";
+    const el = canvas ? cv : svg;
+    if(!el.dataset.hit){
+      el.dataset.hit = "1";
+      el.addEventListener("mousemove", (ev)=> chartHover(id, el, ev));
+      el.addEventListener("mouseleave", hideTT);
+    }
+    return el;
+  }
+
+  function chartHover(id, el, ev){
+    const L = CHARTS[id];
+    if(!L) return;
+    const r = el.getBoundingClientRect();
+    const x = (ev.clientX-r.left)*L.W/(r.width||L.W), y = (ev.clientY-r.top)*L.H/(r.height||L.H);
+    const i = L.hit(x, y);
+    if(i<0){ hideTT(); return; }
+    showTT(ev.clientX, ev.clientY, L.tip(i));
+  }
+
+  function layoutBar(W, H, data){
     const padL=50,padR=20,padT=18,padB=44;
-    const max=Math.max(...data.map(d=>d.value))||1;
-    const cell=(W-padL-padR)/data.length, barW=cell*0.8;
-
-    const axisColor = isDark ? "#e5e7eb" : "#111";
-    const gridColor = isDark ? "rgba(229,231,235,.35)" : "rgba(17,17,17,.25)";
-    const textColor = isDark ? "#e5e7eb" : "#111";
-
-    const yAxis=document.createElementNS("http://www.w3.org/2000/svg","line");
-    yAxis.setAttribute("x1",padL); yAxis.setAttribute("x2",padL); yAxis.setAttribute("y1",padT); yAxis.setAttribute("y2",H-padB); yAxis.setAttribute("stroke",axisColor); svg.appendChild(yAxis);
-    const xAxis=document.createElementNS("http://www.w3.org/2000/svg","line");
-    xAxis.setAttribute("x1",padL); xAxis.setAttribute("x2",W-padR); xAxis.setAttribute("y1",H-padB); xAxis.setAttribute("y2",H-padB); xAxis.setAttribute("stroke",axisColor); svg.appendChild(xAxis);
-
-    for(let t=0;t<=5;t++){
-      const val=max*t/5, y=H-padB-(H-padT-padB)*(val/max);
-      const gl=document.createElementNS("http://www.w3.org/2000/svg","line");
-      gl.setAttribute("x1",padL); gl.setAttribute("x2",W-padR); gl.setAttribute("y1",y); gl.setAttribute("y2",y);
-      gl.setAttribute("stroke",gridColor); gl.setAttribute("stroke-dasharray","3 3"); svg.appendChild(gl);
-      const tx=document.createElementNS("http://www.w3.org/2000/svg","text");
-      tx.setAttribute("x",padL-10); tx.setAttribute("y",y+4); tx.setAttribute("text-anchor","end");
-      tx.setAttribute("font-size","12"); tx.setAttribute("fill",textColor); tx.textContent=val.toFixed(3); svg.appendChild(tx);
+    const n = data.length, plotW = W-padL-padR, plotH = H-padT-padB;
+    let max = 0;
+    for(const d of data) max = Math.max(max, d.value);
+    max = max || 1;
+    const cell = plotW/n, barW = cell*0.8;
+    const xs = new Float64Array(n), hs = new Float64Array(n), values = new Float64Array(n);
+    for(let i=0;i<n;i++){
+      values[i] = data[i].value;
+      xs[i] = padL+i*cell+(cell-barW)/2;
+      hs[i] = plotH*(values[i]/max);
     }
+    const ticks = [];
+    for(let t=0;t<=5;t++){ const val=max*t/5; ticks.push({y: H-padB-plotH*(val/max), text: val.toFixed(3)}); }
+    const step = labelStep(n, plotW, 60), labels = [];
+    for(let i=0;i<n;i+=step) labels.push({x: xs[i]+barW/2, y: H-12, text: fitLabel(data[i].name, step*cell, 7)});
+    return {
+      kind:"bar", W, H, padL, padR, padT, padB, n, xs, hs, barW, ticks, labels,
+      draw: n > plotW ? decimate(xs, values, padL, false) : null,
+      hit: (x,y)=>{ const i = Math.floor((x-padL)/cell); return (i<0 || i>=n || y<padT || y>H-padB) ? -1 : i; },
+      tip: i=> "<b>"+escHTML(data[i].name)+"</b><br/>ω = "+data[i].value.toFixed(6)
+    };
+  }
 
-    data.forEach((d,i)=>{
-      const x=padL+i*cell+(cell-barW)/2, h=(H-padT-padB)*(d.value/max), y=H-padB-h;
-      const r=document.createElementNS("http://www.w3.org/2000/svg","rect");
-      r.setAttribute("x",x); r.setAttribute("y",y); r.setAttribute("width",barW); r.setAttribute("height",h);
-      r.setAttribute("fill", PASTELS[i%PASTELS.length]);
-      r.addEventListener("mousemove",(ev)=> showTT(ev.clientX, ev.clientY, `<b>${d.name}</b><br/>ω = ${d.value.toFixed(6)}`));
-      r.addEventListener("mouseleave", hideTT);
-      svg.appendChild(r);
-
-      const lbl=document.createElementNS("http://www.w3.org/2000/svg","text");
-      lbl.setAttribute("x",x+barW/2); lbl.setAttribute("y",H-12); lbl.setAttribute("text-anchor","middle");
-      lbl.setAttribute("font-size","12"); lbl.setAttribute("fill",textColor); lbl.textContent=d.name; svg.appendChild(lbl);
-    });
+  function layoutLine(W, H, data){
+    const padL=50,padR=20,padT=14,padB=30;
+    data = data.slice().sort((a,b)=> a.x-b.x);
+    const n = data.length, plotW = W-padL-padR;
+    let maxY = 0, maxX = 0;
+    for(const d of data){ maxY = Math.max(maxY, d.value); maxX = Math.max(maxX, d.x); }
+    maxY = maxY || 1; maxX = maxX || 1;
+    const minX = 1;
+    const xs = new Float64Array(n), ys = new Float64Array(n), values = new Float64Array(n);
+    for(let i=0;i<n;i++){
+      values[i] = data[i].value;
+      xs[i] = padL+plotW*((data[i].x-minX)/(maxX-minX||1));
+      ys[i] = H-padB-(H-padT-padB)*(values[i]/maxY);
+    }
+    const step = labelStep(n, plotW, 30), labels = [];
+    for(let i=0;i<n;i+=step) labels.push({x: xs[i], y: H-10, text: String(data[i].x)});
+    const dense = n > plotW/6;
+    return {
+      kind:"line", W, H, padL, padR, padT, padB, n, xs, ys, labels, dots: !dense,
+      draw: n > plotW ? decimate(xs, values, padL, true) : null,
+      hit: (x,y)=>{
+        if(!n) return -1;
+        let lo = 0, hi = n-1;                  // nearest x by bisection
+        while(hi-lo>1){ const mid=(lo+hi)>>1; if(xs[mid]<x) lo=mid; else hi=mid; }
+        const i = (Math.abs(xs[lo]-x) <= Math.abs(xs[hi]-x)) ? lo : hi;
+        if(Math.abs(xs[i]-x) > 8) return -1;
+        return (dense || Math.abs(ys[i]-y) <= 8) ? i : -1;
+      },
+      tip: i=> "<b>"+escHTML(data[i].name)+"</b><br/>λᵢ = "+data[i].value.toFixed(6)
+    };
+  }
+
+  function svgEl(svg, tag, cls, attrs){
+    const el = document.createElementNS(SVG_NS, tag);
+    if(cls) el.setAttribute("class", cls);
+    for(const k in attrs) el.setAttribute(k, attrs[k]);
+    svg.appendChild(el);
+    return el;
   }
 
-  function drawLine(svgId, data){
-    const svg=$(svgId); while(svg.firstChild) svg.removeChild(svg.firstChild);
-    const W=(svg.getBoundingClientRect().width||800), H=(svg.getBoundingClientRect().height||300);
+  function renderSVG(svg, L){
+    while(svg.firstChild) svg.removeChild(svg.firstChild);
+    const {W, H, padL, padR, padT, padB} = L;
     svg.setAttribute("viewBox","0 0 "+W+" "+H);
-    const padL=50,padR=20,padT=14,padB=30;
+    svgEl(svg, "line", "ch-axis", {x1:padL, x2:padL, y1:padT, y2:H-padB});
+    svgEl(svg, "line", "ch-axis", {x1:padL, x2:W-padR, y1:H-padB, y2:H-padB});
+    if(L.kind==="bar"){
+      L.ticks.forEach(t=>{
+        svgEl(svg, "line", "ch-grid", {x1:padL, x2:W-padR, y1:t.y, y2:t.y, "stroke-dasharray":"3 3"});
+        svgEl(svg, "text", "ch-text", {x:padL-10, y:t.y+4, "text-anchor":"end", "font-size":12}).textContent = t.text;
+      });
+      for(let i=0;i<L.n;i++){
+        svgEl(svg, "rect", "", {x:L.xs[i], y:H-padB-L.hs[i], width:L.barW, height:L.hs[i], fill:PASTELS[i%PASTELS.length]});
+      }
+    }else{
+      let d = "";
+      for(let i=0;i<L.n;i++) d += (i===0? "M":"L")+L.xs[i]+" "+L.ys[i]+" ";
+      svgEl(svg, "path", "ch-line", {d: d.trim(), "stroke-width":2});
+      if(L.dots) for(let i=0;i<L.n;i++) svgEl(svg, "circle", "ch-dot", {cx:L.xs[i], cy:L.ys[i], r:4});
+    }
+    const fs = L.kind==="bar" ? 12 : 11;
+    L.labels.forEach(l=>{ svgEl(svg, "text", "ch-text", {x:l.x, y:l.y, "text-anchor":"middle", "font-size":fs}).textContent = l.text; });
+  }
+
+  function paintCanvas(cv, L){
+    const dpr = window.devicePixelRatio || 1;
+    const {W, H, padL, padR, padT, padB} = L;
+    cv.width = Math.round(W*dpr); cv.height = Math.round(H*dpr);
+    const g = cv.getContext("2d");
+    g.setTransform(dpr,0,0,dpr,0,0);
+    g.clearRect(0,0,W,H);
+    const C = chartColors();
+    const seg = (x1,y1,x2,y2)=>{ g.beginPath(); g.moveTo(x1,y1); g.lineTo(x2,y2); g.stroke(); };
+
+    g.lineWidth = 1; g.strokeStyle = C.axis;
+    seg(padL,padT,padL,H-padB); seg(padL,H-padB,W-padR,H-padB);
+    g.fillStyle = C.text; g.font = "12px sans-serif";
+    if(L.kind==="bar"){
+      g.textAlign = "end";
+      g.setLineDash([3,3]); g.strokeStyle = C.grid;
+      L.ticks.forEach(t=>{ seg(padL,t.y,W-padR,t.y); g.fillText(t.text, padL-10, t.y+4); });
+      g.setLineDash([]);
+      const idx = L.draw, count = idx ? idx.length : L.n, bw = Math.max(L.barW, 1);
+      for(let k=0;k<count;k++){
+        const i = idx ? idx[k] : k;
+        g.fillStyle = PASTELS[i%PASTELS.length];
+        g.fillRect(L.xs[i], H-padB-L.hs[i], bw, L.hs[i]);
+      }
+    }else{
+      const idx = L.draw, count = idx ? idx.length : L.n;
+      g.strokeStyle = C.line; g.lineWidth = 2;
+      g.beginPath();
+      for(let k=0;k<count;k++){ const i = idx ? idx[k] : k; if(k) g.lineTo(L.xs[i], L.ys[i]); else g.moveTo(L.xs[i], L.ys[i]); }
+      g.stroke();
+      if(L.dots){
+        g.fillStyle = C.line;
+        for(let i=0;i<L.n;i++){ g.beginPath(); g.arc(L.xs[i], L.ys[i], 4, 0, 2*Math.PI); g.fill(); }
+      }
+      g.font = "11px sans-serif";
+    }
+    g.fillStyle = C.text; g.textAlign = "center";
+    L.labels.forEach(l=> g.fillText(l.text, l.x, l.y));
+  }
 
-    const axisColor = isDark ? "#e5e7eb" : "#111";
-    const textColor = isDark ? "#e5e7eb" : "#111";
-    const lineColor = isDark ? "#e5e7eb" : "#111";
-    const dotColor  = isDark ? "#e5e7eb" : "#111";
-
-    const maxY=Math.max(...data.map(d=>d.value))||1;
-    const minX=1, maxX=Math.max(...data.map(d=>d.x))||1;
-
-    const sx=(x)=> padL+(W-padL-padR)*((x-minX)/(maxX-minX||1));
-    const sy=(v)=> H-padB-(H-padT-padB)*(v/maxY);
-
-    const yAxis=document.createElementNS("http://www.w3.org/2000/svg","line");
-    yAxis.setAttribute("x1",padL); yAxis.setAttribute("x2",padL); yAxis.setAttribute("y1",padT); yAxis.setAttribute("y2",H-padB); yAxis.setAttribute("stroke",axisColor); svg.appendChild(yAxis);
-    const xAxis=document.createElementNS("http://www.w3.org/2000/svg","line");
-    xAxis.setAttribute("x1",padL); xAxis.setAttribute("x2",W-padR); xAxis.setAttribute("y1",H-padB); xAxis.setAttribute("y2",H-padB); xAxis.setAttribute("stroke",axisColor); svg.appendChild(xAxis);
-
-    const p=document.createElementNS("http://www.w3.org/2000/svg","path");
-    let dstr="";
-    data.sort((a,b)=> a.x-b.x).forEach((pt,i)=>{
-      const x=sx(pt.x), y=sy(pt.value);
-      dstr += (i===0? "M":"L")+x+" "+y+" ";
-
-      const c=document.createElementNS("http://www.w3.org/2000/svg","circle");
-      c.setAttribute("cx",x); c.setAttribute("cy",y); c.setAttribute("r","4"); c.setAttribute("fill",dotColor);
-      c.addEventListener("mousemove",(ev)=> showTT(ev.clientX, ev.clientY, `<b>${pt.name}</b><br/>λᵢ = ${pt.value.toFixed(6)}`));
-      c.addEventListener("mouseleave", hideTT);
-      svg.appendChild(c);
-
-      const tx=document.createElementNS("http://www.w3.org/2000/svg","text");
-      tx.setAttribute("x",x); tx.setAttribute("y",H-10);
-      tx.setAttribute("text-anchor","middle"); tx.setAttribute("font-size","11"); tx.setAttribute("fill",textColor);
-      tx.textContent = pt.x; svg.appendChild(tx);
+  function drawChart(id, data, layout, defaultH){
+    const canvas = data.length > CHART_SVG_MAX;
+    const el = chartSurface(id, canvas);
+    const box = el.parentNode;
+    const W = box.clientWidth || 800, H = box.clientHeight || defaultH;
+    const L = layout(W, H, data);
+    L.canvas = canvas; L.el = el; L.redraw = ()=> drawChart(id, data, layout, defaultH);
+    CHARTS[id] = L;
+    if(canvas) paintCanvas(el, L); else renderSVG(el, L);
+  }
+  function drawBar(svgId, data){ drawChart(svgId, data, layoutBar, 360); }
+  function drawLine(svgId, data){ drawChart(svgId, data, layoutLine, 300); }
+
+  // theme toggle: SVG recolours through CSS; canvases repaint from cached
+  // geometry unless the box was resized since the layout
+  function repaintCharts(){
+    Object.values(CHARTS).forEach(L=>{
+      const box = L.el.parentNode;
+      if(box.clientWidth && (box.clientWidth !== L.W || box.clientHeight !== L.H)) L.redraw();
+      else if(L.canvas) paintCanvas(L.el, L);
     });
-    p.setAttribute("d", dstr.trim());
-    p.setAttribute("fill","none");
-    p.setAttribute("stroke",lineColor);
-    p.setAttribute("stroke-width","2");
-    svg.appendChild(p);
   }
 
   // ---------- DOWNLOAD RESULTS ----------
@@ -511,12 +761,20 @@ html = r"""
     ].join(","));
     lines.push("");
 
+    if(res.method==="eigen"){
+      lines.push("Eigenvector");
+      lines.push("method,iterations,time_ms");
+      lines.push(["power_iteration", res.iterations, res.timeMs.toFixed(3)].join(","));
+      lines.push("");
+    }
+
     lines.push("Weights");
-    lines.push("criteria,Pi,GM,w,Pw,lambda_i");
+    lines.push("criteria,Pi,log_Pi,GM,w,Pw,lambda_i");
     for(let i=0;i<res.labels.length;i++){
       lines.push([
         safeCSV(res.labels[i]),
         res.Pi[i].toFixed(9),
+        res.logPi[i].toFixed(9),
         res.GM[i].toFixed(9),
         res.w[i].toFixed(9),
         res.Pw[i].toFixed(9),
@@ -528,8 +786,17 @@ html = r"""
     // numeric P
     lines.push("Pairwise Matrix P (numeric)");
     lines.push(["Criteria"].concat(res.labels.map(safeCSV)).join(","));
-    for(let i=0;i<res.labels.length;i++){
-      lines.push([safeCSV(res.labels[i])].concat(res.P[i].map(x=>x.toFixed(6))).join(","));
+    for(let i=0, m=res.labels.length;i<m;i++){
+      const row = [safeCSV(res.labels[i])];
+      for(let j=0;j<m;j++) row.push(res.P[i*m+j].toFixed(6));
+      lines.push(row.join(","));
+    }
+
+    if(res.timings && res.timings.length){
+      lines.push("");
+      lines.push("Timings");
+      lines.push("stage,ms,heap_delta_bytes");
+      res.timings.forEach(t=> lines.push([t.stage, t.ms.toFixed(3), t.heap_delta_bytes==null ? "" : t.heap_delta_bytes].join(",")));
     }
 
     return lines.join("\n");
@@ -539,100 +806,267 @@ html = r"""
     if(/[,"\n]/.test(t)) return '"' + t.replace(/"/g,'""') + '"';
     return t;
   }
+  // Blob URL rather than a data: URI: no percent-encoded copy, no URL length limit
+  let resultsURL = null;
   function setResultsDownload(csvText){
     const a = $("downloadResults");
-    a.href = "data:text/csv;charset=utf-8," + encodeURIComponent(csvText);
+    if(resultsURL) URL.revokeObjectURL(resultsURL);
+    resultsURL = URL.createObjectURL(new Blob([csvText], {type:"text/csv;charset=utf-8"}));
+    a.href = resultsURL;
     a.download = "ahp_results.csv";
     a.style.display = "";
   }
 
-  // ---------- AHP core ----------
-  function initAHP(txt){
-    const arr=parseCSVText(txt);
-    if(!arr.length) return;
+  // ---------- Stage timings ----------
+  // Wall time per pipeline stage and, where the browser exposes it
+  // (performance.memory, Chromium only), the JS heap delta.  Shipped to the
+  // worker with computeAHP.
+  function stageTimer(){
+    const heap = ()=> (performance.memory ? performance.memory.usedJSHeapSize : null);
+    const stages = [];
+    let t = performance.now(), h = heap();
+    return {
+      stages,
+      mark(stage){
+        const now = performance.now(), hh = heap();
+        stages.push({stage, ms: now-t, heap_delta_bytes: (h!=null && hh!=null) ? hh-h : null});
+        t = now; h = hh;
+      }
+    };
+  }
+
+  // ---------- AHP core (runs in the worker) ----------
+  // Returns {error} or the result; P is flattened row-major and every
+  // per-criterion vector is a Float64Array, so the worker can transfer them.
+  // error "" means "nothing to do" (empty or header-only input).
+  function computeAHP(txt, method, progress){
+    const tm = stageTimer();
+    const arr=parseCSVText(txt, progress);
+    tm.mark("parse");
+    if(!arr.length) return {error:""};
 
     const header = arr[0];
-    if(header.length<2) return;
+    if(header.length<2) return {error:""};
 
     const colLabels = header.slice(1);     // columns after first
     const rowLabels = arr.slice(1).map(r=> r[0]).filter(x=> x!=="" );
 
     const m = rowLabels.length;
-    if(m<2){ alert("Need at least 2 criteria."); return; }
-    if(colLabels.length !== m){ alert("Matrix must be square: number of columns must equal number of rows."); return; }
+    if(m<2) return {error:"Need at least 2 criteria."};
+    if(colLabels.length !== m) return {error:"Matrix must be square: number of columns must equal number of rows."};
 
     // Build numeric matrix P
-    const P = [];
+    const P = new Float64Array(m*m);
     for(let i=0;i<m;i++){
       const r = arr[i+1];
-      if(!r || r.length < m+1){ alert("Some rows are incomplete."); return; }
-      const row = [];
+      if(!r || r.length < m+1) return {error:"Some rows are incomplete."};
       for(let j=0;j<m;j++){
         const v = parseRatio(r[j+1]);
-        if(!isFinite(v) || v<=0){ alert("Invalid value at row "+rowLabels[i]+", col "+colLabels[j]); return; }
-        row.push(v);
+        if(!isFinite(v) || v<=0) return {error:"Invalid value at row "+rowLabels[i]+", col "+colLabels[j]};
+        P[i*m+j] = v;
       }
-      P.push(row);
+      if(progress && (i & 63)===63) progress("matrix", i+1, m);
     }
+    tm.mark("matrix");
 
     // Reciprocal check
     let maxErr = 0;
     for(let i=0;i<m;i++){
-      maxErr = Math.max(maxErr, Math.abs(P[i][i]-1));
+      maxErr = Math.max(maxErr, Math.abs(P[i*m+i]-1));
       for(let j=i+1;j<m;j++){
-        maxErr = Math.max(maxErr, Math.abs(P[i][j]*P[j][i]-1));
+        maxErr = Math.max(maxErr, Math.abs(P[i*m+j]*P[j*m+i]-1));
       }
     }
+    tm.mark("reciprocal_check");
 
-    // Step 2: Pi
-    const Pi = P.map(row => row.reduce((a,b)=> a*b, 1));
-
-    // Step 3: GM
-    const GM = Pi.map(v => Math.pow(v, 1/m));
+    // Step 2: Pi (summed in log space; the plain product overflows for large m)
+    // Step 3: GM = exp(log Π / m)
+    const logPi = new Float64Array(m), Pi = new Float64Array(m), GM = new Float64Array(m);
+    for(let i=0;i<m;i++){
+      let s = 0;
+      for(let j=0, o=i*m;j<m;j++) s += Math.log(P[o+j]);
+      logPi[i] = s;
+      Pi[i] = Math.exp(s);
+      GM[i] = Math.exp(s/m);
+    }
 
     // Step 4: w
-    const sumGM = GM.reduce((a,b)=> a+b, 0) || 1;
-    const w = GM.map(v => v/sumGM);
+    let sumGM = 0;
+    for(let i=0;i<m;i++) sumGM += GM[i];
+    sumGM = sumGM || 1;
+    let w = GM.map(v => v/sumGM);
+    tm.mark("steps_2_4");
+
+    // Eigenvector mode: refine ω from the GM start
+    let eig = null;
+    if(method==="eigen"){
+      const t0 = performance.now();
+      eig = powerIteration(P, m, w, progress);
+      eig.timeMs = performance.now() - t0;
+      w = eig.w;
+      tm.mark("eigen");
+    }
 
-    // Step 5: multiply table (p_ij * w_j) and Pw
-    const Mul = [];
-    const Pw = [];
+    // Step 5: (Pω)_i; the p_ij * w_j cells are formatted on demand by the grid
+    const Pw = new Float64Array(m);
     for(let i=0;i<m;i++){
-      const r = [];
       let s = 0;
-      for(let j=0;j<m;j++){
-        const x = P[i][j]*w[j];
-        r.push(x);
-        s += x;
-      }
-      Mul.push(r);
-      Pw.push(s);
+      for(let j=0, o=i*m;j<m;j++) s += P[o+j]*w[j];
+      Pw[i] = s;
     }
 
     // Step 6: lambda_i and lambda_max
     const lam = Pw.map((v,i)=> v/(w[i] || 1e-18));
-    const lam_max = lam.reduce((a,b)=> a+b, 0)/m;
+    let lam_sum = 0;
+    for(let i=0;i<m;i++) lam_sum += lam[i];
+    const lam_max = eig ? eig.lam : lam_sum/m;
 
     // Step 7: SI and CR
     const SI = (m<=2) ? 0 : (lam_max - m)/(m-1);
     const ri = RI(m);
     const CR = (ri===0) ? 0 : (SI/ri);
+    tm.mark("steps_5_7");
+
+    return {
+      error: null, labels: rowLabels, colLabels, m, P, Pi, logPi, GM, sumGM, w, Pw, lam,
+      lam_max, SI, ri, CR, maxErr, method,
+      iterations: eig ? eig.iterations : 0, timeMs: eig ? eig.timeMs : 0,
+      timings: tm.stages
+    };
+  }
+
+  // ---------- Web Worker ----------
+  // The worker is built from the same function sources as above, so parsing
+  // and Steps 2-7 never block the page; without Worker support (or if the
+  // blob worker fails to start) the job falls back to the main thread.
+  function ahpWorkerMessage(e){
+    const {id, text, method} = e.data;
+    let last = 0;
+    const res = computeAHP(text, method, (stage, done, total)=>{
+      const now = Date.now();
+      if(now - last < 100) return;
+      last = now;
+      self.postMessage({id, type:"progress", stage, done, total});
+    });
+    const buffers = res.error==null ? [res.P, res.Pi, res.logPi, res.GM, res.w, res.Pw, res.lam].map(a=> a.buffer) : [];
+    self.postMessage({id, type:"result", res}, buffers);
+  }
+  const AHP_WORKER_SRC = [
+    "const RI_TABLE = "+JSON.stringify(RI_TABLE)+", RI_SIM = "+JSON.stringify(RI_SIM)+";",
+    "const EIG_TOL = "+EIG_TOL+", EIG_MAX_ITER = "+EIG_MAX_ITER+";",
+    parseCSVText, parseRatio, RI, powerIteration, stageTimer, computeAHP, ahpWorkerMessage,
+    "self.onmessage = ahpWorkerMessage;"
+  ].map(String).join("\n");
+
+  const STAGE_TEXT = {parse:"Parsing CSV", matrix:"Reading matrix", eigen:"Power iteration"};
+  function showProgress(stage, done, total){
+    const el = $("progress");
+    if(!stage){ show(el,false); return; }
+    el.textContent = (STAGE_TEXT[stage] || stage)+"… "+Math.floor(100*done/Math.max(total,1))+"%";
+    show(el,true);
+  }
+
+  let ahpWorker = null, jobId = 0, pendingJob = null;
+  function startWorker(){
+    try{
+      const url = URL.createObjectURL(new Blob([AHP_WORKER_SRC], {type:"text/javascript"}));
+      const wk = new Worker(url);
+      URL.revokeObjectURL(url);
+      wk.onmessage = (e)=>{
+        const d = e.data;
+        if(d.id !== jobId) return;           // superseded by a newer run
+        if(d.type === "progress"){ showProgress(d.stage, d.done, d.total); return; }
+        const job = pendingJob; pendingJob = null;
+        showProgress(null);
+        renderAHP(finishJob(job, d.res));
+      };
+      wk.onerror = (e)=>{
+        e.preventDefault();
+        wk.terminate();
+        ahpWorker = false;
+        const job = pendingJob; pendingJob = null;
+        showProgress(null);
+        if(job && job.id === jobId) renderAHP(finishJob(job, computeAHP(job.text, job.method, null)));
+      };
+      return wk;
+    }catch(err){
+      return false;
+    }
+  }
+
+  // file read before and worker hand-off around the computeAHP stages
+  function finishJob(job, res){
+    if(res.error != null) return res;
+    const compute = res.timings.reduce((a,t)=> a+t.ms, 0);
+    const pre = job.readMs!=null ? [{stage:"file_read", ms:job.readMs, heap_delta_bytes:null}] : [];
+    res.timings = pre.concat(res.timings,
+      [{stage: job.inWorker ? "worker_transfer" : "dispatch", ms: Math.max(0, performance.now()-job.t0-compute), heap_delta_bytes:null}]);
+    return res;
+  }
+
+  function initAHP(txt, readMs){
+    lastText = txt;
+    const job = {id: ++jobId, text: txt, method: $("wMethod").value, readMs, t0: performance.now(), inWorker: false};
+    if(ahpWorker && pendingJob){          // drop the stale run instead of waiting for it
+      ahpWorker.terminate();
+      ahpWorker = null;
+    }
+    if(ahpWorker === null) ahpWorker = startWorker();
+    if(!ahpWorker){ renderAHP(finishJob(job, computeAHP(job.text, job.method, null))); return; }
+    job.inWorker = true;
+    pendingJob = job;
+    showProgress("parse", 0, 1);
+    ahpWorker.postMessage({id: job.id, text: job.text, method: job.method});
+  }
+
+  // ---------- Timing panel + JSON log ----------
+  // Each run is appended as one JSON record to a ring in localStorage, echoed
+  // to the console as "AHP_TIMING {...}" for log collectors, and offered as a
+  // JSON-lines download from the panel.
+  const TIMING_LOG_KEY = "ahp_timing_log", TIMING_LOG_MAX = 200;
+  let timingURL = null;
+  function readTimingLog(){
+    try{ return JSON.parse(localStorage.getItem(TIMING_LOG_KEY) || "[]"); }catch(err){ return []; }
+  }
+  function showTimings(res, timings){
+    const total = timings.reduce((a,t)=> a+t.ms, 0);
+    const rec = {ts: new Date().toISOString(), m: res.m, method: res.method, total_ms: +total.toFixed(3),
+                 stages: timings.map(t=> ({stage: t.stage, ms: +t.ms.toFixed(3), heap_delta_bytes: t.heap_delta_bytes}))};
+    const log = readTimingLog().concat([rec]).slice(-TIMING_LOG_MAX);
+    try{ localStorage.setItem(TIMING_LOG_KEY, JSON.stringify(log)); }catch(err){}
+    console.info("AHP_TIMING " + JSON.stringify(rec));
+
+    const rows = timings.map(t=>
+      "<tr><td>"+t.stage+"</td><td>"+t.ms.toFixed(3)+"</td><td>"+(100*t.ms/(total||1)).toFixed(1)+"%</td><td>"+
+      (t.heap_delta_bytes==null ? "–" : (t.heap_delta_bytes/1048576).toFixed(2))+"</td></tr>").join("");
+    $("tblTiming").innerHTML = "<thead><tr><th>Stage</th><th>ms</th><th>share</th><th>heap Δ MB</th></tr></thead><tbody>"+rows+
+      "<tr><th>total</th><th>"+total.toFixed(3)+"</th><th></th><th></th></tr></tbody>";
+    if(timingURL) URL.revokeObjectURL(timingURL);
+    timingURL = URL.createObjectURL(new Blob([log.map(r=> JSON.stringify(r)).join("\n")+"\n"], {type:"application/x-ndjson"}));
+    $("timingLog").href = timingURL;
+    $("timingLog").download = "ahp_timing_log.jsonl";
+    show($("timingPanel"), true);
+  }
+
+  // ---------- Render (main thread only) ----------
+  function renderAHP(res){
+    if(res.error != null){ if(res.error) alert(res.error); return; }
+    const {labels: rowLabels, colLabels, m, P, Pi, logPi, GM, sumGM, w, Pw, lam,
+           lam_max, SI, ri, CR, maxErr} = res;
+    const eig = res.method==="eigen" ? {iterations: res.iterations, timeMs: res.timeMs} : null;
+    const tm = stageTimer();
 
     // ---------- Render tables ----------
-    const Pcols = [" "].concat(colLabels);
-    const Prows = rowLabels.map((rl,i)=> [rl].concat(P[i].map(x=> x.toFixed(6))) );
-    renderTable("tblP", Pcols, Prows);
+    renderGrid("tblP", " ", colLabels, rowLabels, (i,j)=> P[i*m+j].toFixed(6));
 
-    renderTable("tblPi", ["Criteria","Π_i"], rowLabels.map((rl,i)=> [rl, Pi[i].toFixed(9)]) );
-    renderTable("tblGM", ["Criteria","GM_i"], rowLabels.map((rl,i)=> [rl, GM[i].toFixed(9)]) );
-    renderTable("tblW", ["Criteria","GM_i","ΣGM","ω_i"], rowLabels.map((rl,i)=> [rl, GM[i].toFixed(9), sumGM.toFixed(9), w[i].toFixed(9)]) );
+    renderGrid("tblPi", "Criteria", ["Π_i","ln Π_i"], rowLabels, (i,j)=> (j ? logPi[i] : Pi[i]).toFixed(9));
+    renderGrid("tblGM", "Criteria", ["GM_i"], rowLabels, i=> GM[i].toFixed(9));
+    renderGrid("tblW", "Criteria", ["GM_i","ΣGM","ω_i"], rowLabels, (i,j)=> [GM[i], sumGM, w[i]][j].toFixed(9));
 
-    const mulCols = [" "].concat(colLabels);
-    const mulRows = rowLabels.map((rl,i)=> [rl].concat(Mul[i].map(x=> x.toFixed(9))) );
-    renderTable("tblMul", mulCols, mulRows);
-    renderTable("tblPw", ["Criteria","(Pω)_i (row-sum)"], rowLabels.map((rl,i)=> [rl, Pw[i].toFixed(9)]) );
+    renderGrid("tblMul", " ", colLabels, rowLabels, (i,j)=> (P[i*m+j]*w[j]).toFixed(9));
+    renderGrid("tblPw", "Criteria", ["(Pω)_i (row-sum)"], rowLabels, i=> Pw[i].toFixed(9));
 
-    renderTable("tblLam", ["Criteria","ω_i","(Pω)_i","λ_i"], rowLabels.map((rl,i)=> [rl, w[i].toFixed(9), Pw[i].toFixed(9), lam[i].toFixed(9)]) );
+    renderGrid("tblLam", "Criteria", ["ω_i","(Pω)_i","λ_i"], rowLabels, (i,j)=> [w[i], Pw[i], lam[i]][j].toFixed(9));
 
     renderTable("tblCR",
       ["m","λmax","SI","RI","CR","Decision"],
@@ -646,6 +1080,11 @@ html = r"""
       ]]
     );
 
+    const eigText = eig
+      ? "Eigenvector by power iteration (GM start): <b>"+eig.iterations+"</b> iterations, <b>"+eig.timeMs.toFixed(3)+" ms</b>, tol "+EIG_TOL.toExponential(0)+". λmax is the exact Perron root."
+      : "";
+    ["eigInfo6","eigInfo7"].forEach(id=>{ $(id).innerHTML = eigText; show($(id), !!eig); });
+
     // ---------- Summary box ----------
     const ok = (CR<=0.10);
     $("statBox").innerHTML =
@@ -655,18 +1094,19 @@ html = r"""
       "<div><b>RI</b> = "+ri.toFixed(4)+"</div>"+
       "<div><b>CR</b> = "+CR.toFixed(9)+" &nbsp;→&nbsp; "+(ok ? "<span class='ok'>ACCEPTABLE</span>" : "<span class='bad'>NOT OK</span>")+"</div>";
 
+    tm.mark("render_tables");
+
     // ---------- Charts ----------
-    window.__AHP_DATA__ = { labels: rowLabels, w, lam };
     drawBar("barW", rowLabels.map((name,i)=> ({name, value:w[i]})));
     drawLine("lineL", rowLabels.map((name,i)=> ({name, x:i+1, value:lam[i]})));
 
     // ---------- Enable nav + results download ----------
     setNavEnabled(true);
-    const resObj = {
-      labels: rowLabels, m, P, Pi, GM, w, Pw, lam, lam_max, SI, ri, CR, maxErr
-    };
-    const resultsCSV = buildResultsCSV(resObj);
+    tm.mark("charts");
+    const resultsCSV = buildResultsCSV({...res, timings: res.timings.concat(tm.stages)});
     setResultsDownload(resultsCSV);
+    tm.mark("export");
+    showTimings(res, res.timings.concat(tm.stages));
 
     // ---------- Show sections ----------
     show($("stat"),true);
@@ -686,7 +1126,8 @@ html = r"""
     const f=e.target.files[0];
     if(!f) return;
     const r=new FileReader();
-    r.onload=()=> initAHP(String(r.result));
+    const t0=performance.now();
+    r.onload=()=> initAHP(String(r.result), performance.now()-t0);
     r.readAsText(f);
   };
 
@@ -699,7 +1140,48 @@ html = r"""
 </html>
 """
 
-# inject sample safely (no f-string issues)
-html = html.replace("__INJECT_SAMPLE_CSV__", SAMPLE_CSV.replace("`", "\\`"))
-
-components.html(html, height=4200, scrolling=True)
+# inject sample safely (no f-string issues); built once per server, not per rerun
+@st.cache_resource
+def build_html() -> str:
+    return html.replace("__INJECT_SAMPLE_CSV__", SAMPLE_CSV.replace("`", "\\`"))
+
+# the RI table is read on every rerun: values precomputed later must reach the page too
+components.html(build_html().replace("__INJECT_RI_SIM__", json.dumps(load_simulated_ri())),
+                height=4200, scrolling=True)
+
+# ---------- Binary results export (generated server-side, see ahp_export) ----------
+def export_bytes(csv_bytes: bytes, method: str, fmt: str) -> bytes:
+    mat = stream_pairwise_csv(io.StringIO(csv_bytes.decode("utf-8-sig"), newline=""))
+    res = payload_result(shared_cache().run(mat.P, method=method), mat.P, mat.labels)
+    buf = io.BytesIO()
+    export_results(res, buf, fmt)
+    return buf.getvalue()
+
+with st.sidebar:
+    st.subheader("Results export")
+    st.caption("Weights and λ as columns, P and Mul as 2-D arrays, consistency as metadata.")
+    up = st.file_uploader("Pairwise CSV", type="csv", key="export_csv")
+    fmt = st.selectbox("Format", [f for f in FORMATS if f != "csv"], key="export_fmt")
+    method = st.selectbox("Weighting", METHODS, key="export_method")
+    if up is not None:
+        try:
+            data = export_bytes(up.getvalue(), method, fmt)
+        except (ImportError, ValueError) as exc:
+            st.error(str(exc))
+        else:
+            st.download_button("⬇️ Download " + fmt.upper(), data, mime=MIME_TYPES[fmt],
+                               file_name=Path(up.name).stem + "_results" + SUFFIXES[fmt])
+
+    st.subheader("Fuzzy AHP")
+    st.caption("Judgments as triangles, e.g. (2;3;4) or 1/4;1/3;1/2; crisp cells count as (x;x;x).")
+    fup = st.file_uploader("Fuzzy pairwise CSV", type="csv", key="fuzzy_csv")
+    defuzz = st.selectbox("Defuzzify", DEFUZZIFY, key="fuzzy_defuzzify")
+    if fup is not None:
+        try:
+            fres = run_fuzzy_ahp_csv(fup.getvalue().decode("utf-8-sig"), defuzzify=defuzz)
+        except ValueError as exc:
+            st.error(str(exc))
+        else:
+            st.caption(f"CR (modal matrix) = {fres.CR:.4f} · {fres.decision}")
+            st.download_button("⬇️ Download fuzzy results", (fres.to_csv() + "\n").encode("utf-8"),
+                               mime="text/csv", file_name=Path(fup.name).stem + "_fuzzy_results.csv")
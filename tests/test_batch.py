@@ -0,0 +1,13 @@
+from ahp_batch import collect_inputs, run_batch
+from ahp_engine import SAMPLE_CSV
+
+
+def test_same_names_in_different_folders_get_their_own_results(tmp_path):
+    for sub in ("a", "b"):
+        (tmp_path / sub).mkdir()
+        (tmp_path / sub / "x.csv").write_text(SAMPLE_CSV, encoding="utf-8")
+    out = tmp_path / "results"
+    inputs = collect_inputs([str(tmp_path)], exclude=out)
+    assert run_batch(inputs, out, workers=1) == 0
+    assert (out / "a" / "x_results.csv").is_file() and (out / "b" / "x_results.csv").is_file()
+    assert sorted(collect_inputs([str(tmp_path)], exclude=out)) == sorted(inputs)
@@ -0,0 +1,39 @@
+import numpy as np
+
+import ahp_ri
+from ahp_cache import ResultCache, matrix_key
+from ahp_engine import run_ahp
+
+
+def _matrix(m, seed=0):
+    rng = np.random.default_rng(seed)
+    return ahp_ri.random_saaty_batch(rng, 1, m)[0]
+
+
+def test_hits_misses_and_disk_layer(tmp_path, monkeypatch):
+    monkeypatch.setattr(ahp_ri, "_default_cache", ahp_ri.RICache(tmp_path / "ri.json"))
+    P = _matrix(7)
+    cache = ResultCache(disk_dir=str(tmp_path / "results"))
+    first = cache.run(P)
+    assert cache.run(P.copy())["CR"] == first["CR"]
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert cache.run(P, method="eigen")["method"] == "eigen"
+    assert cache.misses == 2
+    assert matrix_key(P, "eigen") != matrix_key(P, "eigen", tol=1e-6)
+
+    other = ResultCache(disk_dir=str(tmp_path / "results"))
+    assert other.run(P) == first and other.disk_hits == 1
+    assert np.isclose(first["CR"], run_ahp(P).CR)
+
+
+def test_precomputed_ri_invalidates_stored_cr(tmp_path, monkeypatch):
+    ri_cache = ahp_ri.RICache(tmp_path / "ri.json")
+    monkeypatch.setattr(ahp_ri, "_default_cache", ri_cache)
+    P = _matrix(16)
+    cache = ResultCache()
+    stale = cache.run(P)
+    assert np.isclose(stale["RI"], 1.98 * 14 / 16)
+    ri_cache.put(16, 200, ahp_ri.DEFAULT_SEED, 1.6)
+    fresh = cache.run(P)
+    assert cache.misses == 2
+    assert fresh["RI"] == 1.6 and np.isclose(fresh["CR"], fresh["SI"] / 1.6)
@@ -0,0 +1,26 @@
+import numpy as np
+
+from ahp_compare import compare_methods
+from ahp_engine import SAMPLE_CSV, parse_pairwise_csv, run_ahp
+from ahp_sparse import IncompletePairwise, llsm_weights
+
+
+def test_methods_match_their_reference_implementations():
+    labels, _, P = parse_pairwise_csv(SAMPLE_CSV)
+    res = compare_methods(P, labels)
+    np.testing.assert_allclose(res.weights("gm"), run_ahp(P).w, rtol=1e-12)
+    np.testing.assert_allclose(res.weights("eigen"), run_ahp(P, method="eigen").w, rtol=1e-9)
+    col = (P / P.sum(axis=0)).mean(axis=1)
+    np.testing.assert_allclose(res.weights("colsum"), col, rtol=1e-12)
+    assert np.isclose(res.CR[0], run_ahp(P).CR)
+
+
+def test_llsm_differs_from_gm_on_non_reciprocal_input():
+    rng = np.random.default_rng(11)
+    P = np.exp(rng.normal(0.0, 1.0, (6, 6)))
+    np.fill_diagonal(P, 1.0)
+    res = compare_methods(P, methods=["gm", "llsm"])
+    i, j = np.nonzero(~np.eye(6, dtype=bool))            # both triangles, every judgment
+    ref = llsm_weights(IncompletePairwise.from_edges(6, i, j, P[i, j])).w
+    np.testing.assert_allclose(res.weights("llsm"), ref, rtol=1e-8)
+    assert not np.allclose(res.weights("llsm"), res.weights("gm"))
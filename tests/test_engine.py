@@ -0,0 +1,23 @@
+import numpy as np
+
+from ahp_engine import SAMPLE_CSV, RI, parse_pairwise_csv, run_ahp_batch
+
+
+def test_batch_matches_the_steps_written_out_per_matrix():
+    _, _, P = parse_pairwise_csv(SAMPLE_CSV)
+    rng = np.random.default_rng(1)
+    A = np.stack([P, np.exp(rng.normal(0.0, 1.0, P.shape))])
+    batch = run_ahp_batch(A, log_space=False)
+    for k, Q in enumerate(A):
+        m = Q.shape[0]
+        gm = Q.prod(axis=1) ** (1 / m)              # Steps 2-3
+        w = gm / gm.sum()                           # Step 4
+        lam = (Q @ w) / w                           # Steps 5-6
+        lam_max = lam.mean()
+        CR = (lam_max - m) / (m - 1) / RI(m)        # Step 7
+        res = run_ahp_batch(Q).item(0)
+        for got in (batch.item(k), res):
+            np.testing.assert_allclose(got.w, w, rtol=1e-12)
+            np.testing.assert_allclose(got.lam, lam, rtol=1e-12)
+            assert np.isclose(got.CR, CR, rtol=1e-12)
+    assert batch.item(0).decision == "ACCEPTABLE" and np.isclose(batch.item(0).CR, 0.0595628, atol=1e-7)
@@ -0,0 +1,7 @@
+from ahp_fuzzy import parse_tfn
+
+
+def test_crisp_cells_parse_like_parse_ratio():
+    assert parse_tfn("1 / 3") == (1 / 3, 1 / 3, 1 / 3)
+    assert parse_tfn("(2;3;4)") == parse_tfn("2 3 4") == parse_tfn("(2, 3, 4)") == (2.0, 3.0, 4.0)
+    assert parse_tfn("1 / 3; 1/2 ;1") == (1 / 3, 0.5, 1.0)
@@ -0,0 +1,14 @@
+import numpy as np
+
+from ahp_hierarchy import HierarchyEngine, Node
+
+
+def test_identical_sibling_matrices_keep_their_own_labels():
+    ones = np.ones((2, 2))
+    root = Node("G", ones, [Node("A", ones, [Node("a1"), Node("a2")]),
+                            Node("B", ones, [Node("b1"), Node("b2")])])
+    res = HierarchyEngine(root).evaluate()
+    assert res.nodes["G"].local.labels == ["A", "B"]
+    assert res.nodes["G/A"].local.labels == ["a1", "a2"]
+    assert res.nodes["G/B"].local.labels == ["b1", "b2"]
+    np.testing.assert_allclose(res.priorities, [0.25] * 4)
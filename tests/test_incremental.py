@@ -0,0 +1,20 @@
+import numpy as np
+
+from ahp_engine import run_ahp
+from ahp_incremental import IncrementalAHP
+
+
+def test_edits_match_a_full_rerun_on_non_reciprocal_input():
+    rng = np.random.default_rng(3)
+    m = 9
+    P = np.exp(rng.normal(0.0, 1.0, (m, m)))   # pⱼᵢ ≠ 1/pᵢⱼ
+    np.fill_diagonal(P, 1.0)
+    inc = IncrementalAHP(P)
+    for _ in range(40):
+        i, j = rng.choice(m, 2, replace=False)
+        inc.set(i, j, float(rng.choice([1 / 5, 1 / 2, 2.0, 3.0, 7.0])))
+        ref = run_ahp(inc.P)
+        np.testing.assert_allclose(inc.w, ref.w, rtol=1e-10)
+        np.testing.assert_allclose(inc.Pw, ref.Pw, rtol=1e-10)
+        assert np.isclose(inc.lam_max, ref.lam_max, rtol=1e-10)
+        assert np.isclose(inc.CR, ref.CR, rtol=1e-10)
@@ -0,0 +1,16 @@
+import numpy as np
+
+from ahp_engine import run_ahp
+from ahp_repair import repair
+
+
+def test_repair_reports_budget_and_matches_a_full_rerun():
+    rng = np.random.default_rng(7)
+    m = 12
+    P = np.exp(rng.normal(0.0, 1.0, (m, m)))   # inconsistent and non-reciprocal
+    np.fill_diagonal(P, 1.0)
+    res = repair(P)
+    assert res.reached_target and res.stopped == "target"
+    assert np.isclose(res.CR_after, run_ahp(res.P).CR, rtol=1e-10)
+    short = repair(P, max_changes=1)
+    assert len(short.steps) == 1 and not short.reached_target and short.stopped == "max_changes"
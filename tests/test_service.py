@@ -0,0 +1,9 @@
+from ahp_engine import SAMPLE_CSV
+from ahp_service import score_items
+
+
+def test_bad_labels_fail_only_their_own_item():
+    good = {"matrix": [[1, 2], [0.5, 1]], "labels": ["a", "b"]}
+    out = score_items([SAMPLE_CSV, {**good, "labels": 5}, good])
+    assert "result" in out[0] and "result" in out[2]
+    assert out[1] == {"error": "\"labels\" must be a list of strings."}
@@ -0,0 +1,17 @@
+import io
+
+import numpy as np
+
+from ahp_engine import SAMPLE_CSV, run_ahp_csv
+from ahp_sparse import llsm_weights, read_incomplete_csv
+
+
+def test_full_csv_counts_each_pair_once():
+    G = read_incomplete_csv(io.StringIO(SAMPLE_CSV))
+    res = llsm_weights(G)
+    ref = run_ahp_csv(SAMPLE_CSV)
+    m = ref.m
+    assert G.n_judgments == m * (m - 1) // 2
+    iu, ju = np.triu_indices(m, 1)
+    e = np.log(ref.P[iu, ju]) - np.log(ref.w[iu] / ref.w[ju])
+    assert np.isclose(res.GCI, 2 * (e @ e) / ((m - 1) * (m - 2)))